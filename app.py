@@ -1,137 +1,312 @@
 import streamlit as st
+from collections import OrderedDict
 from graph import trip_graph
 from model import TravelState
-import base64
 import folium
 from streamlit_folium import st_folium
 import pandas as pd
-from src.utils.cache import install_http_cache
+from src.config import config
+from src.utils.cache import TTLCache, install_http_cache
+from src.utils.cache_warmer import start_cache_warmer
+from src.utils.demand import record_request
+from src.utils.request_key import request_key
+from src.agents.reporter import get_pdf, pdf_title, render_pdf
 
 st.set_page_config(page_title="Agentic Travel Assistant",layout="wide")
 # install HTTP response cache if available
 install_http_cache(cache_name="http_cache", expire_seconds=24*3600)
 st.title("Agentic Travel Assistant",width="stretch")
 
+
+def code_to_emoji_desc(code: int):
+    mapping = [
+        (lambda c: c == 0, ("☀️", "Clear")),
+        (lambda c: c in (1, 2, 3), ("⛅", "Partly cloudy")),
+        (lambda c: c in (45, 48), ("🌫️", "Fog")),
+        (lambda c: c in (51, 53, 55), ("🌦️", "Drizzle")),
+        (lambda c: c in (61, 63, 65, 80, 81, 82), ("🌧️", "Rain")),
+        (lambda c: c in (66, 67), ("🌧️🥶", "Freezing rain")),
+        (lambda c: c in (71, 73, 75, 77, 85, 86), ("❄️", "Snow")),
+        (lambda c: c == 95, ("⛈️", "Thunderstorm")),
+        (lambda c: c in (96, 99), ("⛈️🌨️", "Thunderstorm w/ hail")),
+    ]
+    for pred, val in mapping:
+        if pred(code):
+            return val
+    return ("🌤️", "Weather")
+
+
+def render_outline(merged):
+    if merged.get("itinerary_text"):
+        # single-call planner mode returns the prose together with the outline
+        render_itinerary(merged)
+        return
+    plan = merged.get("plan_outline") or {}
+    if plan.get("trip_overview"):
+        st.markdown(f"**Overview:** {plan['trip_overview']}")
+    for day in plan.get("days") or []:
+        activities = ", ".join(day.get("activities") or [])
+        st.markdown(f"- **Day {day.get('day')}: {day.get('theme', '')}** — {activities}")
+
+
+def render_itinerary(merged):
+    itinerary_text = merged.get("itinerary_text") or "No itinerary produced."
+    st.subheader("Your Itinerary")
+    st.markdown(itinerary_text)
+    pdf_key = merged.get("itinerary_pdf_key")
+    cols = st.columns([1,1])
+    with cols[0]:
+        if pdf_key:
+            title = pdf_title(merged.get("city"), merged.get("days"))
+            text = merged.get("itinerary_text") or ""
+            # built (or read from the blob store) only when the button is clicked
+            st.download_button(
+                "⬇️ Download PDF",
+                data=lambda: get_pdf(pdf_key) or render_pdf(title, text),
+                file_name="itinerary.pdf",
+                mime="application/pdf",
+                on_click="ignore",
+                key=f"pdf-{pdf_key}",
+            )
+    with cols[1]:
+        st.caption("Tip: Adjust interests for alternate plans.")
+
+
+def render_map(merged):
+    route_plan = merged.get("route_plan") or {}
+    ordered = route_plan.get("ordered") or []
+    if ordered:
+        day_colors = ["blue", "red", "green", "purple", "orange", "darkred", "cadetblue", "darkgreen"]
+        day_routes = route_plan.get("days") or [{"day": 1, "ordered": ordered}]
+        center = (ordered[0]["lat"], ordered[0]["lon"])
+        m = folium.Map(location=center, zoom_start=13)
+        for day_route in day_routes:
+            color = day_colors[(day_route["day"] - 1) % len(day_colors)]
+            stops = day_route.get("ordered") or []
+            for idx, p in enumerate(stops):
+                folium.Marker(
+                    [p["lat"], p["lon"]],
+                    popup=f"Day {day_route['day']} · Stop {idx+1}",
+                    icon=folium.Icon(color=color),
+                ).add_to(m)
+            if len(stops) > 1:
+                folium.PolyLine([[p["lat"], p["lon"]] for p in stops], color=color, weight=3).add_to(m)
+        # the map is display-only: panning/zooming must not rerun the script
+        st_folium(m, width=750, height=500, returned_objects=[], key="route_map")
+        for day_route in day_routes:
+            if day_route.get("total_duration") is not None:
+                where = f" ({day_route['city']})" if day_route.get("city") else ""
+                st.caption(
+                    f"Day {day_route['day']}{where}: {len(day_route.get('ordered') or [])} stops, "
+                    f"~{day_route['total_duration'] / 60:.0f} min travel"
+                )
+    else:
+        st.info("Route will appear here once attractions are available.")
+
+
+def render_weather(merged):
+    daily = merged.get("weather_data") or {}
+    if daily and isinstance(daily, dict) and daily.get("time"):
+        # Build a friendly daily forecast table
+        times = daily.get("time", [])
+        tmax = daily.get("temperature_2m_max", [])
+        tmin = daily.get("temperature_2m_min", [])
+        wcode = daily.get("weathercode", [])
+
+        rows = []
+        for i in range(min(len(times), len(tmax), len(tmin), len(wcode))):
+            emoji, desc = code_to_emoji_desc(int(wcode[i]))
+            rows.append({
+                "date": times[i],
+                "max °C": tmax[i],
+                "min °C": tmin[i],
+                "weather": f"{emoji} {desc}",
+            })
+        df = pd.DataFrame(rows)
+
+        # Show compact cards for next few days
+        st.subheader("Daily forecast")
+        cols = st.columns(min(5, len(df))) if len(df) else []
+        for i, col in enumerate(cols):
+            with col:
+                r = df.iloc[i]
+                st.markdown(f"**{r['date']}**")
+                st.markdown(r["weather"]) 
+                st.metric("Max", f"{r['max °C']:.1f} °C", delta=None)
+                st.caption(f"Min: {r['min °C']:.1f} °C")
+
+        # Line chart for temps
+        st.markdown("\n")
+        chart_df = df.set_index("date")[ ["max °C", "min °C"] ]
+        st.line_chart(chart_df)
+
+        # Full table
+        with st.expander("See full forecast table"):
+            st.dataframe(df, use_container_width=True)
+    else:
+        st.info("Weather will appear here when available.")
+
+
+def render_attractions(merged):
+    attractions = merged.get("attractions") or []
+    if attractions:
+        show = [{"name": a.get("name"), "kinds": a.get("kinds"), "lat": a.get("lat"), "lon": a.get("lon")} for a in attractions[:10]]
+        if any(a.get("city") for a in attractions):
+            # multi-city: the top places of every city, not just the first one
+            show = [{"city": a.get("city"), "name": a.get("name"), "kinds": a.get("kinds"), "lat": a.get("lat"), "lon": a.get("lon")}
+                    for a in attractions if a.get("city")]
+        st.dataframe(show, use_container_width=True)
+    else:
+        st.info("Attractions will appear here once loaded.")
+
+
+@st.cache_resource
+def shared_results() -> TTLCache:
+    """Finished trips by normalized request, shared by every session of this server process."""
+    return TTLCache(ttl_seconds=config.RESULT_CACHE_TTL_SECONDS, max_size=config.RESULT_CACHE_MAX_ENTRIES)
+
+
+@st.cache_resource
+def cache_warmer():
+    """One background warmer per server process (see CACHE_WARMER_ENABLED)."""
+    return start_cache_warmer()
+
+
+cache_warmer()
+
+
+def remember_result(key, merged):
+    """Keep the trip in this session (most recent SESSION_RESULTS_MAX) so reruns redraw it for free."""
+    results = st.session_state.setdefault("results", OrderedDict())
+    results[key] = merged
+    results.move_to_end(key)
+    while len(results) > config.SESSION_RESULTS_MAX:
+        results.popitem(last=False)
+    st.session_state["current_request"] = key
+
+
+def layout_tabs():
+    # Tabs are laid out up front and filled in as each node finishes
+    tab_itin, tab_map, tab_weather, tab_pois = st.tabs(["Plan", "🗺️ Map", "🌤️ Weather", "Attractions"])
+    with tab_itin:
+        itin_slot = st.empty()
+    with tab_map:
+        map_slot = st.empty()
+    with tab_weather:
+        weather_slot = st.empty()
+    with tab_pois:
+        pois_slot = st.empty()
+    return itin_slot, map_slot, weather_slot, pois_slot
+
+
+def render_result(merged):
+    """Redraw a finished trip from its stored result, without touching the graph."""
+    if merged.get("error"):
+        st.error(merged["error"])
+    itin_slot, map_slot, weather_slot, pois_slot = layout_tabs()
+    with itin_slot.container():
+        if merged.get("itinerary_text"):
+            render_itinerary(merged)
+        else:
+            render_outline(merged)
+    with map_slot.container():
+        render_map(merged)
+    with weather_slot.container():
+        render_weather(merged)
+    with pois_slot.container():
+        render_attractions(merged)
+
+
+# the graph's reducers by field (city_results appends, errors are joined, status keeps the latest)
+STATE_REDUCERS = {name: field.metadata[0] for name, field in TravelState.model_fields.items()
+                  if field.metadata and callable(field.metadata[0])}
+
+
+def merge_update(merged, update):
+    """Apply one node's output to the accumulated state the way the graph's reducers do."""
+    for key, value in (update or {}).items():
+        reducer = STATE_REDUCERS.get(key)
+        if reducer is not None and merged.get(key) is not None:
+            merged[key] = reducer(merged[key], value)
+        else:
+            merged[key] = value
+
+
+def run_trip(state):
+    """Run the graph, drawing each tab as soon as its node finishes; returns the merged final state."""
+    status_box = st.status("Generating....", expanded=False)
+    error_slot = st.empty()
+    itin_slot, map_slot, weather_slot, pois_slot = layout_tabs()
+
+    renderers = {
+        "planner": [(itin_slot, render_outline)],
+        "attraction": [(pois_slot, render_attractions)],
+        "route": [(map_slot, render_map)],
+        "weather": [(weather_slot, render_weather)],
+        "summarizer": [(itin_slot, render_itinerary)],
+        "reporter": [(itin_slot, render_itinerary)],
+        # multi-city trips deliver places, routes and weather together once every city is done
+        "merge_cities": [(pois_slot, render_attractions), (map_slot, render_map), (weather_slot, render_weather)],
+    }
+
+    merged = state.model_dump()
+    streamed_text = ""
+    # "updates" yields each node's output as it completes; "custom" carries summarizer tokens
+    for mode, chunk in trip_graph.stream(state.model_dump(), stream_mode=["updates", "custom"]):
+        if mode == "custom":
+            delta = chunk.get("itinerary_delta") if isinstance(chunk, dict) else None
+            if delta:
+                streamed_text += delta
+                itin_slot.markdown(streamed_text)
+            continue
+
+        for node_name, update in chunk.items():
+            merge_update(merged, update)
+            status_box.update(label=f"Generating.... ({node_name} done)")
+            if isinstance(update, dict) and update.get("error"):
+                error_slot.error(merged["error"])
+                # a multi-city merge can carry one city's error alongside the others' results
+                if node_name != "merge_cities":
+                    continue
+            for slot, render in renderers.get(node_name, []):
+                with slot.container():
+                    render(merged)
+
+    status_box.update(label="Done" if not merged.get("error") else "Finished with errors", state="complete" if not merged.get("error") else "error")
+    return merged
+
+
 with st.form("trip_form"):
     city = st.text_input("Destination City",value="Jaipur,Ayodhya")
     days = st.number_input("Number of days",min_value=1,max_value=30, value=3)
     interests = st.text_input("Interests (comma-seprated)",value="culture,food")
     budget = st.selectbox("Budget",['low','medium','high'])
+    refresh = st.checkbox("Ignore cached results", value=False)
     submitted = st.form_submit_button("Generate Itinerary")
 
 
-    if submitted:
-        with st.spinner(text="Generating....", show_time=True):
-            state = TravelState(
-                city = city,
-                days=int(days),
-                interests=[s.strip() for s in interests.split(",") if s.strip()],
-                budget=budget
-            )
-            result = trip_graph.invoke(state.model_dump())
-
-            # LangGraph returns a dict-like merged state. Wrap to TravelState for convenience
-            # some LangGraph versions return pydantic object; handle both
-            if isinstance(result, dict):
-                merged = result
-            else:
-                merged = dict(result)
-
-            if merged.get("error"):
-                st.error(merged["error"])
-            else:
-                # Tabs for better presentation
-                tab_itin, tab_map, tab_weather, tab_pois = st.tabs(["Plan", "🗺️ Map", "🌤️ Weather", "Attractions"])
-
-                with tab_itin:
-                    itinerary_text = merged.get("itinerary_text") or "No itinerary produced."
-                    st.subheader("Your Itinerary")
-                    st.markdown(itinerary_text)
-                    pdf_bytes = merged.get("itinerary_pdf_bytes")
-                    cols = st.columns([1,1])
-                    with cols[0]:
-                        if pdf_bytes:
-                            b64 = base64.b64encode(pdf_bytes).decode()
-                            href = f'<a href="data:application/octet-stream;base64,{b64}" download="itinerary.pdf">⬇️ Download PDF</a>'
-                            st.markdown(href, unsafe_allow_html=True)
-                    with cols[1]:
-                        st.caption("Tip: Adjust interests for alternate plans.")
-
-                with tab_map:
-                    route_plan = merged.get("route_plan") or {}
-                    ordered = route_plan.get("ordered") or []
-                    if ordered:
-                        center = (ordered[0]["lat"], ordered[0]["lon"])
-                        m = folium.Map(location=center, zoom_start=13)
-                        for idx, p in enumerate(ordered):
-                            folium.Marker([p["lat"], p["lon"]], popup=f"Stop {idx+1}").add_to(m)
-                        st_folium(m, width=750, height=500)
-                    else:
-                        st.info("Route will appear here once attractions are available.")
-
-                with tab_weather:
-                    daily = merged.get("weather_data") or {}
-                    if daily and isinstance(daily, dict) and daily.get("time"):
-                        # Build a friendly daily forecast table
-                        def code_to_emoji_desc(code: int):
-                            mapping = [
-                                (lambda c: c == 0, ("☀️", "Clear")),
-                                (lambda c: c in (1, 2, 3), ("⛅", "Partly cloudy")),
-                                (lambda c: c in (45, 48), ("🌫️", "Fog")),
-                                (lambda c: c in (51, 53, 55), ("🌦️", "Drizzle")),
-                                (lambda c: c in (61, 63, 65, 80, 81, 82), ("🌧️", "Rain")),
-                                (lambda c: c in (66, 67), ("🌧️🥶", "Freezing rain")),
-                                (lambda c: c in (71, 73, 75, 77, 85, 86), ("❄️", "Snow")),
-                                (lambda c: c == 95, ("⛈️", "Thunderstorm")),
-                                (lambda c: c in (96, 99), ("⛈️🌨️", "Thunderstorm w/ hail")),
-                            ]
-                            for pred, val in mapping:
-                                if pred(code):
-                                    return val
-                            return ("🌤️", "Weather")
-
-                        times = daily.get("time", [])
-                        tmax = daily.get("temperature_2m_max", [])
-                        tmin = daily.get("temperature_2m_min", [])
-                        wcode = daily.get("weathercode", [])
-
-                        rows = []
-                        for i in range(min(len(times), len(tmax), len(tmin), len(wcode))):
-                            emoji, desc = code_to_emoji_desc(int(wcode[i]))
-                            rows.append({
-                                "date": times[i],
-                                "max °C": tmax[i],
-                                "min °C": tmin[i],
-                                "weather": f"{emoji} {desc}",
-                            })
-                        df = pd.DataFrame(rows)
-
-                        # Show compact cards for next few days
-                        st.subheader("Daily forecast")
-                        cols = st.columns(min(5, len(df))) if len(df) else []
-                        for i, col in enumerate(cols):
-                            with col:
-                                r = df.iloc[i]
-                                st.markdown(f"**{r['date']}**")
-                                st.markdown(r["weather"]) 
-                                st.metric("Max", f"{r['max °C']:.1f} °C", delta=None)
-                                st.caption(f"Min: {r['min °C']:.1f} °C")
-
-                        # Line chart for temps
-                        st.markdown("\n")
-                        chart_df = df.set_index("date")[ ["max °C", "min °C"] ]
-                        st.line_chart(chart_df)
-
-                        # Full table
-                        with st.expander("See full forecast table"):
-                            st.dataframe(df, use_container_width=True)
-                    else:
-                        st.info("Weather will appear here when available.")
-
-                with tab_pois:
-                    attractions = merged.get("attractions") or []
-                    if attractions:
-                        show = [{"name": a.get("name"), "kinds": a.get("kinds"), "lat": a.get("lat"), "lon": a.get("lon")} for a in attractions[:10]]
-                        st.dataframe(show, use_container_width=True)
-                    else:
-                        st.info("Attractions will appear here once loaded.")
+if submitted:
+    state = TravelState(
+        city = city,
+        days=int(days),
+        interests=[s.strip() for s in interests.split(",") if s.strip()],
+        budget=budget
+    )
+    key = request_key(state.city, state.days, state.interests, state.budget)
+    record_request(state.city, state.days, state.interests, state.budget)
+    cached = None
+    if not refresh:
+        cached = st.session_state.get("results", {}).get(key) or shared_results().get(key)
+    if cached is not None:
+        st.caption("Showing an earlier result for this trip (tick \"Ignore cached results\" to regenerate).")
+        remember_result(key, cached)
+        render_result(cached)
+    else:
+        merged = run_trip(state)
+        remember_result(key, merged)
+        # failed runs are kept for this session only, so other users retry them
+        if not merged.get("error"):
+            shared_results().set(key, merged)
+elif st.session_state.get("current_request") in st.session_state.get("results", {}):
+    # any other rerun (widget interaction): redraw the last trip without calling the graph
+    render_result(st.session_state["results"][st.session_state["current_request"]])
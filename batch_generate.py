@@ -0,0 +1,238 @@
+"""
+Generate itineraries for many trip requests at once (e.g. to pre-warm the caches overnight).
+
+  python batch_generate.py requests.jsonl --out results.jsonl --concurrency 8
+  python batch_generate.py requests.jsonl --out results.parquet   # needs pyarrow
+
+Each input line is a TravelState input, e.g.
+  {"city": "Jaipur", "days": 3, "interests": ["culture", "food"], "budget": "medium"}
+Requests that normalize to the same trip run once. The distinct cities are geocoded up
+front, and runs for the same city are scheduled together so they share POI and
+weather calls. Results are written as they complete, followed by a throughput summary.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from graph import trip_graph
+from model import TravelState
+from src.utils import http
+from src.utils.opentripmap import abbox_from_city
+from src.utils.request_key import request_key
+from src.utils.singleflight import singleflight_stats
+from src.utils.trip_legs import parse_cities
+
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+except Exception:
+    pa = pq = None
+
+# state fields copied into each result record
+RESULT_FIELDS = ("status", "error", "itinerary_text", "itinerary_pdf_key", "plan_outline",
+                 "attractions", "route_plan", "weather_data")
+
+
+def read_requests(path: str) -> Iterator[Tuple[int, Any]]:
+    """(line number, parsed JSON or the parse error) for every non-blank line; '-' reads stdin."""
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, e
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+async def prewarm_geocodes(cities: Iterable[str], concurrency: int) -> Dict[str, str]:
+    """Geocode each distinct city once; returns {city: error} for the ones that failed."""
+    sem = asyncio.Semaphore(concurrency)
+    failed: Dict[str, str] = {}
+
+    async def one(city: str) -> None:
+        async with sem:
+            try:
+                await abbox_from_city(city)
+            except Exception as e:
+                failed[city] = str(e)
+
+    await asyncio.gather(*(one(c) for c in cities))
+    return failed
+
+
+def _record(line: int, key: Optional[str], request: Dict[str, Any], **fields: Any) -> Dict[str, Any]:
+    return {
+        "line": line,
+        "request_key": key,
+        "city": request.get("city"),
+        "days": request.get("days"),
+        "interests": request.get("interests"),
+        "budget": request.get("budget"),
+        **fields,
+    }
+
+
+async def run_batch(requests: Iterable[Tuple[int, Any]], concurrency: int = 8,
+                    prewarm: bool = True) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run every request through trip_graph.ainvoke with at most `concurrency` trips in
+    flight, yielding one record per input line in completion order.
+    """
+    groups: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+    states: Dict[str, TravelState] = {}
+    for line, raw in requests:
+        try:
+            if isinstance(raw, Exception):
+                raise raw
+            state = TravelState(**raw)
+            if not state.city:
+                raise ValueError("city is required")
+        except Exception as e:
+            fields = dict.fromkeys(RESULT_FIELDS, None)
+            yield _record(line, None, raw if isinstance(raw, dict) else {}, **dict(fields, error=f"invalid request: {e}"),
+                          ok=False, seconds=0.0, deduplicated=False)
+            continue
+        key = request_key(state.city, state.days, state.interests, state.budget)
+        groups.setdefault(key, []).append((line, raw))
+        states.setdefault(key, state)
+
+    if prewarm:
+        cities = {c.casefold(): c for s in states.values() for c in parse_cities(s.city)}
+        failed = await prewarm_geocodes(cities.values(), concurrency)
+        for city, error in failed.items():
+            print(f"[batch] geocode failed for {city}: {error}", file=sys.stderr)
+
+    sem = asyncio.Semaphore(concurrency)
+
+    async def run_one(key: str) -> Tuple[str, Dict[str, Any], float, Optional[str]]:
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                out = await trip_graph.ainvoke(states[key].model_dump())
+                return key, out, time.perf_counter() - t0, None
+            except Exception as e:
+                return key, {}, time.perf_counter() - t0, f"{type(e).__name__}: {e}"
+
+    # same-city trips next to each other, so the ones in flight together share upstream calls; the tasks are
+    # created here, in that order, because as_completed() would schedule bare coroutines in set order
+    order = sorted(states, key=lambda k: (parse_cities(states[k].city) or [""])[0].casefold())
+    tasks = [asyncio.ensure_future(run_one(k)) for k in order]
+    for done in asyncio.as_completed(tasks):
+        key, out, seconds, failure = await done
+        error = failure or out.get("error")
+        fields = {name: out.get(name) for name in RESULT_FIELDS}
+        for i, (line, raw) in enumerate(groups[key]):
+            yield _record(line, key, raw, **dict(fields, error=error), ok=error is None,
+                          seconds=round(seconds, 3), deduplicated=i > 0)
+
+
+class JSONLWriter:
+    def __init__(self, path: str):
+        self._f = sys.stdout if path == "-" else open(path, "w", encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        # results are usable (and survive an interrupted run) as soon as they are written
+        self._f.flush()
+
+    def close(self) -> None:
+        if self._f is not sys.stdout:
+            self._f.close()
+
+
+class ParquetWriter:
+    """Row groups of `rows_per_group` records; nested fields are stored as JSON text."""
+    NESTED = ("plan_outline", "attractions", "route_plan", "weather_data")
+
+    def __init__(self, path: str, rows_per_group: int = 100):
+        if pa is None:
+            raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+        self.schema = pa.schema([
+            ("line", pa.int64()), ("request_key", pa.string()), ("city", pa.string()), ("days", pa.int64()),
+            ("interests", pa.list_(pa.string())), ("budget", pa.string()), ("ok", pa.bool_()),
+            ("error", pa.string()), ("seconds", pa.float64()), ("deduplicated", pa.bool_()),
+            ("status", pa.string()), ("itinerary_text", pa.string()), ("itinerary_pdf_key", pa.string()),
+            *((name, pa.string()) for name in self.NESTED),
+        ])
+        self._writer = pq.ParquetWriter(path, self.schema)
+        self._rows: List[Dict[str, Any]] = []
+        self.rows_per_group = rows_per_group
+
+    def write(self, record: Dict[str, Any]) -> None:
+        row = {name: record.get(name) for name in self.schema.names}
+        for name in self.NESTED:
+            if row[name] is not None:
+                row[name] = json.dumps(row[name], ensure_ascii=False, default=str)
+        self._rows.append(row)
+        if len(self._rows) >= self.rows_per_group:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._rows:
+            self._writer.write_table(pa.Table.from_pylist(self._rows, schema=self.schema))
+            self._rows = []
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+
+def open_writer(path: str):
+    return ParquetWriter(path) if path.endswith(".parquet") else JSONLWriter(path)
+
+
+def _summary(records: List[Dict[str, Any]], wall: float) -> str:
+    runs = [r["seconds"] for r in records if r["request_key"] and not r["deduplicated"]]
+    ok = sum(1 for r in records if r["ok"])
+    lines = [
+        f"[batch] {len(records)} requests ({len(runs)} distinct trips), {ok} ok, {len(records) - ok} failed "
+        f"in {wall:.1f}s",
+        f"[batch] throughput: {len(runs) / wall:.2f} trips/s, {len(records) / wall:.2f} requests/s",
+    ]
+    if len(runs) >= 2:
+        p95 = statistics.quantiles(runs, n=100, method="inclusive")[94]
+        lines.append(f"[batch] trip latency: p50 {statistics.median(runs):.2f}s, p95 {p95:.2f}s")
+    shared = {name: s["coalesced"] for name, s in singleflight_stats().items() if s["coalesced"]}
+    if shared:
+        lines.append(f"[batch] upstream calls shared between trips: {shared}")
+    return "\n".join(lines)
+
+
+async def amain(args: argparse.Namespace) -> None:
+    writer = open_writer(args.out)
+    records: List[Dict[str, Any]] = []
+    t0 = time.perf_counter()
+    try:
+        async for record in run_batch(read_requests(args.input), args.concurrency, prewarm=not args.no_prewarm):
+            writer.write(record)
+            records.append({k: record[k] for k in ("request_key", "ok", "seconds", "deduplicated")})
+            if args.progress and len(records) % args.progress == 0:
+                print(f"[batch] {len(records)} done", file=sys.stderr)
+    finally:
+        writer.close()
+        # the pooled async client belongs to this loop, which asyncio.run is about to close
+        await http.aclose()
+    print(_summary(records, time.perf_counter() - t0), file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input", help="JSONL file of trip requests ('-' for stdin)")
+    parser.add_argument("--out", default="-", help="results .jsonl or .parquet ('-' for stdout, the default)")
+    parser.add_argument("--concurrency", type=int, default=8, help="trips in flight at once")
+    parser.add_argument("--no-prewarm", action="store_true", help="skip geocoding the distinct cities up front")
+    parser.add_argument("--progress", type=int, default=50, help="report every N results (0 = off)")
+    asyncio.run(amain(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Micro-benchmark: the original TTLCache (O(n) eviction) vs the current LRU/TTL cache.
+
+Run: python -m benchmarks.bench_cache --size 4096 --ops 200000
+"""
+import argparse
+import random
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from src.utils.cache import TTLCache
+
+
+class LegacyTTLCache:
+    """Verbatim copy of the previous implementation, kept only for comparison."""
+    def __init__(self, ttl_seconds: int = 3600, max_size: int = 512):
+        self.ttl = ttl_seconds
+        self.max = max_size
+        self._store: Dict[str, Tuple[float, Any]] = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        item = self._store.get(key)
+        if not item:
+            return None
+        ts, val = item
+        if (time.time() - ts) > self.ttl:
+            self._store.pop(key, None)
+            return None
+        return val
+
+    def set(self, key: str, value: Any) -> None:
+        if len(self._store) >= self.max:
+            oldest_key = min(self._store.keys(), key=lambda k: self._store[k][0])
+            self._store.pop(oldest_key, None)
+        self._store[key] = (time.time(), value)
+
+
+def _workload(size: int, ops: int, seed: int = 7):
+    rng = random.Random(seed)
+    # key space 4x the capacity so the cache stays full and evicts constantly
+    keys = [f"k{rng.randrange(size * 4)}" for _ in range(ops)]
+    reads = [rng.random() < 0.7 for _ in range(ops)]
+    return keys, reads
+
+
+def _run(cache, keys, reads) -> float:
+    t0 = time.perf_counter()
+    for key, is_read in zip(keys, reads):
+        if is_read:
+            if cache.get(key) is None:
+                cache.set(key, key)
+        else:
+            cache.set(key, key)
+    return time.perf_counter() - t0
+
+
+def main(size: int, ops: int) -> None:
+    keys, reads = _workload(size, ops)
+    print(f"capacity={size} ops={ops}")
+    for name, cache in (("legacy", LegacyTTLCache(max_size=size)), ("lru", TTLCache(max_size=size))):
+        elapsed = _run(cache, keys, reads)
+        print(f"{name:<8} {elapsed:8.3f}s  {ops / elapsed:12,.0f} ops/s")
+        if isinstance(cache, TTLCache):
+            print(f"         stats: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=4096)
+    parser.add_argument("--ops", type=int, default=200000)
+    args = parser.parse_args()
+    main(args.size, args.ops)
@@ -0,0 +1,117 @@
+"""
+Benchmark: sequential vs fan-out/fan-in trip graph.
+
+Every external backend (Groq, Nominatim, OpenTripMap, Open-Meteo, OSRM) is
+replaced by a stub that sleeps for a jittered latency, so the numbers only
+reflect graph topology.
+
+Run: python -m benchmarks.bench_graph --runs 20
+"""
+import argparse
+import random
+import statistics
+import time
+from unittest import mock
+
+# mean latency (seconds) injected per backend call
+LATENCY = {
+    "groq_planner": 0.60,
+    "groq_summarizer": 0.80,
+    "geocode": 0.15,
+    "poi": 0.40,
+    "weather": 0.20,
+    "osrm": 0.25,
+}
+
+
+def _sleep(name: str) -> None:
+    mean = LATENCY[name]
+    time.sleep(max(0.0, random.gauss(mean, mean * 0.15)))
+
+
+def _fake_llm(name: str, text: str):
+    def _invoke(prompt, *args, **kwargs):
+        _sleep(name)
+        return text
+    return _invoke
+
+
+def _fake_llm_stream(name: str, text: str):
+    def _stream(prompt, *args, **kwargs):
+        _sleep(name)
+        yield text
+    return _stream
+
+
+def _fake_fetch_attraction(city, *args, **kwargs):
+    _sleep("geocode")
+    _sleep("poi")
+    return [
+        {"xid": f"x{i}", "name": f"Place {i}", "kinds": "cultural,foods", "lat": 26.9 + i * 0.01, "lon": 75.8 + i * 0.01, "dist": i * 100.0}
+        for i in range(10)
+    ]
+
+
+def _fake_geocode(city, *args, **kwargs):
+    _sleep("geocode")
+    return {"lat": 26.9, "lon": 75.8, "source": "stub"}
+
+
+def _fake_weather(lat, lon, days=7, *args, **kwargs):
+    _sleep("weather")
+    return {"daily": {"time": ["2025-01-01"], "temperature_2m_max": [25.0], "temperature_2m_min": [12.0], "weathercode": [0]}}
+
+
+def _fake_route(coords, days=1, *args, **kwargs):
+    _sleep("osrm")
+    return {"ordered": coords, "order_indices": list(range(len(coords)))}
+
+
+PLAN_JSON = '{"trip_overview": "stub", "days": [{"day": 1, "theme": "Old city", "activities": ["a", "b"], "description": "d"}]}'
+
+
+def _patches():
+    return [
+        mock.patch("src.agents.planner.groq.invoke", _fake_llm("groq_planner", PLAN_JSON)),
+        mock.patch("src.agents.summarizer.groq.stream", _fake_llm_stream("groq_summarizer", "Day 1\n- Visit the old city")),
+        mock.patch("src.agents.attraction.fetch_attraction", _fake_fetch_attraction),
+        mock.patch("src.agents.weather.bbox_from_city", _fake_geocode),
+        mock.patch("src.agents.weather.fetch_weather_by_coords", _fake_weather),
+        mock.patch("src.agents.route.compute_day_routes", _fake_route),
+    ]
+
+
+def _percentiles(samples):
+    qs = statistics.quantiles(samples, n=100, method="inclusive")
+    return statistics.median(samples), qs[94]
+
+
+def run(runs: int) -> None:
+    from graph import build_graph
+    from model import TravelState
+
+    state = TravelState(city="Jaipur", days=2, interests=["culture", "food"], budget="medium").model_dump()
+    graphs = {"sequential": build_graph(parallel=False), "parallel": build_graph(parallel=True)}
+
+    for p in _patches():
+        p.start()
+    try:
+        print(f"{'topology':<12} {'p50 (s)':>9} {'p95 (s)':>9}")
+        for name, g in graphs.items():
+            g.invoke(state)  # warm-up (imports, compile caches)
+            samples = []
+            for _ in range(runs):
+                t0 = time.perf_counter()
+                out = g.invoke(state)
+                samples.append(time.perf_counter() - t0)
+                assert not out.get("error"), out.get("error")
+            p50, p95 = _percentiles(samples)
+            print(f"{name:<12} {p50:>9.3f} {p95:>9.3f}")
+    finally:
+        mock.patch.stopall()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    run(parser.parse_args().runs)
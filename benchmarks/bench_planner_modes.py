@@ -0,0 +1,120 @@
+"""
+Benchmark: two-call pipeline (planner JSON -> summarizer prose) vs the single
+structured call, on a stubbed LLM whose latency grows with tokens processed.
+"unchunked" is the two-call pipeline with long trips planned in one request
+instead of concurrent day-range chunks.
+
+Run: python -m benchmarks.bench_planner_modes --days 3 7 30 --runs 5
+     python -m benchmarks.bench_planner_modes --days 30 --rate-limit api.groq.com=0.5:5
+"""
+import argparse
+import json
+import re
+import statistics
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+from src.config import config
+from src.utils import rate_limit
+from src.utils.llm_cache import LLMResponseCache, MemoryBackend
+
+# rough hosted-LLM cost model
+ROUND_TRIP_S = 0.25        # network + queueing per request
+PREFILL_S_PER_TOKEN = 0.00005
+DECODE_S_PER_TOKEN = 0.002
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _plan(days: int, first: int = 1) -> dict:
+    return {
+        "trip_overview": "A relaxed mix of heritage walks and food stops.",
+        "days": [
+            {"day": d, "theme": f"Theme {d}", "activities": ["Fort visit", "Bazaar walk", "Street food"],
+             "description": "Explore the old city at an easy pace."}
+            for d in range(first, days + 1)
+        ],
+    }
+
+
+def _prose(days: int) -> str:
+    return "\n\n".join(
+        f"Day {d}: Theme {d}\n- Morning: fort visit and city views.\n- Afternoon: bazaar walk.\n- Evening: street food tour."
+        for d in range(1, days + 1)
+    )
+
+
+class FakeChatModel:
+    """Answers like the real model would for each prompt type, sleeping per the cost model."""
+    def __init__(self, days: int):
+        self.days = days
+
+    def invoke(self, messages, max_tokens=None, **kwargs):
+        prompt = "\n".join(m[1] for m in messages)
+        if '"itinerary_text"' in prompt:
+            body = dict(_plan(self.days), itinerary_text=_prose(self.days))
+            content = json.dumps(body)
+        elif "JSON plan" in prompt:
+            content = _prose(self.days)
+        else:
+            part = re.search(r"covers days (\d+) to (\d+)", prompt)
+            first, last = (int(part.group(1)), int(part.group(2))) if part else (1, self.days)
+            content = json.dumps(_plan(last, first))
+        n_in, n_out = _tokens(prompt), _tokens(content)
+        time.sleep(ROUND_TRIP_S + n_in * PREFILL_S_PER_TOKEN + n_out * DECODE_S_PER_TOKEN)
+        return SimpleNamespace(content=content, usage_metadata={"input_tokens": n_in, "output_tokens": n_out})
+
+    def stream(self, messages, max_tokens=None, **kwargs):
+        yield self.invoke(messages, max_tokens=max_tokens)
+
+
+def run(days_list, runs: int, limits: str = "") -> None:
+    from model import TravelState
+    from src.agents import planner, summarizer
+
+    print(f"{'days':>4} {'mode':<12} {'p50 (s)':>8} {'calls':>6} {'in tok':>7} {'out tok':>8}")
+    for days in days_list:
+        fake = FakeChatModel(days)
+        for mode in ("two_call", "unchunked", "single_call"):
+            samples = []
+            calls = tokens_in = tokens_out = 0
+            for i in range(runs):
+                # fresh cache per run so every run pays for its calls
+                cache = LLMResponseCache(MemoryBackend())
+                chunk_days = days if mode == "unchunked" else config.PLANNER_CHUNK_DAYS
+                # fresh buckets per run (unthrottled unless --rate-limit is given)
+                limiter = rate_limit.RateLimiter(rate_limit.parse_limits(limits))
+                with mock.patch.object(config, "PLANNER_CHUNK_DAYS", chunk_days), \
+                        mock.patch.object(rate_limit, "_limiter", limiter), \
+                        mock.patch.object(planner.groq, "llm", fake), mock.patch.object(summarizer.groq, "llm", fake), \
+                        mock.patch.object(planner.groq, "_cache", cache), mock.patch.object(summarizer.groq, "_cache", cache):
+                    before = [planner.groq.usage(), summarizer.groq.usage()]
+                    state = TravelState(city=f"Jaipur {i}", days=days, interests=["culture", "food"], budget="medium")
+                    t0 = time.perf_counter()
+                    if mode != "single_call":
+                        out = planner.planner_node(state)
+                        state = state.model_copy(update={"plan_outline": out["plan_outline"]})
+                        out = summarizer.summarize_node(state)
+                    else:
+                        out = planner.plan_and_summarize_node(state)
+                    samples.append(time.perf_counter() - t0)
+                    assert out.get("itinerary_text"), out
+                    after = [planner.groq.usage(), summarizer.groq.usage()]
+                for b, a in zip(before, after):
+                    calls += a["calls"] - b["calls"]
+                    tokens_in += a["input_tokens"] - b["input_tokens"]
+                    tokens_out += a["output_tokens"] - b["output_tokens"]
+            print(f"{days:>4} {mode:<12} {statistics.median(samples):>8.3f} {calls / runs:>6.1f}"
+                  f" {tokens_in / runs:>7.0f} {tokens_out / runs:>8.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, nargs="+", default=[3, 7])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--rate-limit", default="", help="RATE_LIMITS-style spec applied to the stub's calls")
+    args = parser.parse_args()
+    run(args.days, args.runs, args.rate_limit)
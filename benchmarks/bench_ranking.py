@@ -0,0 +1,76 @@
+"""
+Benchmark: previous substring interest filter vs the POI ranking engine on
+synthetic POI sets, timing and how many of the top 10 actually match the interests.
+
+Run: python -m benchmarks.bench_ranking --sizes 1000 5000 20000
+"""
+import argparse
+import random
+import time
+
+from src.utils.poi_index import split_kinds
+from src.utils.poi_ranking import interest_kinds, rank_pois
+
+KINDS = [
+    "foods,restaurants", "foods,cafes", "cultural,museums,interesting_places",
+    "historic,fortifications,interesting_places", "religion,hindu_temples,interesting_places",
+    "natural,gardens_and_parks", "shops,marketplaces", "tourism:museum", "historic:fort",
+    "tourism:attraction", "accomodations,other_hotels", "urban_environment,sculptures",
+]
+INTERESTS = ["food", "history", "culture"]
+
+
+def legacy_filter(places, interests):
+    """The previous attraction_node filter: substring match on the raw kinds string."""
+    interests = [i.lower() for i in interests]
+    filtered = [p for p in places if any(i in p.get("kinds", "") for i in interests)]
+    return filtered or places[:10]
+
+
+def synthetic(n: int, rng: random.Random):
+    return [
+        {
+            "xid": f"x{i}",
+            "name": f"Place {i}" if rng.random() > 0.15 else "",
+            "kinds": rng.choice(KINDS),
+            "lat": 26.9 + rng.uniform(-0.1, 0.1),
+            "lon": 75.8 + rng.uniform(-0.1, 0.1),
+            "dist": rng.uniform(0, 10000) if rng.random() > 0.3 else None,
+            "rate": rng.choice([0, 1, 2, 3, "3h"]),
+        }
+        for i in range(n)
+    ]
+
+
+def _quality(places, interests):
+    """(places matching any interest, distinct interests represented)"""
+    wanted = [interest_kinds(i) for i in interests]
+    tokens = [set(split_kinds(p.get("kinds"))) for p in places]
+    on_interest = sum(1 for t in tokens if any(w & t for w in wanted))
+    covered = sum(1 for w in wanted if any(w & t for t in tokens))
+    return on_interest, covered
+
+
+def run(sizes, repeats: int) -> None:
+    rng = random.Random(7)
+    print(f"{'POIs':>6} {'method':<8} {'ms':>8} {'top10 on-interest':>18} {'interests':>10} {'named':>6}")
+    for n in sizes:
+        places = synthetic(n, rng)
+        for name, fn in (("legacy", lambda: legacy_filter(places, INTERESTS)[:10]),
+                         ("ranked", lambda: rank_pois(places, INTERESTS, k=10))):
+            fn()
+            t0 = time.perf_counter()
+            for _ in range(repeats):
+                top = fn()
+            ms = (time.perf_counter() - t0) / repeats * 1000
+            named = sum(1 for p in top if p.get("name"))
+            on_interest, covered = _quality(top, INTERESTS)
+            print(f"{n:>6} {name:<8} {ms:>8.2f} {on_interest:>15}/10 {covered:>8}/{len(INTERESTS)} {named:>3}/10")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, args.repeats)
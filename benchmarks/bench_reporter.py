@@ -0,0 +1,55 @@
+"""
+Benchmark: itinerary PDF throughput (PDFs/sec) for 1-, 7- and 30-day itineraries:
+styles rebuilt per call (previous reporter), shared module styles, and reads of
+an already-built PDF from the blob store.
+
+Run: python -m benchmarks.bench_reporter --days 1 7 30 --seconds 2
+"""
+import argparse
+import tempfile
+import time
+from unittest import mock
+
+from src.agents import reporter
+
+
+def itinerary(days: int) -> str:
+    parts = []
+    for d in range(1, days + 1):
+        parts.append(f"Day {d}: Old city & bazaars")
+        parts.append("Start early to beat the crowds and the heat; the forts open at 8am.")
+        parts += [f"- Stop {i}: visit the landmark, then lunch at a local <thali> place" for i in range(1, 6)]
+        parts.append("")
+        parts.append("Evening: rooftop dinner with a view over the walls.")
+        parts.append("")
+    return "\n".join(parts)
+
+
+def _rate(fn, seconds: float) -> float:
+    fn()  # warm-up
+    n, t0 = 0, time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        fn()
+        n += 1
+    return n / (time.perf_counter() - t0)
+
+
+def run(days_list, seconds: float) -> None:
+    print(f"{'days':>5} {'pages':>6} {'per-call styles':>16} {'shared styles':>14} {'stored':>10}   (PDFs/sec)")
+    for days in days_list:
+        title, body = f"Itinerary for Jaipur ({days} days)", itinerary(days)
+        pdf = reporter._text_to_pdf_bytes(title, body)
+        pages = pdf.count(b"/Type /Page\n") or pdf.count(b"/Type /Page")
+        fresh = _rate(lambda: reporter._text_to_pdf_bytes(title, body, reporter._build_styles()), seconds)
+        shared = _rate(lambda: reporter._text_to_pdf_bytes(title, body), seconds)
+        stored = _rate(lambda: reporter.render_pdf(title, body), seconds)
+        print(f"{days:>5} {pages:>6} {fresh:>16.1f} {shared:>14.1f} {stored:>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, nargs="+", default=[1, 7, 30])
+    parser.add_argument("--seconds", type=float, default=2.0, help="time spent per measurement")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp, mock.patch.object(reporter.config, "PDF_STORE_DIR", tmp):
+        run(args.days, args.seconds)
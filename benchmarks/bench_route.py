@@ -0,0 +1,64 @@
+"""
+Benchmark: previous greedy ordering vs the route optimizer on random duration matrices.
+
+Run: python -m benchmarks.bench_route --sizes 10 25 50 100 200
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.utils.route_optimizer import solve_route, tour_cost
+
+
+def legacy_greedy(durations):
+    """The previous pure-Python nearest-neighbour pass from osrm_client."""
+    n = len(durations)
+    visited = [0]
+    remaining = set(range(1, n))
+    while remaining:
+        last = visited[-1]
+        next_idx = min(remaining, key=lambda x: durations[last][x] if durations[last][x] is not None else float('inf'))
+        visited.append(next_idx)
+        remaining.remove(next_idx)
+    return visited
+
+
+def random_matrix(n: int, rng: np.random.Generator) -> np.ndarray:
+    # city-scale points (~15 km box), 30 km/h average, mildly asymmetric like real road data
+    pts = rng.random((n, 2)) * 15000.0
+    dist = np.linalg.norm(pts[:, None, :] - pts[None, :, :], axis=2) * 1.3
+    return dist / (30000.0 / 3600.0) * (1.0 + 0.1 * rng.random((n, n)))
+
+
+def main(sizes, trials: int, budget: float) -> None:
+    rng = np.random.default_rng(42)
+    print(f"{'stops':>5} {'greedy (min)':>13} {'optimized (min)':>16} {'saving':>7} {'greedy ms':>10} {'opt ms':>8}")
+    for n in sizes:
+        g_cost = o_cost = g_time = o_time = 0.0
+        for _ in range(trials):
+            D = random_matrix(n, rng)
+            as_lists = D.tolist()
+            t0 = time.perf_counter()
+            order = legacy_greedy(as_lists)
+            g_time += time.perf_counter() - t0
+            g_cost += tour_cost(D, np.array(order), closed=False)
+
+            t0 = time.perf_counter()
+            res = solve_route(D, time_budget_s=budget)
+            o_time += time.perf_counter() - t0
+            o_cost += res["total_duration"]
+        saving = 1.0 - o_cost / g_cost
+        print(
+            f"{n:>5} {g_cost / trials / 60:>13.1f} {o_cost / trials / 60:>16.1f} {saving:>7.1%}"
+            f" {g_time / trials * 1000:>10.2f} {o_time / trials * 1000:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 25, 50, 100, 200])
+    parser.add_argument("--trials", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=0.2, help="optimizer time budget per tour (s)")
+    args = parser.parse_args()
+    main(args.sizes, args.trials, args.budget)
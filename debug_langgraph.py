@@ -60,8 +60,8 @@ def debug_graph():
                     if "itinerary_text" in node_output:
                         text = node_output["itinerary_text"]
                         print(f"  📄 Itinerary text: {len(text)} chars")
-                    if "itinerary_pdf_bytes" in node_output:
-                        print(f"  📑 PDF generated")
+                    if "itinerary_pdf_key" in node_output:
+                        print(f"  📑 PDF registered: {node_output['itinerary_pdf_key'][:12]}")
             print("-" * 60)
         
         print("\n" + "="*60)
@@ -77,7 +77,7 @@ def debug_graph():
         print(f"  Weather data: {'✅' if final_state.get('weather_data') else '❌'}")
         print(f"  Route plan: {'✅' if final_state.get('route_plan') else '❌'}")
         print(f"  Itinerary text: {'✅' if final_state.get('itinerary_text') else '❌'}")
-        print(f"  PDF bytes: {'✅' if final_state.get('itinerary_pdf_bytes') else '❌'}")
+        print(f"  PDF key: {final_state.get('itinerary_pdf_key') or '❌'}")
         
         if final_state.get("error"):
             print(f"\n❌ FINAL ERROR: {final_state['error']}")
@@ -1,32 +1,100 @@
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import START,END, StateGraph
+from langgraph.types import Send
 from model import TravelState
-from src.agents.planner import planner_node
-from src.agents.attraction import attraction_node
-from src.agents.weather import weather_node
-from src.agents.route import route_node
-from src.agents.summarizer import summarize_node
+from src.config import config
+from src.agents.planner import planner_node, aplanner_node, plan_and_summarize_node, aplan_and_summarize_node
+from src.agents.attraction import attraction_node, aattraction_node
+from src.agents.weather import weather_node, aweather_node
+from src.agents.route import route_node, aroute_node
+from src.agents.summarizer import summarize_node, asummarize_node
 from src.agents.reporter import reporter_node
+from src.agents.multi_city import city_node, acity_node, merge_cities_node
+from src.utils.trip_legs import trip_legs
 
 
-def build_graph():
+def _node(func, afunc=None):
+    """Sync node with an optional native-async twin: `invoke` runs func, `ainvoke` awaits afunc."""
+    if afunc is None:
+        return func
+    return RunnableLambda(func, afunc=afunc, name=func.__name__)
+
+
+def _fan_out_places(state: TravelState):
+    """One city: the attraction and weather nodes. Several: one "city" run per leg, in parallel."""
+    legs = trip_legs(state.city, state.days)
+    if len(legs) <= 1:
+        return ["attraction", "weather"]
+    return [
+        Send("city", state.model_copy(update={"city": leg["city"], "days": leg["days"], "trip_leg": leg, "city_results": []}))
+        for leg in legs
+    ]
+
+
+def build_graph(parallel: bool = True, planner_mode: str = None):
+    """
+    parallel: fan-out/fan-in topology (False = original sequential chain).
+    planner_mode: "two_call" (planner then summarizer) or "single_call" (one LLM call
+    produces plan and prose); defaults to config.PLANNER_MODE.
+
+    Multi-city destinations ("Jaipur, Ayodhya") fan out to one attraction/weather/route
+    sub-pipeline per city in the parallel topology; the sequential chain plans the first city only.
+    """
+    single_call = (planner_mode or config.PLANNER_MODE) == "single_call"
+
     graph = StateGraph(TravelState)
-    graph.add_node("planner",planner_node)
-    graph.add_node("attraction",attraction_node)
-    graph.add_node("weather", weather_node)
-    graph.add_node("route", route_node)
-    graph.add_node("summarizer", summarize_node)
+    if single_call:
+        graph.add_node("planner", _node(plan_and_summarize_node, aplan_and_summarize_node))
+    else:
+        graph.add_node("planner", _node(planner_node, aplanner_node))
+        graph.add_node("summarizer", _node(summarize_node, asummarize_node))
+    graph.add_node("attraction", _node(attraction_node, aattraction_node))
+    graph.add_node("weather", _node(weather_node, aweather_node))
+    graph.add_node("route", _node(route_node, aroute_node))
+    # CPU-bound; under ainvoke LangGraph runs it in a worker thread
     graph.add_node("reporter", reporter_node)
+    if parallel:
+        graph.add_node("city", _node(city_node, acity_node))
+        graph.add_node("merge_cities", merge_cities_node)
+
+    # node that produces itinerary_text for the reporter
+    writer = "planner" if single_call else "summarizer"
+
+    if not parallel:
+        # original strictly sequential chain (kept for benchmarking/debugging)
+        graph.add_edge(START,'planner')
+        graph.add_edge("planner", "attraction")
+        graph.add_edge("attraction", "weather")
+        graph.add_edge("weather", "route")
+        if single_call:
+            graph.add_edge("route", "reporter")
+        else:
+            graph.add_edge("route", "summarizer")
+            graph.add_edge("summarizer", "reporter")
+        graph.add_edge("reporter", END)
+        return graph.compile()
+
+    #fan-out: planner, attraction and weather only need the user inputs
+    graph.add_edge(START, "planner")
+    graph.add_conditional_edges(START, _fan_out_places, ["attraction", "weather", "city"])
+
+    # LLM branch
+    if not single_call:
+        graph.add_edge("planner", "summarizer")
+    graph.add_edge(writer, "reporter")
+
+    # POI branch
+    graph.add_edge("attraction", "route")
+    # multi-city: per-city runs join in the merge node
+    graph.add_edge("city", "merge_cities")
 
-    #define the edges
-    graph.add_edge(START,'planner')
-    graph.add_edge("planner", "attraction")
-    graph.add_edge("attraction", "weather")
-    graph.add_edge("weather", "route")
-    graph.add_edge("route", "summarizer")
-    graph.add_edge("summarizer", "reporter")
+    #fan-in: the run finishes once every branch has reached END
     graph.add_edge("reporter", END)
+    graph.add_edge("route", END)
+    graph.add_edge("weather", END)
+    graph.add_edge("merge_cities", END)
 
     return graph.compile()
 
 # instantiate compiled graph for import elsewhere
-trip_graph = build_graph()
\ No newline at end of file
+trip_graph = build_graph()
@@ -0,0 +1,141 @@
+"""
+Bulk-load POIs into the offline index (config.POI_INDEX_PATH) used by fetch_attraction.
+
+  python ingest_pois.py Jaipur "New Delhi" --radius-km 15   # live Overpass + OpenTripMap per city
+  python ingest_pois.py --overpass-json jaipur_osm.json     # Overpass/OSM JSON dump
+  python ingest_pois.py --otm-json otm_responses.json       # saved OpenTripMap /radius responses
+
+Without city arguments the POI_REGIONS setting is used. New POIs are merged into
+the existing index unless --replace is given.
+"""
+import argparse
+import json
+import math
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import config
+from src.utils import opentripmap
+from src.utils.poi_index import M_PER_DEG, POIIndex
+
+Region = Tuple[float, float, float, float]
+
+
+def _bbox_around(lat: float, lon: float, radius_m: float) -> Region:
+    dlat = radius_m / M_PER_DEG
+    dlon = radius_m / (M_PER_DEG * max(math.cos(math.radians(lat)), 0.01))
+    return (lat - dlat, lon - dlon, lat + dlat, lon + dlon)
+
+
+def _bbox_of(records: List[Dict[str, Any]]) -> Optional[Region]:
+    points = [(r["lat"], r["lon"]) for r in records if r.get("lat") is not None and r.get("lon") is not None]
+    if not points:
+        return None
+    lats, lons = zip(*points)
+    return (min(lats), min(lons), max(lats), max(lons))
+
+
+def _parse_region(text: Optional[str]) -> Optional[Region]:
+    if not text:
+        return None
+    south, west, north, east = (float(v) for v in text.split(","))
+    return (south, west, north, east)
+
+
+def load_city(city: str, radius_km: float, limit: int) -> Tuple[List[Dict[str, Any]], Optional[Region]]:
+    """
+    Live POIs around `city` and the region they fully cover. The region is None when
+    no source answered or a source was cut off at `limit`: the records are still worth
+    keeping, but fetch_attraction must keep going to the live APIs for that area.
+    """
+    geo = opentripmap.bbox_from_city(city)
+    lat, lon = geo["lat"], geo["lon"]
+    radius_m = radius_km * 1000
+    records: List[Dict[str, Any]] = []
+    sources = [("overpass", opentripmap.fetch_overpass_pois)]
+    if opentripmap.OTM_KEY:
+        sources.append(("opentripmap", opentripmap.fetch_otm_pois))
+    succeeded, truncated = [], []
+    for name, fetch in sources:
+        try:
+            found = fetch(lat, lon, radius_m=radius_m, limit=limit)
+        except Exception as e:
+            print(f"[ingest] {name} failed for {city}: {e}")
+            continue
+        succeeded.append(name)
+        if len(found) >= limit:
+            truncated.append(name)
+        records += found
+    if not succeeded or truncated:
+        reason = f"{', '.join(truncated)} hit --limit {limit}" if truncated else "no source answered"
+        print(f"[ingest] {city}: partial ({reason}); area left uncovered")
+        return records, None
+    # Overpass caps its own radius; only claim what was actually queried
+    covered = min(radius_m, 30000)
+    return records, _bbox_around(lat, lon, covered)
+
+
+def load_overpass_dump(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return opentripmap.parse_overpass_pois(data)
+
+
+def load_otm_dump(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    # a single /radius response (list of places) or a list of them
+    responses = data if data and isinstance(data[0], list) else [data]
+    return [p for places in responses for p in opentripmap.normalize_otm_pois(places)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("cities", nargs="*", help="cities to load live (default: POI_REGIONS)")
+    parser.add_argument("--radius-km", type=float, default=15)
+    parser.add_argument("--limit", type=int, default=2000, help="max POIs per source and city")
+    parser.add_argument("--overpass-json", action="append", default=[], help="Overpass JSON dump file")
+    parser.add_argument("--otm-json", action="append", default=[], help="saved OpenTripMap /radius responses")
+    parser.add_argument("--region", help="south,west,north,east covered by the dump files (default: their extent)")
+    parser.add_argument("--index", default=config.POI_INDEX_PATH)
+    parser.add_argument("--replace", action="store_true", help="rebuild instead of merging into the existing index")
+    args = parser.parse_args()
+
+    records: List[Dict[str, Any]] = []
+    regions: List[Region] = []
+
+    dump_records: List[Dict[str, Any]] = []
+    for path in args.overpass_json:
+        dump_records += load_overpass_dump(path)
+    for path in args.otm_json:
+        dump_records += load_otm_dump(path)
+    if dump_records:
+        region = _parse_region(args.region) or _bbox_of(dump_records)
+        records += dump_records
+        regions.append(region)
+        print(f"[ingest] {len(dump_records)} POIs from dump files, region {region}")
+
+    cities = args.cities or ([] if dump_records else config.POI_REGIONS)
+    for city in cities:
+        city_records, region = load_city(city, args.radius_km, args.limit)
+        print(f"[ingest] {city}: {len(city_records)} POIs")
+        records += city_records
+        if region is not None:
+            regions.append(region)
+
+    if not records:
+        parser.error("nothing to ingest: pass cities, --overpass-json/--otm-json, or set POI_REGIONS")
+
+    t0 = time.perf_counter()
+    if os.path.exists(args.index) and not args.replace:
+        index = POIIndex.load(args.index).merged(records, regions)
+    else:
+        index = POIIndex.build(records, regions, cell_deg=config.POI_INDEX_CELL_DEG)
+    index.save(args.index)
+    print(f"[ingest] index has {len(index)} POIs, {len(index.kind_vocab)} kinds, {len(index.regions)} regions "
+          f"-> {args.index} ({time.perf_counter() - t0:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,38 @@
-from typing import List, Dict, Any, Optional
+import operator
+from typing import Annotated, List, Dict, Any, Optional
 from pydantic import BaseModel
 
+
+def _keep_latest(current: Optional[str], update: Optional[str]) -> Optional[str]:
+    """Reducer for fields written by parallel branches: last non-empty write wins."""
+    return update if update is not None else current
+
+
+def _join_errors(current: Optional[str], update: Optional[str]) -> Optional[str]:
+    """Reducer for `error`: keep every branch's message instead of raising on concurrent writes."""
+    if not current:
+        return update
+    if not update or update in current:
+        return current
+    return f"{current}; {update}"
+
+
 class DayPlan(BaseModel):
     day: int
     theme: str
     activities: List[str]
     descriptions: Optional[str] = None
+    # the planner prompt asks for "description"
+    description: Optional[str] = None
+
+class TripPlan(BaseModel):
+    """Planner JSON output (the `plan_outline` state field)."""
+    trip_overview: str = ""
+    days: List[DayPlan]
+
+class PlanWithItinerary(TripPlan):
+    """Single-call planner output: the structured plan plus the readable itinerary."""
+    itinerary_text: str
 
 class TravelState(BaseModel):
     # Inputs
@@ -22,17 +49,25 @@ class TravelState(BaseModel):
     attractions: Optional[List[Dict[str, Any]]] = None
     weather_data: Optional[Dict[str, Any]] = None
     # Route plan structure returned by OSRM helper is a dict like
-    # { "ordered": [{"lat":..., "lon":...}, ...], "order_indices": [...] }
+    # { "ordered": [{"lat":..., "lon":...}, ...], "order_indices": [...],
+    #   "days": [{"day": 1, "ordered": [...], "order_indices": [...], "total_duration": ...}, ...] }
     # Align type accordingly so Pydantic validation matches actual data.
     route_plan: Optional[Dict[str, Any]] = None
 
     # Final outputs
     itinerary_text: Optional[str] = None
-    itinerary_pdf_bytes: Optional[bytes] = None
+    # key of the PDF in the blob store (reporter.get_pdf); the bytes never travel through the graph
+    itinerary_pdf_key: Optional[str] = None
+
+    # Multi-city trips: each per-city run carries its leg ({"city", "days", "first_day"})
+    # and appends its attractions/route/weather to city_results for the merge node
+    trip_leg: Optional[Dict[str, Any]] = None
+    city_results: Annotated[List[Dict[str, Any]], operator.add] = []
 
     # Memory & meta
     user_memory: Optional[Dict[str, Any]] = None
     recommendations: Optional[List[str]] = None
 
-    status: Optional[str] = "initialized"
-    error: Optional[str] = None
\ No newline at end of file
+    # planner/attraction/weather run in the same superstep, so these need reducers
+    status: Annotated[Optional[str], _keep_latest] = "initialized"
+    error: Annotated[Optional[str], _join_errors] = None
@@ -1,30 +1,42 @@
 from typing import Dict, Any
 from model import TravelState
-from src.utils.opentripmap import fetch_attraction, bbox_from_city
+from src.config import config
+from src.utils.opentripmap import DEFAULT_KINDS, fetch_attraction, afetch_attraction
+from src.utils.poi_ranking import query_kinds, rank_pois
 
 def attraction_node(state: TravelState) -> Dict[str, Any]:
-    if not state.plan_outline or not state.city:
-        return {"error": "attraction: missing plan_outline or city"}
+    # runs in parallel with the planner, so only the user inputs are available here
+    if not state.city:
+        return {"error": "attraction: missing city"}
 
     try:
-        # fetch many POIs around the city (smaller radius/limit for speed; fallbacks will broaden if needed)
-        raw_places = fetch_attraction(state.city, radius_m=8000, limit=20)
+        # fetch a wider pool than we keep so the ranking has something to choose from, including the
+        # categories (food, shops, ...) the interests need beyond the default sightseeing kinds
+        kinds = query_kinds(DEFAULT_KINDS, state.interests or [])
+        raw_places = fetch_attraction(state.city, radius_m=config.ATTRACTION_RADIUS_M, kinds=kinds,
+                                      limit=config.ATTRACTION_FETCH_LIMIT)
 
         if not raw_places:
             return {"error": f"attraction: no attractions found near {state.city}"}
 
-        # filter by interests: simple keyword match on 'kinds'
-        interests = [i.lower() for i in (state.interests or [])]
-        filtered = []
-        for p in raw_places:
-            kinds = p.get("kinds", "")
-            if any(interest in kinds for interest in interests):
-                filtered.append(p)
+        ranked = rank_pois(raw_places, state.interests or [], k=config.ATTRACTION_TOP_K)
+        return {"attractions": ranked, "status": "attraction_completed"}
+    except Exception as e:
+        return {"error": f"attraction_node error: {e}"}
 
-        # If filtered empty, fallback to top N places
-        if not filtered:
-            filtered = raw_places[:10]
+async def aattraction_node(state: TravelState) -> Dict[str, Any]:
+    if not state.city:
+        return {"error": "attraction: missing city"}
+
+    try:
+        kinds = query_kinds(DEFAULT_KINDS, state.interests or [])
+        raw_places = await afetch_attraction(state.city, radius_m=config.ATTRACTION_RADIUS_M, kinds=kinds,
+                                             limit=config.ATTRACTION_FETCH_LIMIT)
+
+        if not raw_places:
+            return {"error": f"attraction: no attractions found near {state.city}"}
 
-        return {"attractions": filtered, "status": "attraction_completed"}
+        ranked = rank_pois(raw_places, state.interests or [], k=config.ATTRACTION_TOP_K)
+        return {"attractions": ranked, "status": "attraction_completed"}
     except Exception as e:
         return {"error": f"attraction_node error: {e}"}
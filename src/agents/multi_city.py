@@ -0,0 +1,142 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from model import TravelState
+from src.agents.attraction import attraction_node, aattraction_node
+from src.agents.route import route_node, aroute_node
+from src.utils.opentripmap import bbox_from_city, abbox_from_city
+from src.utils.open_meteo import MAX_FORECAST_DAYS, fetch_weather_by_coords, afetch_weather_by_coords
+
+_weather_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="city-weather")
+
+
+def _leg(state: TravelState) -> Dict[str, Any]:
+    return state.trip_leg or {"city": state.city, "days": state.days or 1, "first_day": 1}
+
+
+def _leg_window(leg: Dict[str, Any]):
+    """Forecast days to request and the slice of them that falls on this leg."""
+    start = leg["first_day"] - 1
+    end = min(start + leg["days"], MAX_FORECAST_DAYS)
+    return end, slice(start, end)
+
+
+def _slice_daily(daily: Dict[str, Any], window: slice) -> Dict[str, Any]:
+    return {k: (v[window] if isinstance(v, list) else v) for k, v in (daily or {}).items()}
+
+
+def _leg_weather(leg: Dict[str, Any]) -> Dict[str, Any]:
+    days, window = _leg_window(leg)
+    if days <= window.start:
+        return {}
+    try:
+        geo = bbox_from_city(leg["city"])
+        weather = fetch_weather_by_coords(geo.get("lat"), geo.get("lon"), days=days)
+        return {"weather_data": _slice_daily(weather.get("daily", {}), window)}
+    except Exception as e:
+        return {"error": f"weather: {e}"}
+
+
+async def _aleg_weather(leg: Dict[str, Any]) -> Dict[str, Any]:
+    days, window = _leg_window(leg)
+    if days <= window.start:
+        return {}
+    try:
+        geo = await abbox_from_city(leg["city"])
+        weather = await afetch_weather_by_coords(geo.get("lat"), geo.get("lon"), days=days)
+        return {"weather_data": _slice_daily(weather.get("daily", {}), window)}
+    except Exception as e:
+        return {"error": f"weather: {e}"}
+
+
+def _leg_result(leg: Dict[str, Any], places: Dict[str, Any], routed: Dict[str, Any],
+                weather: Dict[str, Any]) -> Dict[str, Any]:
+    errors = [f"{leg['city']}: {part['error']}" for part in (places, routed, weather) if part.get("error")]
+    return {
+        **leg,
+        "attractions": places.get("attractions") or [],
+        "route_plan": routed.get("route_plan"),
+        "weather_data": weather.get("weather_data"),
+        "errors": errors,
+    }
+
+
+def city_node(state: TravelState) -> Dict[str, Any]:
+    """
+    One leg of a multi-city trip (the state is a per-city copy sent by the graph):
+    attractions and weather run concurrently, then the leg's days are routed.
+    """
+    leg = _leg(state)
+    weather_future = _weather_executor.submit(_leg_weather, leg)
+    places = attraction_node(state)
+    routed = {}
+    if places.get("attractions"):
+        routed = route_node(state.model_copy(update={"attractions": places["attractions"]}))
+    return {"city_results": [_leg_result(leg, places, routed, weather_future.result())]}
+
+
+async def acity_node(state: TravelState) -> Dict[str, Any]:
+    leg = _leg(state)
+    weather_task = asyncio.ensure_future(_aleg_weather(leg))
+    places = await aattraction_node(state)
+    routed = {}
+    if places.get("attractions"):
+        routed = await aroute_node(state.model_copy(update={"attractions": places["attractions"]}))
+    return {"city_results": [_leg_result(leg, places, routed, await weather_task)]}
+
+
+def merge_cities_node(state: TravelState) -> Dict[str, Any]:
+    """Stitch the per-city results into trip-wide attractions, route_plan and weather_data."""
+    attractions: List[Dict[str, Any]] = []
+    day_routes: List[Dict[str, Any]] = []
+    ordered: List[Dict[str, Any]] = []
+    order_indices: List[int] = []
+    weather: Dict[str, List[Any]] = {}
+    sources = []
+    total_duration = total_distance = 0.0
+    errors: List[str] = []
+
+    for result in sorted(state.city_results or [], key=lambda r: r["first_day"]):
+        city, offset = result["city"], result["first_day"] - 1
+        # route indices point into the merged attraction list
+        base = len(attractions)
+        attractions.extend(dict(a, city=city) for a in result["attractions"])
+
+        plan = result.get("route_plan") or {}
+        for day in plan.get("days") or []:
+            day_routes.append(dict(
+                day, day=day["day"] + offset, city=city,
+                order_indices=[base + i for i in day.get("order_indices") or []],
+            ))
+        ordered.extend(plan.get("ordered") or [])
+        order_indices.extend(base + i for i in plan.get("order_indices") or [])
+        total_duration += plan.get("total_duration") or 0
+        total_distance += plan.get("total_distance") or 0
+        if plan.get("matrix_source") and plan["matrix_source"] not in sources:
+            sources.append(plan["matrix_source"])
+
+        daily = result.get("weather_data") or {}
+        if daily.get("time"):
+            for key, values in daily.items():
+                if isinstance(values, list):
+                    weather.setdefault(key, []).extend(values)
+            weather.setdefault("city", []).extend([city] * len(daily["time"]))
+        errors.extend(result["errors"])
+
+    update: Dict[str, Any] = {
+        "attractions": attractions or None,
+        "route_plan": {
+            "ordered": ordered,
+            "order_indices": order_indices,
+            "days": day_routes,
+            "total_duration": total_duration,
+            "total_distance": total_distance,
+            "matrix_source": "+".join(sources) or None,
+        } if ordered else None,
+        "weather_data": weather or None,
+        "status": "cities_completed",
+    }
+    if errors:
+        update["error"] = "; ".join(errors)
+    return update
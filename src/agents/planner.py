@@ -1,9 +1,17 @@
-import json
-from typing import Dict, Any
-from model import TravelState
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from pydantic import ValidationError
+from model import TravelState, DayPlan, PlanWithItinerary
+from src.agents.summarizer import summarize_node, asummarize_node
+from src.config import config
 from src.utils.groq_client import GroqClient
+from src.utils.json_repair import IncrementalJSONParser, parse_partial_json
+from src.utils.trip_legs import describe_legs, trip_legs
 
 groq = GroqClient(model='llama-3.1-8b-instant')
+# long trips are planned as concurrent day-range chunks
+_chunk_executor = ThreadPoolExecutor(max_workers=max(1, config.PLANNER_MAX_CONCURRENCY), thread_name_prefix="planner-chunk")
 
 planner_prompt_template = """ 
     Create a structured travel itinerary for the user.
@@ -24,29 +32,272 @@ planner_prompt_template = """
     5) Use concise descriptions.           
 """
 
-def planner_node(state:TravelState) ->Dict[str, Any]:
-    if not state.city or not state.days or not state.interests:
-        return{'error': "planner: missing required inputs(city/days/interests)"}
-    
-    prompt = planner_prompt_template.format(
-        city= state.city,
+continuation_prompt_template = """ 
+    Continue a structured travel itinerary.
+
+    City: {city},
+    Total duration (days): {days},
+    Interests: {interests},
+    Budget level: {budget},
+    Already planned: {planned}
+
+    Rules:
+    1) Output ONLY valid JSON of the form {{"days": [...]}}.
+    2) Include ONLY these days: {missing}. Each object has keys: "day" (int), "theme" (string),
+        "activities" (list of string), "description" (string)
+    3) Provide 2-3 activities per day, aligned to interests, without repeating planned themes.
+    4) Do not mention hotel/flight details.
+    5) Use concise descriptions.
+"""
+
+chunk_prompt_template = """ 
+    Create part of a structured travel itinerary for the user.
+
+    City: {city},
+    Total duration (days): {days},
+    Interests: {interests},
+    Budget level: {budget},
+    This part covers days {first} to {last}; the other days are planned separately.
+
+    Rules:
+    1) Output ONLY valid JSON.
+    2) The JSON must have keys:
+    "trip_overview": string (one or two sentences about the whole trip),
+    "days": list of objects for days {first} to {last} only, with keys: "day" (int), "theme" (string),
+        "activities" (list of string), "description" (string)
+    3) Provide 2-3 activities per day, aligned to interests.
+    4) Vary themes so this part fits into a {days}-day trip.
+    5) Do not mention hotel/flight details.
+    6) Use concise descriptions.
+"""
+
+single_call_prompt_template = """ 
+    Create a travel itinerary for the user.
+
+    City: {city},
+    Duration (days): {days},
+    Interests: {interests},
+    Budget level: {budget},
+
+    Rules:
+    1) Output ONLY valid JSON.
+    2) The JSON must have keys:
+    "trip_overview": string,
+    "days": list of objects with keys: "day" (int), "theme" (string),
+        "activities" (list of string), "description" (string),
+    "itinerary_text": string — a human-readable day-by-day itinerary written from "days",
+        with a "Day N: <theme>" heading per day and "- " bullets for morning/afternoon/evening suggestions
+    3) Provide 2-3 activities per day, aligned to interests.
+    4) Do not mention hotel/flight details.
+    5) Use concise descriptions.
+"""
+
+def _city_label(state:TravelState) -> str:
+    # multi-city trips tell the model which days belong to which city
+    legs = trip_legs(state.city, state.days)
+    return describe_legs(legs) if len(legs) > 1 else state.city
+
+def _build_prompt(state:TravelState) -> str:
+    return planner_prompt_template.format(
+        city= _city_label(state),
         days=state.days,
         interests= ','.join(state.interests),
         budget = state.budget or "medium"
     )
 
-    resp_text = groq.invoke(prompt=prompt)
+def _valid_days(raw_days: Any) -> List[Dict[str, Any]]:
+    """Keep the day objects that validate as DayPlan (first one wins per day number)."""
+    days: Dict[int, Dict[str, Any]] = {}
+    for raw in raw_days if isinstance(raw_days, list) else []:
+        try:
+            day = DayPlan.model_validate(raw)
+        except ValidationError:
+            # typically the last day of a truncated response
+            continue
+        days.setdefault(day.day, day.model_dump(exclude_none=True))
+    return [days[d] for d in sorted(days)]
 
+def _extract_plan(resp_text:str) -> Optional[Dict[str, Any]]:
+    """Repair and validate planner output; None when nothing usable came back."""
     try:
-        #attempt to extract json
-        start = resp_text.find("{")
-        end = resp_text.rfind('}') + 1 
-        json_str = resp_text[start:end]
-        plan = json.loads(json_str)
+        raw = parse_partial_json(resp_text or "")
+    except ValueError:
+        return None
+    if not isinstance(raw, dict):
+        return None
+    return {"trip_overview": str(raw.get("trip_overview") or ""), "days": _valid_days(raw.get("days"))}
+
+def _missing_days(plan:Dict[str, Any], total:int) -> List[int]:
+    have = {d["day"] for d in plan["days"]}
+    return [d for d in range(1, total + 1) if d not in have]
+
+def _build_continuation_prompt(state:TravelState, plan:Dict[str, Any], missing:List[int]) -> str:
+    planned = "; ".join(f"Day {d['day']}: {d['theme']}" for d in plan["days"]) or "nothing yet"
+    return continuation_prompt_template.format(
+        city= _city_label(state),
+        days=state.days,
+        interests= ','.join(state.interests),
+        budget = state.budget or "medium",
+        planned=planned,
+        missing=", ".join(map(str, missing)),
+    )
+
+def _merge_days(plan:Dict[str, Any], resp_text:str, missing:List[int]) -> None:
+    extra = _extract_plan(resp_text)
+    if not extra:
+        return
+    wanted = set(missing)
+    days = plan["days"] + [d for d in extra["days"] if d["day"] in wanted]
+    plan["days"] = sorted(days, key=lambda d: d["day"])
 
-    except Exception as e:
+def _parse_plan(resp_text:str) ->Dict[str, Any]:
+    plan = _extract_plan(resp_text)
+    if not plan or not plan["days"]:
         return{
-            "error": f"planner: failed to parse json output- {e}",
+            "error": "planner: failed to parse json output- no valid day plans found",
             "llm_output": resp_text
         }
     return {"plan_outline":plan, "status":"planner_completed"}
+
+def _day_chunks(total:int) -> List[List[int]]:
+    size = max(1, config.PLANNER_CHUNK_DAYS)
+    return [list(range(first, min(first + size, total + 1))) for first in range(1, total + 1, size)]
+
+def _build_chunk_prompt(state:TravelState, chunk:List[int]) -> str:
+    return chunk_prompt_template.format(
+        city= _city_label(state),
+        days=state.days,
+        interests= ','.join(state.interests),
+        budget = state.budget or "medium",
+        first=chunk[0],
+        last=chunk[-1],
+    )
+
+def _stitch_chunks(chunks:List[List[int]], responses:List[str]) ->Dict[str, Any]:
+    """Merge per-range responses into one plan_outline; each chunk only contributes its own days."""
+    plan: Dict[str, Any] = {"trip_overview": "", "days": []}
+    for chunk, resp_text in zip(chunks, responses):
+        part = _extract_plan(resp_text)
+        if not part:
+            continue
+        plan["trip_overview"] = plan["trip_overview"] or part["trip_overview"]
+        wanted = set(chunk)
+        plan["days"].extend(d for d in part["days"] if d["day"] in wanted)
+    if not plan["days"]:
+        return{
+            "error": "planner: failed to parse json output- no valid day plans found",
+            "llm_output": "\n".join(responses)
+        }
+    plan["days"].sort(key=lambda d: d["day"])
+    return {"plan_outline":plan, "status":"planner_completed"}
+
+def planner_node(state:TravelState) ->Dict[str, Any]:
+    if not state.city or not state.days or not state.interests:
+        return{'error': "planner: missing required inputs(city/days/interests)"}
+
+    if state.days <= config.PLANNER_CHUNK_DAYS:
+        result = _parse_plan(groq.invoke(prompt=_build_prompt(state)))
+    else:
+        chunks = _day_chunks(state.days)
+        prompts = [_build_chunk_prompt(state, chunk) for chunk in chunks]
+        result = _stitch_chunks(chunks, list(_chunk_executor.map(groq.invoke, prompts)))
+    _continue_plan(state, result)
+    return result
+
+def _continue_plan(state:TravelState, result:Dict[str, Any]) -> None:
+    # truncated output: ask only for the days that did not survive instead of re-running the plan
+    for _ in range(config.PLANNER_MAX_CONTINUATIONS):
+        missing = _missing_days(result["plan_outline"], state.days) if "plan_outline" in result else []
+        if not missing:
+            break
+        cont = groq.invoke(prompt=_build_continuation_prompt(state, result["plan_outline"], missing))
+        _merge_days(result["plan_outline"], cont, missing)
+
+async def aplanner_node(state:TravelState) ->Dict[str, Any]:
+    if not state.city or not state.days or not state.interests:
+        return{'error': "planner: missing required inputs(city/days/interests)"}
+
+    if state.days <= config.PLANNER_CHUNK_DAYS:
+        result = _parse_plan(await groq.ainvoke(prompt=_build_prompt(state)))
+    else:
+        chunks = _day_chunks(state.days)
+        sem = asyncio.Semaphore(max(1, config.PLANNER_MAX_CONCURRENCY))
+
+        async def plan_chunk(chunk:List[int]) -> str:
+            async with sem:
+                return await groq.ainvoke(prompt=_build_chunk_prompt(state, chunk))
+
+        responses = await asyncio.gather(*(plan_chunk(chunk) for chunk in chunks))
+        result = _stitch_chunks(chunks, list(responses))
+    await _acontinue_plan(state, result)
+    return result
+
+async def _acontinue_plan(state:TravelState, result:Dict[str, Any]) -> None:
+    for _ in range(config.PLANNER_MAX_CONTINUATIONS):
+        missing = _missing_days(result["plan_outline"], state.days) if "plan_outline" in result else []
+        if not missing:
+            break
+        cont = await groq.ainvoke(prompt=_build_continuation_prompt(state, result["plan_outline"], missing))
+        _merge_days(result["plan_outline"], cont, missing)
+
+def _build_single_call_prompt(state:TravelState) -> str:
+    return single_call_prompt_template.format(
+        city= _city_label(state),
+        days=state.days,
+        interests= ','.join(state.interests),
+        budget = state.budget or "medium"
+    )
+
+def _parse_plan_with_itinerary(resp_text:str) ->Dict[str, Any]:
+    try:
+        result = PlanWithItinerary.model_validate(parse_partial_json(resp_text))
+    except (ValueError, ValidationError) as e:
+        return{
+            "error": f"planner: invalid single-call output- {e}",
+            "llm_output": resp_text
+        }
+    plan = result.model_dump(exclude={"itinerary_text"}, exclude_none=True)
+    return {
+        "plan_outline": plan,
+        "itinerary_text": result.itinerary_text.strip(),
+        "status": "summarizer_completed",
+    }
+
+def _is_complete(resp_text:str) -> bool:
+    parser = IncrementalJSONParser()
+    parser.feed(resp_text or "")
+    return parser.complete
+
+def plan_and_summarize_node(state:TravelState) ->Dict[str, Any]:
+    """
+    Single-call mode: one LLM round trip yields both plan_outline and itinerary_text.
+    When the response was cut off by max_tokens, the repaired itinerary_text would stop
+    mid-sentence: keep the days that survived, plan the rest with continuation calls
+    and let the summarizer write the text instead.
+    """
+    if not state.city or not state.days or not state.interests:
+        return{'error': "planner: missing required inputs(city/days/interests)"}
+
+    resp_text = groq.invoke(prompt=_build_single_call_prompt(state), max_tokens=config.SINGLE_CALL_MAX_TOKENS)
+    if _is_complete(resp_text):
+        return _parse_plan_with_itinerary(resp_text)
+    result = _parse_plan(resp_text)
+    _continue_plan(state, result)
+    if "plan_outline" not in result:
+        return result
+    plan = result["plan_outline"]
+    return {**summarize_node(state.model_copy(update={"plan_outline": plan})), "plan_outline": plan}
+
+async def aplan_and_summarize_node(state:TravelState) ->Dict[str, Any]:
+    if not state.city or not state.days or not state.interests:
+        return{'error': "planner: missing required inputs(city/days/interests)"}
+
+    resp_text = await groq.ainvoke(prompt=_build_single_call_prompt(state), max_tokens=config.SINGLE_CALL_MAX_TOKENS)
+    if _is_complete(resp_text):
+        return _parse_plan_with_itinerary(resp_text)
+    result = _parse_plan(resp_text)
+    await _acontinue_plan(state, result)
+    if "plan_outline" not in result:
+        return result
+    plan = result["plan_outline"]
+    return {**await asummarize_node(state.model_copy(update={"plan_outline": plan})), "plan_outline": plan}
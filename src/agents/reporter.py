@@ -1,38 +1,44 @@
 from model import TravelState
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, ListFlowable, ListItem
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_LEFT
 from xml.sax.saxutils import escape
+from concurrent.futures import Future, ThreadPoolExecutor
+import hashlib
 import io
+import json
 import re
+import threading
+
+from src.config import config
+from src.utils.blob_store import BlobStore, get_blob_store
+
+# Patterns to detect day headings and bullets
+DAY_PATTERN = re.compile(r"^(Day\s+\d+|DAY\s+\d+)", re.IGNORECASE)
+BULLET_PATTERN = re.compile(r"^\s*[-•*]\s+(.+)")
+
+
+def _build_styles() -> Dict[str, ParagraphStyle]:
+    """Paragraph styles for the itinerary PDF (derived copies; the sample sheet is never mutated)."""
+    sample = getSampleStyleSheet()
 
-def _text_to_pdf_bytes(title: str, body: str) -> bytes:
-    """Render wrapped itinerary text into a paginated PDF with margins, headings, and bullets."""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=letter,
-        leftMargin=50,
-        rightMargin=50,
-        topMargin=60,
-        bottomMargin=60,
-    )
-    styles = getSampleStyleSheet()
-    
     # Title style
-    title_style = styles["Heading1"]
-    title_style.fontName = "Helvetica-Bold"
-    title_style.fontSize = 18
-    title_style.textColor = "#2C3E50"
-    title_style.spaceAfter = 12
-    
+    title_style = ParagraphStyle(
+        "ItineraryTitle",
+        parent=sample["Heading1"],
+        fontName="Helvetica-Bold",
+        fontSize=18,
+        textColor="#2C3E50",
+        spaceAfter=12,
+    )
+
     # Day heading style
     day_style = ParagraphStyle(
         "DayHeading",
-        parent=styles["Heading2"],
+        parent=sample["Heading2"],
         fontName="Helvetica-Bold",
         fontSize=14,
         textColor="#34495E",
@@ -40,11 +46,11 @@ def _text_to_pdf_bytes(title: str, body: str) -> bytes:
         spaceAfter=8,
         leftIndent=0,
     )
-    
+
     # Body text style
     body_style = ParagraphStyle(
         "BodyText",
-        parent=styles["BodyText"],
+        parent=sample["BodyText"],
         fontName="Helvetica",
         fontSize=11,
         leading=14,
@@ -52,7 +58,7 @@ def _text_to_pdf_bytes(title: str, body: str) -> bytes:
         spaceAfter=4,
         alignment=TA_LEFT,
     )
-    
+
     # Bullet style
     bullet_style = ParagraphStyle(
         "BulletText",
@@ -63,100 +69,184 @@ def _text_to_pdf_bytes(title: str, body: str) -> bytes:
         leftIndent=20,
         bulletIndent=10,
     )
+    return {"title": title_style, "day": day_style, "body": body_style, "bullet": bullet_style}
+
+
+# built once per process; styles are read-only during layout, so renders can share them
+STYLES = _build_styles()
+
+
+def _text_to_pdf_bytes(title: str, body: str, styles: Optional[Dict[str, ParagraphStyle]] = None) -> bytes:
+    """Render wrapped itinerary text into a paginated PDF with margins, headings, and bullets."""
+    styles = styles or STYLES
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        leftMargin=50,
+        rightMargin=50,
+        topMargin=60,
+        bottomMargin=60,
+    )
 
     story = []
-    story.append(Paragraph(escape(title), title_style))
+    story.append(Paragraph(escape(title), styles["title"]))
     story.append(Spacer(1, 0.3*inch))
 
     # Parse itinerary into structured sections
-    lines = body.split("\n")
-    current_section = []
-    bullet_items = []
-    
-    # Patterns to detect day headings and bullets
-    day_pattern = re.compile(r"^(Day\s+\d+|DAY\s+\d+)", re.IGNORECASE)
-    bullet_pattern = re.compile(r"^\s*[-•*]\s+(.+)")
-    
-    for line in lines:
+    current_section: List[str] = []
+    bullet_items: List[str] = []
+
+    def flush() -> None:
+        # bullets and running text never pile up together: each flushes the other
+        if bullet_items:
+            story.append(ListFlowable(
+                [ListItem(Paragraph(escape(item), styles["bullet"])) for item in bullet_items],
+                bulletType='bullet',
+                start='•',
+            ))
+            bullet_items.clear()
+        elif current_section:
+            story.append(Paragraph(escape(" ".join(current_section)), styles["body"]))
+            current_section.clear()
+
+    for line in body.split("\n"):
         line_stripped = line.strip()
-        
+
         # Empty line: flush current section
         if not line_stripped:
-            if bullet_items:
-                story.append(ListFlowable(
-                    [ListItem(Paragraph(escape(item), bullet_style)) for item in bullet_items],
-                    bulletType='bullet',
-                    start='•',
-                ))
-                bullet_items = []
-            elif current_section:
-                text = " ".join(current_section)
-                story.append(Paragraph(escape(text), body_style))
-                current_section = []
+            flush()
             story.append(Spacer(1, 0.1*inch))
             continue
-        
+
         # Day heading
-        if day_pattern.match(line_stripped):
-            # Flush previous content
-            if bullet_items:
-                story.append(ListFlowable(
-                    [ListItem(Paragraph(escape(item), bullet_style)) for item in bullet_items],
-                    bulletType='bullet',
-                    start='•',
-                ))
-                bullet_items = []
-            elif current_section:
-                text = " ".join(current_section)
-                story.append(Paragraph(escape(text), body_style))
-                current_section = []
-            
+        if DAY_PATTERN.match(line_stripped):
+            flush()
             story.append(Spacer(1, 0.15*inch))
-            story.append(Paragraph(escape(line_stripped), day_style))
+            story.append(Paragraph(escape(line_stripped), styles["day"]))
             continue
-        
+
         # Bullet item
-        bullet_match = bullet_pattern.match(line_stripped)
+        bullet_match = BULLET_PATTERN.match(line_stripped)
         if bullet_match:
             # Flush previous non-bullet section
             if current_section:
-                text = " ".join(current_section)
-                story.append(Paragraph(escape(text), body_style))
-                current_section = []
+                flush()
             bullet_items.append(bullet_match.group(1))
             continue
-        
-        # Regular text
+
+        # Regular text: flush bullets before starting it
         if bullet_items:
-            # Flush bullets before starting regular text
-            story.append(ListFlowable(
-                [ListItem(Paragraph(escape(item), bullet_style)) for item in bullet_items],
-                bulletType='bullet',
-                start='•',
-            ))
-            bullet_items = []
-        
+            flush()
         current_section.append(line_stripped)
-    
+
     # Flush remaining content
-    if bullet_items:
-        story.append(ListFlowable(
-            [ListItem(Paragraph(escape(item), bullet_style)) for item in bullet_items],
-            bulletType='bullet',
-            start='•',
-        ))
-    elif current_section:
-        text = " ".join(current_section)
-        story.append(Paragraph(escape(text), body_style))
+    flush()
 
     doc.build(story)
-    buffer.seek(0)
-    return buffer.read()
+    return buffer.getvalue()
+
+
+# ---- PDF artifacts: content-addressed, built on demand
+
+# ReportLab layout is pure Python: the worker takes it off the response path, not onto more cores
+_pdf_executor = ThreadPoolExecutor(max_workers=config.PDF_RENDER_WORKERS, thread_name_prefix="pdf")
+_pending: Dict[str, Future] = {}
+_pending_lock = threading.Lock()
+
+# a blob per itinerary: <key>.json holds the title and text (what the PDF is built from), <key>.pdf the PDF
+SOURCE_SUFFIX = ".json"
+PDF_SUFFIX = ".pdf"
+
+
+def _pdf_store() -> BlobStore:
+    return get_blob_store(config.PDF_STORE_DIR, max_bytes=config.PDF_STORE_MAX_BYTES)
+
+
+def pdf_title(city: str, days: int) -> str:
+    return f"Itinerary for {city} ({days} days)"
+
+
+def pdf_key(title: str, body: str) -> str:
+    return hashlib.sha256(f"{title}\x00{body}".encode("utf-8")).hexdigest()
+
+
+def save_pdf_source(title: str, body: str) -> str:
+    """Record what the PDF is built from and return its key; nothing is rendered yet."""
+    key = pdf_key(title, body)
+    store = _pdf_store()
+    if not store.has(key, SOURCE_SUFFIX):
+        store.put(json.dumps({"title": title, "body": body}).encode("utf-8"), key=key, suffix=SOURCE_SUFFIX)
+    return key
+
+
+def _render_and_store(key: str, title: str, body: str) -> bytes:
+    try:
+        pdf = _text_to_pdf_bytes(title, body)
+        _pdf_store().put(pdf, key=key, suffix=PDF_SUFFIX)
+        return pdf
+    finally:
+        with _pending_lock:
+            _pending.pop(key, None)
+
+
+def _submit(key: str, title: str, body: str) -> Future:
+    # one render per key, however many callers ask for it at once
+    with _pending_lock:
+        future = _pending.get(key)
+        if future is None:
+            future = _pending[key] = _pdf_executor.submit(_render_and_store, key, title, body)
+        return future
+
+
+def submit_pdf(title: str, body: str) -> str:
+    """Start rendering in the background (unless stored or already in flight); returns the PDF key."""
+    key = save_pdf_source(title, body)
+    if not _pdf_store().has(key, PDF_SUFFIX):
+        _submit(key, title, body)
+    return key
+
+
+def get_pdf(key: str, timeout: Optional[float] = None) -> Optional[bytes]:
+    """
+    The PDF for `key`: from the store, from a render in flight, or built now from
+    its saved source. None for an unknown key; re-raises a failed render.
+    """
+    store = _pdf_store()
+    pdf = store.get(key, PDF_SUFFIX)
+    if pdf is not None:
+        return pdf
+    with _pending_lock:
+        future = _pending.get(key)
+    if future is None:
+        source = store.get(key, SOURCE_SUFFIX)
+        if source is None:
+            # the render may have finished between the store check and the lookup
+            return store.get(key, PDF_SUFFIX)
+        doc = json.loads(source)
+        future = _submit(key, doc["title"], doc["body"])
+    return future.result(timeout=timeout)
+
+
+def render_pdf(title: str, body: str) -> bytes:
+    """PDF bytes for the itinerary, from the store or rendered now (shares an in-flight render)."""
+    key = save_pdf_source(title, body)
+    pdf = get_pdf(key)
+    return pdf if pdf is not None else _render_and_store(key, title, body)
+
 
 def reporter_node(state: TravelState) -> Dict[str, Any]:
     if not state.itinerary_text:
         return {"error": "reporter: no itinerary_text"}
 
-    title = f"Itinerary for {state.city} ({state.days} days)"
-    pdf_bytes = _text_to_pdf_bytes(title, state.itinerary_text)
-    return {"itinerary_pdf_bytes": pdf_bytes, "status": "reporter_completed"}
+    # the state only carries the key; the PDF itself lives in the blob store
+    title = pdf_title(state.city, state.days)
+    if config.PDF_RENDER_MODE == "inline":
+        render_pdf(title, state.itinerary_text)
+        key = pdf_key(title, state.itinerary_text)
+    elif config.PDF_RENDER_MODE == "background":
+        key = submit_pdf(title, state.itinerary_text)
+    else:
+        # lazy: built the first time someone downloads it
+        key = save_pdf_source(title, state.itinerary_text)
+    return {"itinerary_pdf_key": key, "status": "reporter_completed"}
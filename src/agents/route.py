@@ -1,24 +1,35 @@
 from model import TravelState
-from typing import Dict, Any
-from src.utils.osrm_client import compute_route_order
+from typing import Dict, Any, List
+from src.utils.osrm_client import compute_day_routes, acompute_day_routes
+
+def _coords(attractions: List[Dict[str, Any]]) -> List[Dict[str, float]]:
+    coords=[]
+    for p in attractions:
+        coords.append({
+            "lat":p.get("lat"),
+            "lon": p.get("lon"),
+            # stable POI id lets the matrix cache recognise the stop across requests
+            "xid": p.get("xid"),
+        })
+    return coords
 
 def route_node(state:TravelState)->Dict[str,Any]:
     if not state.attractions:
         return {'error':"route: no attractions"}
     
     try:
-        coords=[]
-        for p in state.attractions:
-            coords.append({
-                "lat":p.get("lat"),
-                "lon": p.get("lon")
-            })
-        route = compute_route_order(coords)
+        # one geographically compact tour per day of the trip
+        route = compute_day_routes(_coords(state.attractions), days=state.days or 1)
+        return {'route_plan':route, "status":"Route_completed"}
+    except Exception as e:
+        return {'error':f"route-node error {e}"}
+
+async def aroute_node(state:TravelState)->Dict[str,Any]:
+    if not state.attractions:
+        return {'error':"route: no attractions"}
+
+    try:
+        route = await acompute_day_routes(_coords(state.attractions), days=state.days or 1)
         return {'route_plan':route, "status":"Route_completed"}
     except Exception as e:
         return {'error':f"route-node error {e}"}
-        
-        
-    
-    
-    
\ No newline at end of file
@@ -1,6 +1,7 @@
 import json
 from model import TravelState
 from typing import Dict, Any
+from langgraph.config import get_stream_writer
 from src.utils.groq_client import GroqClient
 
 groq = GroqClient(model='llama-3.1-8b-instant')
@@ -13,6 +14,13 @@ summarize_prompt_template = """
         Return only the text.
 """
 
+def _stream_writer():
+    """LangGraph custom-stream writer, or a no-op when called outside a graph run."""
+    try:
+        return get_stream_writer()
+    except Exception:
+        return lambda _chunk: None
+
 def summarize_node(state:TravelState) ->Dict[str, Any]:
     if not state.plan_outline:
         return {"error": "summarizer: missing plan-outline"}
@@ -20,7 +28,23 @@ def summarize_node(state:TravelState) ->Dict[str, Any]:
     plan_json = json.dumps(state.plan_outline)
     prompt = summarize_prompt_template.format(plan_json=plan_json)
 
-    resp_text  = groq.invoke(prompt)
-    itinerary = resp_text.strip()
+    # forward tokens to `stream_mode="custom"` consumers (the Streamlit UI) as they arrive
+    writer = _stream_writer()
+    parts = []
+    for chunk in groq.stream(prompt):
+        parts.append(chunk)
+        writer({"itinerary_delta": chunk})
+    itinerary = "".join(parts).strip()
     return {"itinerary_text": itinerary, "status": "summarizer_completed"}
 
+async def asummarize_node(state:TravelState) ->Dict[str, Any]:
+    if not state.plan_outline:
+        return {"error": "summarizer: missing plan-outline"}
+
+    prompt = summarize_prompt_template.format(plan_json=json.dumps(state.plan_outline))
+    writer = _stream_writer()
+    parts = []
+    async for chunk in groq.astream(prompt):
+        parts.append(chunk)
+        writer({"itinerary_delta": chunk})
+    return {"itinerary_text": "".join(parts).strip(), "status": "summarizer_completed"}
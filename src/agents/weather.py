@@ -1,7 +1,7 @@
 from model import TravelState
 from typing import Dict, Any
-from src.utils.opentripmap import bbox_from_city
-from src.utils.open_meteo import fetch_weather_by_coords
+from src.utils.opentripmap import bbox_from_city, abbox_from_city
+from src.utils.open_meteo import fetch_weather_by_coords, afetch_weather_by_coords
 
 def weather_node(state:TravelState)->Dict[str, Any]:
     if not state.city:
@@ -20,4 +20,14 @@ def weather_node(state:TravelState)->Dict[str, Any]:
     except Exception as e:
         return {"error":f"Weather_node's error {e}"}
 
-                                          
\ No newline at end of file
+async def aweather_node(state:TravelState)->Dict[str, Any]:
+    if not state.city:
+        return {"error":"weather: no city provided"}
+
+    try:
+        geo = await abbox_from_city(state.city)
+        weather = await afetch_weather_by_coords(geo.get('lat'), geo.get('lon'), days=state.days or 7)
+        return {"weather_data":weather.get("daily",{}), 'status':"Weather_completed"}
+
+    except Exception as e:
+        return {"error":f"Weather_node's error {e}"}
@@ -3,4 +3,125 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
\ No newline at end of file
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+
+# Local on-disk caches (SQLite files) shared by every worker process
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+
+# Geocoding cache: city name -> coordinates
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", os.path.join(CACHE_DIR, "geocode.sqlite"))
+GEOCODE_TTL_SECONDS = int(os.getenv("GEOCODE_TTL_SECONDS", str(30 * 24 * 3600)))
+# failed lookups are remembered briefly so a bad city name doesn't hammer Nominatim
+GEOCODE_NEGATIVE_TTL_SECONDS = int(os.getenv("GEOCODE_NEGATIVE_TTL_SECONDS", "600"))
+# optional JSON file {"city": {"lat": .., "lon": ..}} merged into the built-in gazetteer
+GEOCODE_GAZETTEER_PATH = os.getenv("GEOCODE_GAZETTEER_PATH")
+
+# LLM response cache: "sqlite" (default, shared across processes), "redis" or "memory"
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "sqlite").lower()
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(CACHE_DIR, "llm.sqlite"))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Outbound HTTP: pooled keep-alive connections shared by every client
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "20"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_PER_HOST = int(os.getenv("HTTP_MAX_PER_HOST", "10"))
+
+# Per-host token buckets, "host=requests_per_second[:burst],...". Hosts not listed are unthrottled.
+# Groq (api.groq.com) is left out: its limits depend on the account, and the SDK already retries 429s
+# (HTTP_MAX_RETRIES). To add it, use the account's RPM / 60 as the rate and a burst of at least
+# PLANNER_MAX_CONCURRENCY, or chunked long trips queue on the bucket instead of running concurrently.
+RATE_LIMITS = os.getenv(
+    "RATE_LIMITS",
+    "nominatim.openstreetmap.org=1,overpass-api.de=0.5:2,api.opentripmap.com=8:10,"
+    "api.open-meteo.com=8:10,router.project-osrm.org=1:2",
+)
+# set to a SQLite file to share the buckets between worker processes
+RATE_LIMIT_SHARED_PATH = os.getenv("RATE_LIMIT_SHARED_PATH", "")
+# retries on 429/5xx and connection errors: full-jitter exponential backoff, Retry-After honoured;
+# a Retry-After longer than HTTP_RETRY_MAX_DELAY is not waited out
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_RETRY_BASE_DELAY = float(os.getenv("HTTP_RETRY_BASE_DELAY", "0.5"))
+HTTP_RETRY_MAX_DELAY = float(os.getenv("HTTP_RETRY_MAX_DELAY", "10"))
+
+# Circuit breaker per upstream provider: after this many consecutive failures, calls fail
+# fast (straight to the fallback path) until a probe succeeds after the recovery time
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RECOVERY_SECONDS = float(os.getenv("CIRCUIT_RECOVERY_SECONDS", "30"))
+CIRCUIT_HALF_OPEN_MAX_CALLS = int(os.getenv("CIRCUIT_HALF_OPEN_MAX_CALLS", "1"))
+
+# OpenTripMap broadening attempts: "hedged" launches the next attempt if the previous
+# one hasn't answered within the hedge delay; "serial" waits for each in turn
+OTM_FALLBACK_MODE = os.getenv("OTM_FALLBACK_MODE", "hedged").lower()
+OTM_HEDGE_DELAY_SECONDS = float(os.getenv("OTM_HEDGE_DELAY_SECONDS", "1.0"))
+
+# fetched POIs and forecasts are reused for this long, so trips to the same city share them;
+# forecasts are always fetched for WEATHER_FETCH_DAYS days and cut to the trip length
+ATTRACTION_CACHE_TTL_SECONDS = int(os.getenv("ATTRACTION_CACHE_TTL_SECONDS", str(6 * 3600)))
+WEATHER_CACHE_TTL_SECONDS = int(os.getenv("WEATHER_CACHE_TTL_SECONDS", "1800"))
+WEATHER_FETCH_DAYS = int(os.getenv("WEATHER_FETCH_DAYS", "16"))
+
+# POI search radius around the city centre, POIs fetched per city, and how many of them the interest ranking keeps
+ATTRACTION_RADIUS_M = int(os.getenv("ATTRACTION_RADIUS_M", "8000"))
+ATTRACTION_FETCH_LIMIT = int(os.getenv("ATTRACTION_FETCH_LIMIT", "50"))
+ATTRACTION_TOP_K = int(os.getenv("ATTRACTION_TOP_K", "20"))
+
+# Offline POI index built by ingest_pois.py; areas it covers are answered without any API call
+POI_INDEX_PATH = os.getenv("POI_INDEX_PATH", os.path.join(CACHE_DIR, "poi_index.npz"))
+POI_INDEX_CELL_DEG = float(os.getenv("POI_INDEX_CELL_DEG", "0.02"))
+# cities ingest_pois.py loads when none are given on the command line
+POI_REGIONS = [c.strip() for c in os.getenv("POI_REGIONS", "").split(";") if c.strip()]
+
+# Route ordering: local-search time budget per tour
+ROUTE_TIME_BUDGET_SECONDS = float(os.getenv("ROUTE_TIME_BUDGET_SECONDS", "0.2"))
+
+# Distance matrix backend: "osrm+haversine" (OSRM with local fallback), "osrm" or "haversine"
+ROUTING_BACKEND = os.getenv("ROUTING_BACKEND", "osrm+haversine").lower()
+# point this at a self-hosted OSRM for production use
+OSRM_BASE_URL = os.getenv("OSRM_BASE_URL", "http://router.project-osrm.org")
+OSRM_PROFILE = os.getenv("OSRM_PROFILE", "driving")
+OSRM_TIMEOUT_SECONDS = float(os.getenv("OSRM_TIMEOUT_SECONDS", "20"))
+# how long to wait for OSRM before answering from the local haversine estimate
+OSRM_SOFT_TIMEOUT_SECONDS = float(os.getenv("OSRM_SOFT_TIMEOUT_SECONDS", "3"))
+# haversine estimate: straight-line distance x circuity factor, at an average speed
+ROUTE_CIRCUITY_FACTOR = float(os.getenv("ROUTE_CIRCUITY_FACTOR", "1.3"))
+# 0 = use the typical speed for OSRM_PROFILE (driving 25, cycling 14, walking 4.8)
+ROUTE_SPEED_KMH = float(os.getenv("ROUTE_SPEED_KMH") or 0)
+
+# "two_call": planner JSON, then a separate summarizer call for the prose (default)
+# "single_call": one structured call returns both plan_outline and itinerary_text
+PLANNER_MODE = os.getenv("PLANNER_MODE", "two_call").lower()
+SINGLE_CALL_MAX_TOKENS = int(os.getenv("SINGLE_CALL_MAX_TOKENS", "2048"))
+# follow-up calls that request only the days missing from a truncated plan
+PLANNER_MAX_CONTINUATIONS = int(os.getenv("PLANNER_MAX_CONTINUATIONS", "1"))
+# trips longer than this are planned as concurrent day-range chunks
+PLANNER_CHUNK_DAYS = int(os.getenv("PLANNER_CHUNK_DAYS", "3"))
+PLANNER_MAX_CONCURRENCY = int(os.getenv("PLANNER_MAX_CONCURRENCY", "4"))
+
+# Itinerary PDF: "lazy" builds it the first time it is downloaded, "background" starts building it
+# as soon as the itinerary is ready, "inline" builds it inside the reporter node. Either way the
+# graph state only holds its key; the PDF is a content-addressed file in PDF_STORE_DIR
+PDF_RENDER_MODE = os.getenv("PDF_RENDER_MODE", "lazy").lower()
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "2"))
+PDF_STORE_DIR = os.getenv("PDF_STORE_DIR", os.path.join(CACHE_DIR, "pdfs"))
+# least recently downloaded PDFs are pruned beyond this size
+PDF_STORE_MAX_BYTES = int(os.getenv("PDF_STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Streamlit app: finished trips are memoized by normalized request (city, days, interests, budget),
+# process-wide (shared by all sessions) and per session (survives reruns from widget interaction)
+RESULT_CACHE_TTL_SECONDS = int(os.getenv("RESULT_CACHE_TTL_SECONDS", "3600"))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "256"))
+SESSION_RESULTS_MAX = int(os.getenv("SESSION_RESULTS_MAX", "5"))
+
+# Background cache warmer: every WARM_INTERVAL_SECONDS it refreshes the geocode, POI, forecast and
+# route-matrix caches of the WARM_TOP_N most requested (city, interests) combos whose entries are
+# missing or expire within WARM_REFRESH_AHEAD_SECONDS (keep this above the interval), spending at
+# most WARM_CALLS_PER_MINUTE upstream HTTP calls. Demand decays with a DEMAND_HALF_LIFE_HOURS half-life.
+# Off by default (it spends public API quota even with one user); enable it in deployments.
+CACHE_WARMER_ENABLED = os.getenv("CACHE_WARMER_ENABLED", "0").lower() in ("1", "true", "yes")
+WARM_TOP_N = int(os.getenv("WARM_TOP_N", "20"))
+WARM_INTERVAL_SECONDS = float(os.getenv("WARM_INTERVAL_SECONDS", "600"))
+WARM_REFRESH_AHEAD_SECONDS = float(os.getenv("WARM_REFRESH_AHEAD_SECONDS", "900"))
+WARM_CALLS_PER_MINUTE = float(os.getenv("WARM_CALLS_PER_MINUTE", "30"))
+DEMAND_HALF_LIFE_HOURS = float(os.getenv("DEMAND_HALF_LIFE_HOURS", "24"))
@@ -0,0 +1,134 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from typing import BinaryIO, Dict, Optional
+
+_KEY = re.compile(r"^[0-9a-f]{16,128}$")
+
+
+class BlobStore:
+    """
+    Content-addressed files on local disk: a blob lives at root/ab/abcdef...<suffix>,
+    written atomically (temp file + os.replace) so every process sharing the
+    directory reads either the whole blob or nothing. When max_bytes is set, the
+    least recently read blobs are pruned every PRUNE_EVERY writes.
+    """
+    PRUNE_EVERY = 32
+
+    def __init__(self, root: str, max_bytes: Optional[int] = None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._writes = 0
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def key_for(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def path(self, key: str, suffix: str = "") -> str:
+        # keys come from hashes; anything else must not reach the filesystem
+        if not _KEY.match(key):
+            raise ValueError(f"invalid blob key: {key!r}")
+        return os.path.join(self.root, key[:2], key + suffix)
+
+    def has(self, key: str, suffix: str = "") -> bool:
+        return os.path.exists(self.path(key, suffix))
+
+    def put(self, data: bytes, key: Optional[str] = None, suffix: str = "") -> str:
+        """Store `data` under `key` (default: its sha256) and return the key."""
+        key = key or self.key_for(data)
+        path = self.path(key, suffix)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        with self._lock:
+            self._writes += 1
+            due = self.max_bytes is not None and self._writes % self.PRUNE_EVERY == 0
+        if due:
+            self.prune()
+        return key
+
+    def open(self, key: str, suffix: str = "") -> Optional[BinaryIO]:
+        path = self.path(key, suffix)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        try:
+            # mtime doubles as "last used" for pruning
+            os.utime(path)
+        except OSError:
+            pass
+        return f
+
+    def get(self, key: str, suffix: str = "") -> Optional[bytes]:
+        f = self.open(key, suffix)
+        if f is None:
+            return None
+        with f:
+            return f.read()
+
+    def delete(self, key: str, suffix: str = "") -> None:
+        try:
+            os.unlink(self.path(key, suffix))
+        except FileNotFoundError:
+            pass
+
+    def _entries(self):
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield st.st_mtime, st.st_size, path
+
+    def prune(self) -> int:
+        """Delete least recently used blobs until the store fits max_bytes; returns how many."""
+        if self.max_bytes is None:
+            return 0
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        entries = list(self._entries())
+        return {"blobs": len(entries), "bytes": sum(size for _, size, _ in entries)}
+
+
+_stores: Dict[str, BlobStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_blob_store(root: str, max_bytes: Optional[int] = None) -> BlobStore:
+    """Process-wide store per directory."""
+    with _stores_lock:
+        store = _stores.get(root)
+        if store is None:
+            store = _stores[root] = BlobStore(root, max_bytes=max_bytes)
+        return store
@@ -1,30 +1,150 @@
+import sys
+import threading
 import time
-from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+def _approx_size(value: Any) -> int:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8", errors="ignore"))
+    return sys.getsizeof(value)
+
 
 class TTLCache:
-    """Simple in-memory TTL cache (process-local)."""
-    def __init__(self, ttl_seconds: int = 3600, max_size: int = 512):
+    """
+    Thread-safe in-memory LRU cache with a TTL (process-local).
+
+    get/set are O(1): entries live in an OrderedDict kept in LRU order, and a second
+    OrderedDict keeps write order, which is also expiry order since the TTL is uniform.
+    Expired entries are swept a few at a time on every write (amortized), in addition
+    to the lazy check on read. Limits apply to both entry count and approximate bytes.
+    """
+    # expired entries reclaimed per write; keeps set() O(1) amortized
+    SWEEP_BATCH = 8
+
+    def __init__(
+        self,
+        ttl_seconds: int = 3600,
+        max_size: int = 512,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = _approx_size,
+    ):
         self.ttl = ttl_seconds
         self.max = max_size
-        self._store: Dict[str, Tuple[float, Any]] = {}
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._lock = threading.Lock()
+        # key -> (expires_at, value, size), LRU order (least recent first)
+        self._store: "OrderedDict[str, Tuple[float, Any, int]]" = OrderedDict()
+        # key -> expires_at, write order (oldest first)
+        self._expiry: "OrderedDict[str, float]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
 
     def get(self, key: str) -> Optional[Any]:
-        item = self._store.get(key)
-        if not item:
-            return None
-        ts, val = item
-        if (time.time() - ts) > self.ttl:
-            # expired
-            self._store.pop(key, None)
-            return None
-        return val
+        with self._lock:
+            item = self._store.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, val, _ = item
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._store.move_to_end(key)
+            self.hits += 1
+            return val
 
     def set(self, key: str, value: Any) -> None:
-        if len(self._store) >= self.max:
-            # naive eviction (oldest)
-            oldest_key = min(self._store.keys(), key=lambda k: self._store[k][0])
-            self._store.pop(oldest_key, None)
-        self._store[key] = (time.time(), value)
+        size = self._sizeof(value)
+        with self._lock:
+            now = time.monotonic()
+            if key in self._store:
+                self._remove(key)
+            self._sweep(now, self.SWEEP_BATCH)
+            if self.max_bytes is not None and size > self.max_bytes:
+                # would evict everything and still not fit
+                return
+            while self._store and (
+                len(self._store) >= self.max
+                or (self.max_bytes is not None and self._bytes + size > self.max_bytes)
+            ):
+                oldest_key = next(iter(self._store))
+                self._remove(oldest_key)
+                self.evictions += 1
+            expires_at = now + self.ttl
+            self._store[key] = (expires_at, value, size)
+            self._expiry[key] = expires_at
+            self._bytes += size
+
+    def ttl_remaining(self, key: str) -> Optional[float]:
+        """Seconds until `key` expires (None if absent or expired); doesn't count as a lookup."""
+        with self._lock:
+            item = self._store.get(key)
+            if item is None:
+                return None
+            remaining = item[0] - time.monotonic()
+            return remaining if remaining > 0 else None
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._store:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+            self._expiry.clear()
+            self._bytes = 0
+
+    def sweep(self) -> int:
+        """Drop every expired entry now; returns how many were removed."""
+        with self._lock:
+            return self._sweep(time.monotonic(), None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._store),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _sweep(self, now: float, limit: Optional[int]) -> int:
+        removed = 0
+        while self._expiry and (limit is None or removed < limit):
+            key, expires_at = next(iter(self._expiry.items()))
+            if expires_at > now:
+                break
+            self._remove(key)
+            self.expirations += 1
+            removed += 1
+        return removed
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._store.pop(key)
+        self._expiry.pop(key, None)
+        self._bytes -= size
 
 
 def make_key(*parts: Any) -> str:
@@ -0,0 +1,166 @@
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import config
+from . import http
+from .demand import Combo, DemandTracker, get_demand_tracker
+from .geocode_cache import geocode_cache
+from .logger import get_logger
+from .open_meteo import forecast_ttl_remaining, refresh_forecast
+from .opentripmap import (
+    DEFAULT_KINDS, attractions_ttl_remaining, bbox_from_city, fetch_attraction, refresh_attraction, refresh_city,
+)
+from .osrm_client import fetch_table
+from .poi_ranking import query_kinds, rank_pois
+from .rate_limit import TokenBucket
+
+logger = get_logger(__name__)
+
+
+class CacheWarmer:
+    """
+    Keeps the caches of the most requested (city, interests) combos warm. Every
+    `interval_seconds` it takes the top-N combos from the demand tracker and
+    refreshes their geocode, POI list, forecast and route matrix when the cached
+    entry is missing or expires within `refresh_ahead_seconds`, so the next user
+    for a popular city never pays the cold path. Every upstream HTTP call the
+    warmer causes (fallback attempts, hedged races and retries included) takes a
+    token from a `calls_per_minute` budget, on top of the per-host rate limits all
+    outbound calls already respect.
+    """
+    # the pair cache has no per-entry expiry; re-fetch a combo's matrix this often or when its POIs change
+    MATRIX_REFRESH_SECONDS = 24 * 3600
+
+    def __init__(self, tracker: DemandTracker, top_n: int = 20, interval_seconds: float = 600,
+                 refresh_ahead_seconds: float = 900, calls_per_minute: float = 30):
+        self.tracker = tracker
+        self.top_n = top_n
+        self.interval = interval_seconds
+        self.refresh_ahead = refresh_ahead_seconds
+        self._budget = TokenBucket(rate=calls_per_minute / 60.0, burst=max(1.0, calls_per_minute / 6.0))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._matrix_warmed: Dict[Combo, Tuple[Tuple[Any, ...], float]] = {}
+        self._lock = threading.Lock()
+        self._calls = 0
+        self.totals: Counter = Counter()
+        self.last_cycle: Optional[Dict[str, Any]] = None
+
+    def _due(self, remaining: Optional[float]) -> bool:
+        return remaining is None or remaining < self.refresh_ahead
+
+    def _spend(self) -> bool:
+        """http.call_budget hook: wait for a budget token; False if the warmer was stopped meanwhile."""
+        if self._stop.is_set():
+            return False
+        wait = self._budget.reserve()
+        with self._lock:
+            self._calls += 1
+        return wait <= 0 or not self._stop.wait(wait)
+
+    def _warm_combo(self, combo: Combo, counts: Counter) -> None:
+        city, interests = combo
+        if self._due(geocode_cache.ttl_remaining(city)):
+            refresh_city(city)
+            counts["geocode"] += 1
+        geo = bbox_from_city(city)
+
+        # the same query the attraction node makes for these interests, so it hits the warmed entry
+        query = (city, config.ATTRACTION_RADIUS_M, query_kinds(DEFAULT_KINDS, interests), config.ATTRACTION_FETCH_LIMIT)
+        if self._due(attractions_ttl_remaining(*query)):
+            places = refresh_attraction(*query)
+            counts["attractions"] += 1
+        else:
+            places = fetch_attraction(*query)
+
+        if self._stop.is_set():
+            return
+        if self._due(forecast_ttl_remaining(geo["lat"], geo["lon"])):
+            refresh_forecast(geo["lat"], geo["lon"])
+            counts["weather"] += 1
+
+        # the route node asks for the matrix of the ranked stops, so warm exactly those pairs
+        ranked = rank_pois(places, list(interests), k=config.ATTRACTION_TOP_K)
+        coords = [{"lat": p.get("lat"), "lon": p.get("lon"), "xid": p.get("xid")} for p in ranked]
+        stops = tuple(c["xid"] or (c["lat"], c["lon"]) for c in coords)
+        warmed = self._matrix_warmed.get(combo)
+        stale = warmed is None or warmed[0] != stops or time.monotonic() - warmed[1] > self.MATRIX_REFRESH_SECONDS
+        if len(coords) > 1 and stale and not self._stop.is_set():
+            fetch_table(coords)
+            self._matrix_warmed[combo] = (stops, time.monotonic())
+            counts["matrix"] += 1
+
+    def warm_once(self) -> Dict[str, Any]:
+        """One pass over the current top-N combos; returns what was refreshed."""
+        t0 = time.perf_counter()
+        counts: Counter = Counter()
+        with self._lock:
+            calls_before = self._calls
+        top: List[Tuple[Combo, float]] = self.tracker.top(self.top_n)
+        for combo, _ in top:
+            if self._stop.is_set():
+                break
+            try:
+                with http.call_budget(self._spend):
+                    self._warm_combo(combo, counts)
+            except Exception as e:
+                counts["failed"] += 1
+                logger.warning("cache warmer: %s failed: %s", combo[0], e)
+        # combos that dropped out of the top-N don't need their matrix state anymore
+        wanted = {combo for combo, _ in top}
+        for combo in list(self._matrix_warmed):
+            if combo not in wanted:
+                del self._matrix_warmed[combo]
+        with self._lock:
+            counts["upstream_calls"] = self._calls - calls_before
+        cycle = {"combos": len(top), "seconds": round(time.perf_counter() - t0, 2), **counts}
+        with self._lock:
+            self.totals.update(counts)
+            self.totals["cycles"] += 1
+            self.last_cycle = cycle
+        return cycle
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.warm_once()
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="cache-warmer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"totals": dict(self.totals), "last_cycle": self.last_cycle,
+                    "running": self._thread is not None and self._thread.is_alive()}
+
+
+_warmer: Optional[CacheWarmer] = None
+_warmer_lock = threading.Lock()
+
+
+def start_cache_warmer() -> Optional[CacheWarmer]:
+    """Start the process-wide warmer once; None when CACHE_WARMER_ENABLED is off."""
+    global _warmer
+    if not config.CACHE_WARMER_ENABLED:
+        return None
+    with _warmer_lock:
+        if _warmer is None:
+            _warmer = CacheWarmer(
+                get_demand_tracker(),
+                top_n=config.WARM_TOP_N,
+                interval_seconds=config.WARM_INTERVAL_SECONDS,
+                refresh_ahead_seconds=config.WARM_REFRESH_AHEAD_SECONDS,
+                calls_per_minute=config.WARM_CALLS_PER_MINUTE,
+            )
+        _warmer.start()
+        return _warmer
@@ -0,0 +1,136 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from src.config import config
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose breaker is open."""
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"circuit '{name}' is open; retry in {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker. `failure_threshold` consecutive failures open it;
+    after `recovery_timeout` seconds up to `half_open_max_calls` probe calls are
+    let through, and the first probe result closes or re-opens it.
+    """
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        # metrics
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+            return self._state
+
+    def _maybe_half_open(self, now: float) -> None:
+        if self._state == OPEN and now - self._opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self._probes = 0
+
+    def _open(self, now: float) -> None:
+        if self._state != OPEN:
+            self.times_opened += 1
+            logger.warning("circuit %s opened after %d failures", self.name, self._consecutive_failures)
+        self._state = OPEN
+        self._opened_at = now
+        self._probes = 0
+
+    def allow(self) -> None:
+        """Reserve a call slot or raise CircuitOpenError; every allowed call must be followed by a record_* call."""
+        now = time.monotonic()
+        with self._lock:
+            self._maybe_half_open(now)
+            if self._state == OPEN or (self._state == HALF_OPEN and self._probes >= self.half_open_max_calls):
+                self.rejected += 1
+                raise CircuitOpenError(self.name, max(0.0, self._opened_at + self.recovery_timeout - now))
+            if self._state == HALF_OPEN:
+                self._probes += 1
+            self.calls += 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.successes += 1
+            self._consecutive_failures = 0
+            if self._state == HALF_OPEN:
+                logger.info("circuit %s closed", self.name)
+            self._state = CLOSED
+            self._probes = 0
+
+    def record_failure(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.failures += 1
+            self._consecutive_failures += 1
+            if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self._open(now)
+
+    def release(self) -> None:
+        """The call was abandoned (e.g. cancelled by a hedge) without telling us anything."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes:
+                self._probes -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "calls": self.calls,
+                "successes": self.successes,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "times_opened": self.times_opened,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Process-wide breaker for a provider (nominatim, opentripmap, overpass, open_meteo, osrm)."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(
+                name,
+                failure_threshold=config.CIRCUIT_FAILURE_THRESHOLD,
+                recovery_timeout=config.CIRCUIT_RECOVERY_SECONDS,
+                half_open_max_calls=config.CIRCUIT_HALF_OPEN_MAX_CALLS,
+            )
+        return breaker
+
+
+def breaker_stats(name: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {n: b.stats() for n, b in breakers.items() if name is None or n == name}
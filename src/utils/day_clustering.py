@@ -0,0 +1,73 @@
+from typing import List, Optional
+
+import numpy as np
+
+
+def _project(points: np.ndarray) -> np.ndarray:
+    """lat/lon degrees -> local planar km (equirectangular; fine at city scale)."""
+    lat0 = np.radians(points[:, 0].mean())
+    x = np.radians(points[:, 1]) * np.cos(lat0) * 6371.0
+    y = np.radians(points[:, 0]) * 6371.0
+    return np.column_stack((x, y))
+
+
+def _kmeans_pp(xy: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    centers = [xy[rng.integers(len(xy))]]
+    for _ in range(1, k):
+        d2 = np.min(((xy[:, None, :] - np.array(centers)[None, :, :]) ** 2).sum(axis=2), axis=1)
+        total = d2.sum()
+        idx = rng.choice(len(xy), p=d2 / total) if total > 0 else rng.integers(len(xy))
+        centers.append(xy[idx])
+    return np.array(centers)
+
+
+def _balanced_assign(dist: np.ndarray, capacity: int) -> np.ndarray:
+    """Greedy capacity-constrained assignment: cheapest (point, cluster) pairs first."""
+    n, k = dist.shape
+    labels = np.full(n, -1, dtype=np.intp)
+    load = np.zeros(k, dtype=np.intp)
+    for flat in np.argsort(dist, axis=None):
+        i, c = divmod(int(flat), k)
+        if labels[i] == -1 and load[c] < capacity:
+            labels[i] = c
+            load[c] += 1
+    return labels
+
+
+def cluster_days(
+    points: np.ndarray,
+    days: int,
+    max_iter: int = 50,
+    seed: Optional[int] = 0,
+) -> List[List[int]]:
+    """
+    Split POIs (n x 2 array of lat/lon) into `days` geographically compact groups of
+    near-equal size (at most ceil(n/days) each) with balanced k-means. Returns lists of
+    point indices; groups are ordered by their highest-ranked (lowest index) member,
+    and indices inside a group keep their input order.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    n = len(points)
+    k = max(1, min(int(days or 1), n))
+    if n == 0:
+        return []
+    if k == 1:
+        return [list(range(n))]
+
+    xy = _project(points)
+    rng = np.random.default_rng(seed)
+    capacity = -(-n // k)
+    centers = _kmeans_pp(xy, k, rng)
+    labels = np.full(n, -1, dtype=np.intp)
+    for _ in range(max_iter):
+        dist = np.sqrt(((xy[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2))
+        new_labels = _balanced_assign(dist, capacity)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        centers = np.array([xy[labels == c].mean(axis=0) for c in range(k)])
+
+    groups = [np.flatnonzero(labels == c).tolist() for c in range(k)]
+    groups = [g for g in groups if g]
+    groups.sort(key=lambda g: g[0])
+    return groups
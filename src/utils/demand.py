@@ -0,0 +1,145 @@
+import ast
+import glob
+import heapq
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.config import config
+from .logger import LOGS_DIR, get_logger
+from .trip_legs import parse_cities
+
+logger = get_logger(__name__)
+
+# (normalized city, sorted normalized interests)
+Combo = Tuple[str, Tuple[str, ...]]
+
+# written by record_request; older logs only have the legacy planner's line
+REQUEST_MARKER = "trip_request "
+_LEGACY_LINE = re.compile(r"Generating itinerary for (?P<city>.+?) and for (?P<interests>\[.*\])\s*$")
+_LOG_TIME = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),(\d{3})")
+
+
+def _norm(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+def combos_for(city: Optional[str], interests: Optional[Iterable[str]]) -> List[Combo]:
+    """One combo per city of the request (each leg of a multi-city trip is fetched on its own)."""
+    wanted = tuple(sorted({_norm(i) for i in interests or [] if i and i.strip()}))
+    return [(_norm(c), wanted) for c in parse_cities(city)]
+
+
+class DemandTracker:
+    """
+    Request counts per (city, interests) combo with exponential decay, so the
+    ranking follows current traffic: a request `half_life_seconds` ago counts half
+    as much as one now. Keeps at most `max_entries` combos (the weakest are dropped).
+    """
+    def __init__(self, half_life_seconds: float = 24 * 3600, max_entries: int = 10000):
+        self.half_life = half_life_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # combo -> (score, as of time)
+        self._scores: Dict[Combo, Tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def _decayed(self, score: float, since: float, now: float) -> float:
+        return score * 0.5 ** (max(0.0, now - since) / self.half_life)
+
+    def record(self, city: Optional[str], interests: Optional[Iterable[str]], weight: float = 1.0,
+               at: Optional[float] = None) -> None:
+        at = time.time() if at is None else at
+        with self._lock:
+            for combo in combos_for(city, interests):
+                score, since = self._scores.get(combo, (0.0, at))
+                # a replayed (older) request still adds its share, decayed to the current reference time
+                if at >= since:
+                    self._scores[combo] = (self._decayed(score, since, at) + weight, at)
+                else:
+                    self._scores[combo] = (score + self._decayed(weight, at, since), since)
+            if len(self._scores) > self.max_entries:
+                self._prune(time.time())
+
+    def _prune(self, now: float) -> None:
+        keep = heapq.nlargest(self.max_entries // 2, self._scores.items(),
+                              key=lambda kv: self._decayed(kv[1][0], kv[1][1], now))
+        self._scores = dict(keep)
+
+    def top(self, n: int) -> List[Tuple[Combo, float]]:
+        """The `n` most requested combos right now, with their decayed scores."""
+        now = time.time()
+        with self._lock:
+            scored = [(combo, self._decayed(score, since, now)) for combo, (score, since) in self._scores.items()]
+        return heapq.nlargest(n, scored, key=lambda cs: cs[1])
+
+
+def _log_time(line: str) -> Optional[float]:
+    m = _LOG_TIME.match(line)
+    if not m:
+        return None
+    return datetime.strptime(m.group(1), "%Y-%m-%d %H:%M:%S").timestamp() + int(m.group(2)) / 1000
+
+
+def parse_log_requests(lines: Iterable[str]) -> Iterator[Tuple[float, str, List[str]]]:
+    """(time, city, interests) for every trip request found in log lines."""
+    for line in lines:
+        at = _log_time(line)
+        if at is None:
+            continue
+        try:
+            if REQUEST_MARKER in line:
+                entry = json.loads(line.split(REQUEST_MARKER, 1)[1])
+                yield at, entry["city"], list(entry.get("interests") or [])
+                continue
+            m = _LEGACY_LINE.search(line)
+            if m:
+                yield at, m.group("city"), [str(i) for i in ast.literal_eval(m.group("interests"))]
+        except (ValueError, KeyError, SyntaxError, TypeError):
+            continue
+
+
+def load_log_demand(tracker: DemandTracker, paths: Optional[Sequence[str]] = None,
+                    logs_dir: str = LOGS_DIR) -> int:
+    """Replay the trip requests in the app logs (default: logs/log_*.log) into `tracker`; returns how many."""
+    if paths is None:
+        paths = sorted(glob.glob(os.path.join(logs_dir, "log_*.log")))
+    count = 0
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                for at, city, interests in parse_log_requests(f):
+                    tracker.record(city, interests, at=at)
+                    count += 1
+        except OSError as e:
+            logger.warning("could not read %s: %s", path, e)
+    return count
+
+
+_tracker: Optional[DemandTracker] = None
+_tracker_lock = threading.Lock()
+
+
+def get_demand_tracker() -> DemandTracker:
+    """Process-wide tracker, seeded from the existing logs on first use."""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = DemandTracker(half_life_seconds=config.DEMAND_HALF_LIFE_HOURS * 3600)
+            load_log_demand(_tracker)
+        return _tracker
+
+
+def record_request(city: str, days: Optional[int], interests: Optional[Sequence[str]],
+                   budget: Optional[str]) -> None:
+    """Count a user's trip request and log it, so later processes can replay the demand."""
+    logger.info(REQUEST_MARKER + json.dumps(
+        {"city": city, "days": days, "interests": list(interests or []), "budget": budget}, ensure_ascii=False
+    ))
+    get_demand_tracker().record(city, interests)
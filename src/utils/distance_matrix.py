@@ -0,0 +1,248 @@
+import asyncio
+import contextvars
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.config import config
+from . import http
+from .logger import get_logger
+from .matrix_cache import MatrixCache
+from .route_optimizer import to_matrix
+
+logger = get_logger(__name__)
+
+EARTH_RADIUS_M = 6371008.8
+
+# average speeds used by the local estimate for the usual OSRM profiles (km/h)
+SPEED_PROFILES = {"driving": 25.0, "car": 25.0, "cycling": 14.0, "bike": 14.0, "walking": 4.8, "foot": 4.8}
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="matrix")
+
+
+Indices = Optional[Sequence[int]]
+
+
+class DistanceBackend(ABC):
+    """
+    Produces travel matrices for a list of {"lat", "lon"} points:
+    {"durations": ndarray [s], "distances": ndarray [m] or None, "source": name}.
+    `sources`/`destinations` (indices into coords) restrict the rows/columns returned,
+    like OSRM's /table parameters of the same name.
+    """
+    name = "base"
+
+    @abstractmethod
+    def matrix(self, coords: List[Dict[str, float]], sources: Indices = None, destinations: Indices = None) -> Dict[str, Any]:
+        ...
+
+    async def amatrix(self, coords: List[Dict[str, float]], sources: Indices = None, destinations: Indices = None) -> Dict[str, Any]:
+        return await asyncio.get_running_loop().run_in_executor(
+            _executor, self.matrix, coords, sources, destinations
+        )
+
+
+def haversine_matrix(
+    lat: np.ndarray,
+    lon: np.ndarray,
+    lat2: Optional[np.ndarray] = None,
+    lon2: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Great-circle distances (m) between two point sets (or all pairs of one), fully vectorized."""
+    if lat2 is None:
+        lat2, lon2 = lat, lon
+    phi1, phi2 = np.radians(lat), np.radians(lat2)
+    dphi = phi1[:, None] - phi2[None, :]
+    dlam = np.radians(lon)[:, None] - np.radians(lon2)[None, :]
+    a = np.sin(dphi / 2.0) ** 2 + np.cos(phi1)[:, None] * np.cos(phi2)[None, :] * np.sin(dlam / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class HaversineBackend(DistanceBackend):
+    """Local estimate: great-circle distance x road circuity, at a constant average speed."""
+    name = "haversine"
+
+    def __init__(self, circuity: float = 1.3, speed_kmh: float = 25.0):
+        self.circuity = circuity
+        self.speed_ms = speed_kmh * 1000.0 / 3600.0
+
+    def matrix(self, coords: List[Dict[str, float]], sources: Indices = None, destinations: Indices = None) -> Dict[str, Any]:
+        lat = np.array([c["lat"] for c in coords], dtype=np.float64)
+        lon = np.array([c["lon"] for c in coords], dtype=np.float64)
+        src = np.arange(len(coords)) if sources is None else np.asarray(sources, dtype=np.intp)
+        dst = np.arange(len(coords)) if destinations is None else np.asarray(destinations, dtype=np.intp)
+        distances = haversine_matrix(lat[src], lon[src], lat[dst], lon[dst]) * self.circuity
+        return {"durations": distances / self.speed_ms, "distances": distances, "source": self.name}
+
+    async def amatrix(self, coords: List[Dict[str, float]], sources: Indices = None, destinations: Indices = None) -> Dict[str, Any]:
+        return self.matrix(coords, sources, destinations)
+
+
+class OSRMBackend(DistanceBackend):
+    """OSRM /table service (public demo server or a self-hosted instance)."""
+    name = "osrm"
+
+    def __init__(self, base_url: str, profile: str = "driving", timeout: float = 20.0):
+        self.base_url = base_url.rstrip("/")
+        self.profile = profile
+        self.timeout = timeout
+
+    def _url(self, coords: List[Dict[str, float]], sources: Indices, destinations: Indices) -> str:
+        locs = ["{lon},{lat}".format(lat=c['lat'], lon=c['lon']) for c in coords]
+        url = f"{self.base_url}/table/v1/{self.profile}/{';'.join(locs)}?annotations=duration,distance"
+        if sources is not None:
+            url += "&sources=" + ";".join(str(int(i)) for i in sources)
+        if destinations is not None:
+            url += "&destinations=" + ";".join(str(int(i)) for i in destinations)
+        return url
+
+    def _parse(self, table: Dict[str, Any]) -> Dict[str, Any]:
+        if table.get("code") not in (None, "Ok"):
+            raise ValueError(f"OSRM table error: {table.get('code')} {table.get('message')}")
+        return {
+            "durations": to_matrix(table.get("durations")),
+            "distances": to_matrix(table.get("distances")),
+            "source": self.name,
+        }
+
+    def matrix(self, coords: List[Dict[str, float]], sources: Indices = None, destinations: Indices = None) -> Dict[str, Any]:
+        r = http.get(self._url(coords, sources, destinations), timeout=self.timeout, provider="osrm")
+        r.raise_for_status()
+        return self._parse(r.json())
+
+    async def amatrix(self, coords: List[Dict[str, float]], sources: Indices = None, destinations: Indices = None) -> Dict[str, Any]:
+        r = await http.aget(self._url(coords, sources, destinations), timeout=self.timeout, provider="osrm")
+        r.raise_for_status()
+        return self._parse(r.json())
+
+
+class FallbackBackend(DistanceBackend):
+    """
+    Ask `primary` first, but answer from `fallback` if it errors or hasn't replied
+    within `soft_timeout` seconds. A slow primary call is left to finish in the
+    background rather than cancelled, so wrappers such as a matrix cache still
+    get its result for the next request.
+    """
+    def __init__(self, primary: DistanceBackend, fallback: DistanceBackend, soft_timeout: float = 3.0):
+        self.primary = primary
+        self.fallback = fallback
+        self.soft_timeout = soft_timeout
+        self.name = f"{primary.name}+{fallback.name}"
+
+    def matrix(self, coords: List[Dict[str, float]], sources: Indices = None, destinations: Indices = None) -> Dict[str, Any]:
+        future = _executor.submit(contextvars.copy_context().run, self.primary.matrix, coords, sources, destinations)
+        try:
+            return future.result(timeout=self.soft_timeout)
+        except FutureTimeout:
+            logger.warning("routing: %s slower than %ss, using %s", self.primary.name, self.soft_timeout, self.fallback.name)
+        except Exception as e:
+            logger.warning("routing: %s failed (%s), using %s", self.primary.name, e, self.fallback.name)
+        return self.fallback.matrix(coords, sources, destinations)
+
+    async def amatrix(self, coords: List[Dict[str, float]], sources: Indices = None, destinations: Indices = None) -> Dict[str, Any]:
+        task = asyncio.ensure_future(self.primary.amatrix(coords, sources, destinations))
+        done, _ = await asyncio.wait({task}, timeout=self.soft_timeout)
+        if task in done and task.exception() is None:
+            return task.result()
+        if task in done:
+            logger.warning("routing: %s failed (%s), using %s", self.primary.name, task.exception(), self.fallback.name)
+        else:
+            # keep it running; just make sure a late failure isn't reported as unretrieved
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            logger.warning("routing: %s slower than %ss, using %s", self.primary.name, self.soft_timeout, self.fallback.name)
+        return await self.fallback.amatrix(coords, sources, destinations)
+
+
+class CachedBackend(DistanceBackend):
+    """
+    Serve pairs from a MatrixCache and ask `inner` only for the rows/columns that
+    contain unknown pairs (via sources/destinations). Each result carries a
+    "cache" dict with how many pairs were served from cache vs fetched.
+    """
+    def __init__(self, inner: DistanceBackend, cache: Optional[MatrixCache] = None):
+        self.inner = inner
+        self.cache = cache or MatrixCache()
+        self.name = inner.name
+
+    def _plan(self, coords: List[Dict[str, float]]):
+        region, slots, durations, distances = self.cache.lookup(coords)
+        missing = np.isnan(durations)
+        rows = np.flatnonzero(missing.any(axis=1))
+        cols = np.flatnonzero(missing.any(axis=0))
+        return region, slots, durations, distances, int(missing.sum()), rows, cols
+
+    def _merge(self, coords, region, slots, durations, distances, n_missing, rows, cols, fetched) -> Dict[str, Any]:
+        n = len(coords)
+        source = self.name
+        if fetched is not None:
+            grid = np.ix_(rows, cols)
+            durations[grid] = fetched["durations"]
+            if fetched.get("distances") is not None:
+                distances[grid] = fetched["distances"]
+            self.cache.store(region, slots, rows, cols, fetched["durations"], fetched.get("distances"))
+            source = fetched.get("source", source)
+        self.cache.record(n * (n - 1), n_missing)
+        return {
+            "durations": durations,
+            "distances": None if np.isnan(distances).any() else distances,
+            "source": source,
+            "cache": {"pairs": n * (n - 1), "from_cache": n * (n - 1) - n_missing, "fetched": n_missing},
+        }
+
+    @staticmethod
+    def _subset(rows: np.ndarray, cols: np.ndarray, n: int):
+        full = len(rows) == n and len(cols) == n
+        return (None, None) if full else (rows.tolist(), cols.tolist())
+
+    def matrix(self, coords: List[Dict[str, float]], sources: Indices = None, destinations: Indices = None) -> Dict[str, Any]:
+        if sources is not None or destinations is not None:
+            return self.inner.matrix(coords, sources, destinations)
+        region, slots, durations, distances, n_missing, rows, cols = self._plan(coords)
+        fetched = None
+        if n_missing:
+            fetched = self.inner.matrix(coords, *self._subset(rows, cols, len(coords)))
+        return self._merge(coords, region, slots, durations, distances, n_missing, rows, cols, fetched)
+
+    async def amatrix(self, coords: List[Dict[str, float]], sources: Indices = None, destinations: Indices = None) -> Dict[str, Any]:
+        if sources is not None or destinations is not None:
+            return await self.inner.amatrix(coords, sources, destinations)
+        region, slots, durations, distances, n_missing, rows, cols = self._plan(coords)
+        fetched = None
+        if n_missing:
+            fetched = await self.inner.amatrix(coords, *self._subset(rows, cols, len(coords)))
+        return self._merge(coords, region, slots, durations, distances, n_missing, rows, cols, fetched)
+
+
+def _build_backend(kind: str) -> DistanceBackend:
+    haversine = HaversineBackend(
+        circuity=config.ROUTE_CIRCUITY_FACTOR,
+        speed_kmh=config.ROUTE_SPEED_KMH or SPEED_PROFILES.get(config.OSRM_PROFILE, 25.0),
+    )
+    if kind == "haversine":
+        return haversine
+    # only real road data is worth caching; the haversine estimate is cheaper to recompute
+    osrm = CachedBackend(
+        OSRMBackend(config.OSRM_BASE_URL, profile=config.OSRM_PROFILE, timeout=config.OSRM_TIMEOUT_SECONDS)
+    )
+    if kind == "osrm":
+        return osrm
+    return FallbackBackend(osrm, haversine, soft_timeout=config.OSRM_SOFT_TIMEOUT_SECONDS)
+
+
+_backend: Optional[DistanceBackend] = None
+
+
+def get_distance_backend() -> DistanceBackend:
+    """Process-wide backend selected by config.ROUTING_BACKEND."""
+    global _backend
+    if _backend is None:
+        _backend = _build_backend(config.ROUTING_BACKEND)
+    return _backend
+
+
+def set_distance_backend(backend: DistanceBackend) -> None:
+    """Swap the backend (e.g. a custom routing provider)."""
+    global _backend
+    _backend = backend
@@ -0,0 +1,147 @@
+import json
+import unicodedata
+from typing import Any, Dict, Optional
+
+from src.config import config
+from .cache import TTLCache
+from .logger import get_logger
+from .sqlite_store import SQLiteKVStore
+
+logger = get_logger(__name__)
+
+# Popular destinations resolved ahead of time so hot cities never touch the network.
+GAZETTEER: Dict[str, Dict[str, float]] = {
+    "jaipur": {"lat": 26.9124, "lon": 75.7873},
+    "ayodhya": {"lat": 26.7922, "lon": 82.1998},
+    "delhi": {"lat": 28.6139, "lon": 77.2090},
+    "new delhi": {"lat": 28.6139, "lon": 77.2090},
+    "mumbai": {"lat": 19.0760, "lon": 72.8777},
+    "agra": {"lat": 27.1767, "lon": 78.0081},
+    "varanasi": {"lat": 25.3176, "lon": 82.9739},
+    "udaipur": {"lat": 24.5854, "lon": 73.7125},
+    "lucknow": {"lat": 26.8467, "lon": 80.9462},
+    "kolkata": {"lat": 22.5726, "lon": 88.3639},
+    "bengaluru": {"lat": 12.9716, "lon": 77.5946},
+    "chennai": {"lat": 13.0827, "lon": 80.2707},
+    "hyderabad": {"lat": 17.3850, "lon": 78.4867},
+    "goa": {"lat": 15.2993, "lon": 74.1240},
+    "paris": {"lat": 48.8566, "lon": 2.3522},
+    "london": {"lat": 51.5074, "lon": -0.1278},
+    "rome": {"lat": 41.9028, "lon": 12.4964},
+    "barcelona": {"lat": 41.3874, "lon": 2.1686},
+    "amsterdam": {"lat": 52.3676, "lon": 4.9041},
+    "berlin": {"lat": 52.5200, "lon": 13.4050},
+    "prague": {"lat": 50.0755, "lon": 14.4378},
+    "istanbul": {"lat": 41.0082, "lon": 28.9784},
+    "dubai": {"lat": 25.2048, "lon": 55.2708},
+    "singapore": {"lat": 1.3521, "lon": 103.8198},
+    "bangkok": {"lat": 13.7563, "lon": 100.5018},
+    "tokyo": {"lat": 35.6762, "lon": 139.6503},
+    "kyoto": {"lat": 35.0116, "lon": 135.7681},
+    "new york": {"lat": 40.7128, "lon": -74.0060},
+    "san francisco": {"lat": 37.7749, "lon": -122.4194},
+    "sydney": {"lat": -33.8688, "lon": 151.2093},
+    "cairo": {"lat": 30.0444, "lon": 31.2357},
+}
+
+
+def normalize_city(city: str) -> str:
+    """Case/accent/whitespace-insensitive cache key for a city name."""
+    text = unicodedata.normalize("NFKD", city or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.casefold().split())
+
+
+class GeocodeCache:
+    """
+    Two-level geocode cache: in-memory LRU in front of a SQLite file shared across processes.
+    Failed lookups are cached too (with a shorter TTL) as {"error": "..."} entries.
+    """
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_seconds: int = 30 * 24 * 3600,
+        negative_ttl_seconds: int = 600,
+        memory_size: int = 1024,
+        gazetteer: Optional[Dict[str, Dict[str, float]]] = None,
+    ):
+        self.ttl = ttl_seconds
+        self.negative_ttl = negative_ttl_seconds
+        self._memory = TTLCache(ttl_seconds=min(ttl_seconds, 24 * 3600), max_size=memory_size)
+        self._negative = TTLCache(ttl_seconds=negative_ttl_seconds, max_size=memory_size)
+        self._store: Optional[SQLiteKVStore] = None
+        if path:
+            try:
+                self._store = SQLiteKVStore(path, table="geocode")
+            except Exception as e:
+                # fall back to memory-only caching (e.g. read-only filesystem)
+                logger.warning("geocode cache disabled on disk (%s): %s", path, e)
+        self._gazetteer: Dict[str, Dict[str, Any]] = {}
+        if gazetteer:
+            self.seed(gazetteer)
+
+    def seed(self, entries: Dict[str, Dict[str, float]]) -> None:
+        """Pre-load known coordinates; these are never expired."""
+        for name, geo in entries.items():
+            self._gazetteer[normalize_city(name)] = {
+                "lat": float(geo["lat"]),
+                "lon": float(geo["lon"]),
+                "source": "gazetteer",
+            }
+
+    def get(self, city: str) -> Optional[Dict[str, Any]]:
+        key = normalize_city(city)
+        hit = self._gazetteer.get(key) or self._memory.get(key) or self._negative.get(key)
+        if hit is not None:
+            return dict(hit)
+        if self._store is None:
+            return None
+        raw = self._store.get(key)
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        (self._negative if "error" in entry else self._memory).set(key, entry)
+        return dict(entry)
+
+    def ttl_remaining(self, city: str) -> Optional[float]:
+        """Seconds until the cached entry for `city` expires (inf for gazetteer cities, None if not cached)."""
+        key = normalize_city(city)
+        if key in self._gazetteer:
+            return float("inf")
+        if self._store is not None:
+            return self._store.ttl_remaining(key)
+        return self._memory.ttl_remaining(key) or self._negative.ttl_remaining(key)
+
+    def set(self, city: str, geo: Dict[str, Any]) -> None:
+        key = normalize_city(city)
+        entry = {"lat": float(geo["lat"]), "lon": float(geo["lon"]), "source": geo.get("source")}
+        self._memory.set(key, entry)
+        if self._store is not None:
+            self._store.set(key, json.dumps(entry), self.ttl)
+
+    def set_negative(self, city: str, reason: str) -> None:
+        key = normalize_city(city)
+        entry = {"error": reason}
+        self._negative.set(key, entry)
+        if self._store is not None:
+            self._store.set(key, json.dumps(entry), self.negative_ttl)
+
+
+def _load_gazetteer() -> Dict[str, Dict[str, float]]:
+    entries = dict(GAZETTEER)
+    if config.GEOCODE_GAZETTEER_PATH:
+        try:
+            with open(config.GEOCODE_GAZETTEER_PATH, encoding="utf-8") as f:
+                entries.update(json.load(f))
+        except Exception as e:
+            logger.warning("could not load gazetteer %s: %s", config.GEOCODE_GAZETTEER_PATH, e)
+    return entries
+
+
+# process-wide instance used by bbox_from_city
+geocode_cache = GeocodeCache(
+    path=config.GEOCODE_CACHE_PATH,
+    ttl_seconds=config.GEOCODE_TTL_SECONDS,
+    negative_ttl_seconds=config.GEOCODE_NEGATIVE_TTL_SECONDS,
+    gazetteer=_load_gazetteer(),
+)
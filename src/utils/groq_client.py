@@ -1,35 +1,146 @@
 from langchain_groq import ChatGroq
 import os
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
 from dotenv import load_dotenv
-from .cache import TTLCache, make_key
+from src.config import config
+from .llm_cache import LLMResponseCache, get_llm_cache
+from .rate_limit import get_rate_limiter
+from .singleflight import get_flight
+
+SYSTEM_PROMPT = "You are a travel planning expert assistant."
+# rate-limit bucket shared with the HTTP clients (see RATE_LIMITS)
+GROQ_HOST = "api.groq.com"
+# identical prompts in flight at the same time (e.g. two sessions planning the same trip) share one call
+_llm_flight = get_flight("llm")
 
 class GroqClient:
-    def __init__(self, model: str = "llama-3-8b-8192", temperature: float = 0.0, max_tokens: int = 512):
+    def __init__(
+        self,
+        model: str = "llama-3-8b-8192",
+        temperature: float = 0.0,
+        max_tokens: int = 512,
+        cache: Optional[LLMResponseCache] = None,
+    ):
         load_dotenv()
         self.llm = ChatGroq(
             model=model, 
             temperature=temperature, 
             max_tokens=max_tokens,
-            api_key=os.getenv("GROQ_API_KEY")
+            api_key=os.getenv("GROQ_API_KEY"),
+            # the Groq SDK retries 429/5xx itself with backoff, honouring Retry-After
+            max_retries=config.HTTP_MAX_RETRIES,
         )
-        # 30 min cache to avoid recomputing similar prompts
-        self._cache = TTLCache(ttl_seconds=1800, max_size=256)
+        # shared, persistent cache so repeat prompts cost no tokens across clients/processes
+        self._cache = cache or get_llm_cache()
         self._model = model
+        self._temperature = temperature
+        self._max_tokens = max_tokens
+        # token accounting across calls (usage_metadata reported by the API)
+        self._usage_lock = threading.Lock()
+        self._usage = {"calls": 0, "cache_hits": 0, "input_tokens": 0, "output_tokens": 0}
+
+    def _record(self, usage: Optional[Dict[str, Any]] = None, cache_hit: bool = False) -> None:
+        with self._usage_lock:
+            if cache_hit:
+                self._usage["cache_hits"] += 1
+                return
+            self._usage["calls"] += 1
+            if usage:
+                self._usage["input_tokens"] += usage.get("input_tokens", 0)
+                self._usage["output_tokens"] += usage.get("output_tokens", 0)
+
+    def usage(self) -> Dict[str, int]:
+        """LLM calls made, cache hits and tokens consumed by this client so far."""
+        with self._usage_lock:
+            return dict(self._usage)
 
-    def invoke(self, prompt: str, max_tokens: int = 512):
+    def _prepare(self, prompt: str, max_tokens: Optional[int]):
         # Build messages
         messages = [
-            ("system", "You are a travel planning expert assistant."),
+            ("system", SYSTEM_PROMPT),
             ("user", prompt)
         ]
+        key = LLMResponseCache.make_key(self._model, self._temperature, max_tokens, SYSTEM_PROMPT, prompt)
+        return messages, key
+
+    def invoke(self, prompt: str, max_tokens: Optional[int] = None):
+        max_tokens = max_tokens or self._max_tokens
+        messages, key = self._prepare(prompt, max_tokens)
         # cache lookup
-        key = make_key(self._model, max_tokens, prompt)
         cached = self._cache.get(key)
         if cached is not None:
+            self._record(cache_hit=True)
             return cached
 
-        response = self.llm.invoke(messages)
+        return _llm_flight.do(key, lambda: self._call(messages, key, max_tokens))
+
+    def _call(self, messages, key: str, max_tokens: int) -> str:
+        get_rate_limiter().acquire(GROQ_HOST)
+        response = self.llm.invoke(messages, max_tokens=max_tokens)
+        self._record(getattr(response, "usage_metadata", None))
         content = response.content
         # store
         self._cache.set(key, content)
         return content
+
+    async def ainvoke(self, prompt: str, max_tokens: Optional[int] = None):
+        max_tokens = max_tokens or self._max_tokens
+        messages, key = self._prepare(prompt, max_tokens)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._record(cache_hit=True)
+            return cached
+
+        return await _llm_flight.ado(key, lambda: self._acall(messages, key, max_tokens))
+
+    async def _acall(self, messages, key: str, max_tokens: int) -> str:
+        await get_rate_limiter().aacquire(GROQ_HOST)
+        response = await self.llm.ainvoke(messages, max_tokens=max_tokens)
+        self._record(getattr(response, "usage_metadata", None))
+        content = response.content
+        self._cache.set(key, content)
+        return content
+
+    def stream(self, prompt: str, max_tokens: Optional[int] = None) -> Iterator[str]:
+        """Yield the response in chunks as the model produces it; a cache hit is yielded whole."""
+        max_tokens = max_tokens or self._max_tokens
+        messages, key = self._prepare(prompt, max_tokens)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._record(cache_hit=True)
+            yield cached
+            return
+
+        parts = []
+        usage = None
+        get_rate_limiter().acquire(GROQ_HOST)
+        for chunk in self.llm.stream(messages, max_tokens=max_tokens):
+            # the final chunk carries usage_metadata
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            if chunk.content:
+                parts.append(chunk.content)
+                yield chunk.content
+        self._record(usage)
+        # only complete responses are cached
+        self._cache.set(key, "".join(parts))
+
+    async def astream(self, prompt: str, max_tokens: Optional[int] = None) -> AsyncIterator[str]:
+        max_tokens = max_tokens or self._max_tokens
+        messages, key = self._prepare(prompt, max_tokens)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._record(cache_hit=True)
+            yield cached
+            return
+
+        parts = []
+        usage = None
+        await get_rate_limiter().aacquire(GROQ_HOST)
+        async for chunk in self.llm.astream(messages, max_tokens=max_tokens):
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            if chunk.content:
+                parts.append(chunk.content)
+                yield chunk.content
+        self._record(usage)
+        self._cache.set(key, "".join(parts))
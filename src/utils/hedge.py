@@ -0,0 +1,119 @@
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# shared pool for speculative requests; threads mostly sit on sockets
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="hedge")
+
+_NOT_DONE = object()
+
+
+def _winner(results: List[Any], start: int, launched: int) -> Tuple[Optional[int], bool]:
+    """
+    Highest-priority answer so far: the first non-empty result whose higher-priority
+    siblings all finished empty. Returns (index, decided).
+    """
+    for i in range(start, launched):
+        if results[i] is _NOT_DONE:
+            return None, False
+        if results[i]:
+            return i, True
+    return None, launched == len(results)
+
+
+def first_non_empty(
+    steps: Sequence[Callable[[threading.Event], Any]],
+    start: int = 0,
+    hedge_delay: float = 1.0,
+) -> Tuple[Optional[int], Any]:
+    """
+    Run `steps` (ordered by priority) speculatively in threads. Step i+1 is launched
+    once step i has been outstanding for `hedge_delay` seconds, or immediately when
+    everything launched so far came back empty. Returns (index, result) of the
+    highest-priority non-empty result, or (None, []) if all are empty. Steps that
+    raise count as empty.
+
+    Threads can't be interrupted, so each step gets a cancel event that is set once
+    the race is decided: steps not started yet never run, and a step that honours
+    the event (http.request(cancel=...)) stops before taking a rate-limit token,
+    sending or retrying. A request already on the wire runs to its end in the
+    background, without being counted on the circuit breaker.
+    """
+    results: List[Any] = [_NOT_DONE] * len(steps)
+    pending: Dict[Future, int] = {}
+    cancel = threading.Event()
+    launched = start
+    last_launch = 0.0
+    try:
+        while True:
+            now = time.monotonic()
+            if launched < len(steps) and (not pending or now - last_launch >= hedge_delay):
+                # in the caller's context, so per-caller HTTP hooks (http.call_budget) apply to the step
+                pending[_executor.submit(contextvars.copy_context().run, steps[launched], cancel)] = launched
+                launched += 1
+                last_launch = now
+
+            idx, decided = _winner(results, start, launched)
+            if decided:
+                return idx, (results[idx] if idx is not None else [])
+
+            timeout = None
+            if launched < len(steps):
+                timeout = max(0.0, hedge_delay - (time.monotonic() - last_launch))
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            for f in done:
+                i = pending.pop(f)
+                try:
+                    results[i] = f.result()
+                except Exception as e:
+                    logger.warning("hedged step %d failed: %s", i, e)
+                    results[i] = []
+    finally:
+        cancel.set()
+        for f in pending:
+            f.cancel()
+
+
+async def afirst_non_empty(
+    steps: Sequence[Callable[[], Awaitable[Any]]],
+    start: int = 0,
+    hedge_delay: float = 1.0,
+) -> Tuple[Optional[int], Any]:
+    """asyncio counterpart of `first_non_empty`; losing tasks are cancelled."""
+    results: List[Any] = [_NOT_DONE] * len(steps)
+    pending: Dict[asyncio.Task, int] = {}
+    launched = start
+    last_launch = 0.0
+    try:
+        while True:
+            now = time.monotonic()
+            if launched < len(steps) and (not pending or now - last_launch >= hedge_delay):
+                pending[asyncio.ensure_future(steps[launched]())] = launched
+                launched += 1
+                last_launch = now
+
+            idx, decided = _winner(results, start, launched)
+            if decided:
+                return idx, (results[idx] if idx is not None else [])
+
+            timeout = None
+            if launched < len(steps):
+                timeout = max(0.0, hedge_delay - (time.monotonic() - last_launch))
+            done, _ = await asyncio.wait(list(pending), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                i = pending.pop(t)
+                try:
+                    results[i] = t.result()
+                except Exception as e:
+                    logger.warning("hedged step %d failed: %s", i, e)
+                    results[i] = []
+    finally:
+        for t in pending:
+            t.cancel()
@@ -0,0 +1,288 @@
+import asyncio
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.config import config
+from src.utils.circuit_breaker import get_breaker
+from src.utils.rate_limit import backoff_delay, get_rate_limiter, retry_after_seconds
+
+USER_AGENT = "AI-Travel-Agent/1.0"
+# worth retrying: rate limited or a transient upstream failure
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+# httpx.AsyncClient and asyncio.Semaphore are bound to the loop they were first used on, so keep them
+# per loop object: weakly, so a finished asyncio.run doesn't pin its loop, and never by id(), which
+# CPython reuses once a loop is collected
+_async_lock = threading.Lock()
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_host_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+# hook run before every sync upstream attempt made in the current context (see call_budget); executors
+# that do HTTP work on a caller's behalf (hedge, distance_matrix) run it in a copy of the caller's context
+_call_budget: ContextVar[Optional[Callable[[], bool]]] = ContextVar("http_call_budget", default=None)
+
+
+class RequestCancelled(Exception):
+    """The caller withdrew the request (e.g. a hedged attempt that lost the race) before it was sent."""
+
+
+@contextmanager
+def call_budget(charge: Callable[[], bool]) -> Iterator[None]:
+    """
+    Call `charge()` before every sync upstream attempt (retries included) made inside
+    the block, e.g. to block until a budget allows it. When it returns False the
+    request raises RequestCancelled instead of being sent.
+    """
+    token = _call_budget.set(charge)
+    try:
+        yield
+    finally:
+        _call_budget.reset(token)
+
+
+def _timeout(timeout: Optional[float]) -> Tuple[float, float]:
+    return (config.HTTP_CONNECT_TIMEOUT, timeout or config.HTTP_READ_TIMEOUT)
+
+
+def get_session() -> requests.Session:
+    """Process-wide keep-alive session with a bounded connection pool per host."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=config.HTTP_MAX_CONNECTIONS,
+                pool_maxsize=config.HTTP_MAX_PER_HOST,
+                pool_block=True,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+            _session = session
+        return _session
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Shared httpx.AsyncClient for the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _async_lock:
+        client = _async_clients.get(loop)
+        if client is None or client.is_closed:
+            _drop_closed_loops()
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=config.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=config.HTTP_MAX_CONNECTIONS,
+                ),
+                timeout=httpx.Timeout(config.HTTP_READ_TIMEOUT, connect=config.HTTP_CONNECT_TIMEOUT),
+                headers={"User-Agent": USER_AGENT},
+            )
+            _async_clients[loop] = client
+        return client
+
+
+def _drop_closed_loops() -> None:
+    # a loop closed without aclose() can stay alive through its client's connections; forget it
+    for loop in [l for l in list(_async_clients.keys()) + list(_host_semaphores.keys()) if l.is_closed()]:
+        _async_clients.pop(loop, None)
+        _host_semaphores.pop(loop, None)
+
+
+def _host_semaphore(url: str) -> asyncio.Semaphore:
+    # httpx only caps total connections; enforce the per-host limit ourselves
+    loop = asyncio.get_running_loop()
+    host = urlsplit(url).netloc
+    with _async_lock:
+        sems = _host_semaphores.get(loop)
+        if sems is None:
+            sems = _host_semaphores[loop] = {}
+        sem = sems.get(host)
+        if sem is None:
+            sem = sems[host] = asyncio.Semaphore(config.HTTP_MAX_PER_HOST)
+        return sem
+
+
+def _retry_delay(status: int, headers: Any, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying, or None to give up and hand the response back."""
+    if status not in RETRY_STATUSES or attempt >= config.HTTP_MAX_RETRIES:
+        return None
+    retry_after = retry_after_seconds(headers.get("Retry-After"))
+    if retry_after is None:
+        return backoff_delay(attempt)
+    # don't park a user request behind a long upstream ban
+    return retry_after if retry_after <= config.HTTP_RETRY_MAX_DELAY else None
+
+
+def _is_failure(status: int) -> bool:
+    # 4xx other than 429 means the provider is up and answered
+    return status >= 500 or status == 429
+
+
+def _cancelled(cancel: Optional[threading.Event]) -> bool:
+    return cancel is not None and cancel.is_set()
+
+
+def request(method: str, url: str, timeout: Optional[float] = None, provider: Optional[str] = None,
+            cancel: Optional[threading.Event] = None, **kwargs: Any) -> requests.Response:
+    """
+    Rate-limited request with retries on 429/5xx and connection errors. With a
+    `provider`, calls go through that provider's circuit breaker and raise
+    CircuitOpenError immediately while it is open.
+
+    Once `cancel` is set, or a `call_budget` refuses the attempt, the request raises
+    RequestCancelled instead of taking a rate-limit token, sending or retrying;
+    that is not recorded on the breaker as a failure. A cancelled request already
+    on the wire still runs to completion, but its outcome is not recorded either.
+    """
+    if provider is None:
+        return _send(method, url, timeout, cancel, **kwargs)
+    breaker = get_breaker(provider)
+    breaker.allow()
+    try:
+        resp = _send(method, url, timeout, cancel, **kwargs)
+    except RequestCancelled:
+        # withdrawn by the caller or refused by its call budget: says nothing about the provider
+        breaker.release()
+        raise
+    except Exception:
+        if _cancelled(cancel):
+            breaker.release()
+        else:
+            breaker.record_failure()
+        raise
+    except BaseException:
+        breaker.release()
+        raise
+    if _cancelled(cancel):
+        breaker.release()
+    elif _is_failure(resp.status_code):
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return resp
+
+
+def _send(method: str, url: str, timeout: Optional[float], cancel: Optional[threading.Event] = None,
+          **kwargs: Any) -> requests.Response:
+    host = urlsplit(url).netloc
+    limiter = get_rate_limiter()
+    attempt = 0
+    while True:
+        if _cancelled(cancel):
+            raise RequestCancelled(url)
+        charge = _call_budget.get()
+        if charge is not None and not charge():
+            raise RequestCancelled(url)
+        limiter.acquire(host, cancel)
+        if _cancelled(cancel):
+            raise RequestCancelled(url)
+        try:
+            resp = get_session().request(method, url, timeout=_timeout(timeout), **kwargs)
+        except requests.ConnectionError as e:
+            # timeouts are not retried: the caller's own fallback is faster than waiting again
+            if isinstance(e, requests.Timeout) or attempt >= config.HTTP_MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+        else:
+            if resp.status_code in RETRY_STATUSES:
+                limiter.throttled(host, retry_after_seconds(resp.headers.get("Retry-After")))
+            delay = _retry_delay(resp.status_code, resp.headers, attempt)
+            if delay is None:
+                return resp
+            resp.close()
+        limiter.retried(host)
+        if cancel is not None:
+            cancel.wait(delay)
+        else:
+            time.sleep(delay)
+        attempt += 1
+
+
+def get(url: str, **kwargs: Any) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs: Any) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+async def arequest(method: str, url: str, timeout: Optional[float] = None, provider: Optional[str] = None,
+                   **kwargs: Any) -> httpx.Response:
+    if provider is None:
+        return await _asend(method, url, timeout, **kwargs)
+    breaker = get_breaker(provider)
+    breaker.allow()
+    try:
+        resp = await _asend(method, url, timeout, **kwargs)
+    except Exception:
+        breaker.record_failure()
+        raise
+    except BaseException:
+        # cancelled, e.g. a hedged attempt that lost the race
+        breaker.release()
+        raise
+    if _is_failure(resp.status_code):
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return resp
+
+
+async def _asend(method: str, url: str, timeout: Optional[float], **kwargs: Any) -> httpx.Response:
+    connect, read = _timeout(timeout)
+    host = urlsplit(url).netloc
+    limiter = get_rate_limiter()
+    attempt = 0
+    while True:
+        await limiter.aacquire(host)
+        try:
+            async with _host_semaphore(url):
+                resp = await get_async_client().request(
+                    method, url, timeout=httpx.Timeout(read, connect=connect), **kwargs
+                )
+        except (httpx.ConnectError, httpx.RemoteProtocolError):
+            if attempt >= config.HTTP_MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+        else:
+            if resp.status_code in RETRY_STATUSES:
+                limiter.throttled(host, retry_after_seconds(resp.headers.get("Retry-After")))
+            delay = _retry_delay(resp.status_code, resp.headers, attempt)
+            if delay is None:
+                return resp
+        limiter.retried(host)
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+async def aget(url: str, **kwargs: Any) -> httpx.Response:
+    return await arequest("GET", url, **kwargs)
+
+
+async def apost(url: str, **kwargs: Any) -> httpx.Response:
+    return await arequest("POST", url, **kwargs)
+
+
+async def aclose() -> None:
+    """Close the async client of the running loop (e.g. at the end of a batch run)."""
+    loop = asyncio.get_running_loop()
+    with _async_lock:
+        client = _async_clients.pop(loop, None)
+        _host_semaphores.pop(loop, None)
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,112 @@
+import json
+from typing import Any, List, Optional, Tuple
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class IncrementalJSONParser:
+    """
+    Tolerant JSON extractor for LLM output that can be fed chunk by chunk.
+
+    Scanning starts at the first '{' or '[' (leading prose is skipped) and stops
+    when that top-level value closes (trailing prose is ignored). While the value
+    is still open, `value()` returns a best-effort parse of what has arrived:
+    an unterminated string is closed, dangling keys/commas/partial tokens are cut
+    back to the last complete element, and open containers are closed.
+    """
+    def __init__(self):
+        self._buf: List[str] = []
+        self._text = ""
+        self._start: Optional[int] = None
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_str = False
+        self._esc = False
+        self._end: Optional[int] = None
+        # positions where the text can be cut and still form valid JSON, with the
+        # closers needed at that point
+        self._cuts: List[Tuple[int, str]] = []
+
+    @property
+    def complete(self) -> bool:
+        return self._end is not None
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    def feed(self, chunk: str) -> None:
+        if self._end is not None or not chunk:
+            return
+        self._text += chunk
+        self._scan()
+
+    def _closers(self) -> str:
+        return "".join(reversed(self._stack))
+
+    def _scan(self) -> None:
+        text = self._text
+        i = self._pos
+        if self._start is None:
+            starts = [p for p in (text.find("{", i), text.find("[", i)) if p != -1]
+            if not starts:
+                self._pos = len(text)
+                return
+            self._start = i = min(starts)
+        while i < len(text):
+            ch = text[i]
+            if self._in_str:
+                if self._esc:
+                    self._esc = False
+                elif ch == "\\":
+                    self._esc = True
+                elif ch == '"':
+                    self._in_str = False
+            elif ch == '"':
+                self._in_str = True
+            elif ch in _CLOSERS:
+                self._stack.append(_CLOSERS[ch])
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if not self._stack:
+                    self._end = i + 1
+                    self._pos = i + 1
+                    return
+                self._cuts.append((i + 1, self._closers()))
+            elif ch == ",":
+                self._cuts.append((i, self._closers()))
+            i += 1
+        self._pos = i
+
+    def candidates(self) -> List[str]:
+        """Repaired JSON strings to try, most complete first."""
+        if self._start is None:
+            return []
+        if self._end is not None:
+            return [self._text[self._start:self._end]]
+        body = self._text[self._start:]
+        if self._in_str:
+            body = (body[:-1] if self._esc else body) + '"'
+        out = [body.rstrip().rstrip(",") + self._closers()]
+        for idx, closers in reversed(self._cuts):
+            out.append(self._text[self._start:idx].rstrip().rstrip(",") + closers)
+        # an opening bracket on its own is still a (empty) value
+        out.append(self._text[self._start] + _CLOSERS[self._text[self._start]])
+        return out
+
+    def value(self) -> Any:
+        """Best-effort parse of everything fed so far; raises ValueError if nothing usable."""
+        for candidate in self.candidates():
+            try:
+                return json.loads(candidate)
+            except ValueError:
+                continue
+        raise ValueError("no JSON object found in text")
+
+
+def parse_partial_json(text: str) -> Any:
+    """One-shot helper: extract and repair the first JSON value in `text`."""
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    return parser.value()
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+from src.config import config
+from .cache import TTLCache
+from .logger import get_logger
+from .sqlite_store import SQLiteKVStore
+
+logger = get_logger(__name__)
+
+
+class CacheBackend(ABC):
+    """Minimal byte-oriented store the LLM cache can sit on."""
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+
+class MemoryBackend(CacheBackend):
+    """Process-local store (previous behaviour); lost on restart."""
+    def __init__(self, max_size: int = 1024, max_bytes: Optional[int] = 64 * 1024 * 1024, ttl_seconds: int = 1800):
+        self._cache = TTLCache(ttl_seconds=ttl_seconds, max_size=max_size, max_bytes=max_bytes)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        self._cache.set(key, value)
+
+    def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+
+class SQLiteBackend(CacheBackend):
+    """On-disk store shared by every process on the host; survives restarts."""
+    def __init__(self, path: str):
+        self._store = SQLiteKVStore(path, table="llm_responses")
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._store.get(key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        self._store.set(key, value, ttl_seconds)
+
+    def delete(self, key: str) -> None:
+        self._store.delete(key)
+
+
+class RedisBackend(CacheBackend):
+    """
+    Any client exposing redis-py's `get(key)` / `set(key, value, ex=ttl)` / `delete(key)`:
+    redis.Redis, a fakeredis instance, or another Redis-protocol server.
+    """
+    def __init__(self, client: Any):
+        self._client = client
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        import redis  # optional dependency
+        return cls(redis.Redis.from_url(url))
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        self._client.set(key, value, ex=int(ttl_seconds))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+
+class LLMResponseCache:
+    """
+    Content-addressed cache of LLM responses. The key is a SHA-256 over everything
+    that influences the output; values are stored zlib-compressed.
+    """
+    NAMESPACE = "llm:v1:"
+
+    def __init__(self, backend: CacheBackend, ttl_seconds: int = 7 * 24 * 3600):
+        self.backend = backend
+        self.ttl = ttl_seconds
+
+    @classmethod
+    def make_key(cls, model: str, temperature: float, max_tokens: int, system_prompt: str, prompt: str) -> str:
+        payload = json.dumps(
+            [model, float(temperature), int(max_tokens), system_prompt, prompt],
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        return cls.NAMESPACE + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            raw = self.backend.get(key)
+        except Exception as e:
+            logger.warning("llm cache read failed: %s", e)
+            return None
+        if raw is None:
+            return None
+        try:
+            return zlib.decompress(raw).decode("utf-8")
+        except (zlib.error, UnicodeDecodeError) as e:
+            # a corrupt/truncated row is a miss, not a planner failure; drop it so it gets rewritten
+            logger.warning("llm cache entry %s unreadable, dropping it: %s", key, e)
+            try:
+                self.backend.delete(key)
+            except Exception as e:
+                logger.warning("llm cache delete failed: %s", e)
+            return None
+
+    def set(self, key: str, content: str) -> None:
+        try:
+            self.backend.set(key, zlib.compress(content.encode("utf-8"), 6), self.ttl)
+        except Exception as e:
+            logger.warning("llm cache write failed: %s", e)
+
+
+def _backend_from_config() -> CacheBackend:
+    kind = config.LLM_CACHE_BACKEND
+    try:
+        if kind == "redis":
+            return RedisBackend.from_url(config.REDIS_URL)
+        if kind == "sqlite":
+            return SQLiteBackend(config.LLM_CACHE_PATH)
+    except Exception as e:
+        logger.warning("llm cache backend '%s' unavailable, using memory: %s", kind, e)
+    return MemoryBackend(ttl_seconds=config.LLM_CACHE_TTL_SECONDS)
+
+
+_default_cache: Optional[LLMResponseCache] = None
+_default_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Process-wide cache shared by every GroqClient (planner, summarizer, ...)."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = LLMResponseCache(_backend_from_config(), ttl_seconds=config.LLM_CACHE_TTL_SECONDS)
+        return _default_cache
@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class _Region:
+    """Square float32 duration/distance matrices over the points seen in one area (NaN = unknown)."""
+    def __init__(self, capacity: int = 64):
+        self.slots: Dict[str, int] = {}
+        self.durations = np.full((capacity, capacity), np.nan, dtype=np.float32)
+        self.distances = np.full((capacity, capacity), np.nan, dtype=np.float32)
+        self.created = time.monotonic()
+
+    def _grow(self, capacity: int) -> None:
+        for name in ("durations", "distances"):
+            old = getattr(self, name)
+            new = np.full((capacity, capacity), np.nan, dtype=np.float32)
+            new[:old.shape[0], :old.shape[1]] = old
+            setattr(self, name, new)
+
+    def slot(self, key: str) -> int:
+        idx = self.slots.get(key)
+        if idx is None:
+            idx = len(self.slots)
+            if idx >= self.durations.shape[0]:
+                self._grow(self.durations.shape[0] * 2)
+            self.slots[key] = idx
+            self.durations[idx, idx] = 0.0
+            self.distances[idx, idx] = 0.0
+        return idx
+
+
+class MatrixCache:
+    """
+    Pairwise travel-time/distance cache. Points are keyed by POI `xid` when present,
+    otherwise by coordinates rounded to ~1 m, and grouped into regions (a coarse
+    lat/lon grid cell of the request's centroid) so each region's matrix stays dense.
+    Regions are LRU-evicted, expire after `ttl_seconds`, and are reset once they
+    exceed `max_points_per_region`.
+    """
+    def __init__(
+        self,
+        max_points_per_region: int = 1024,
+        max_regions: int = 16,
+        ttl_seconds: int = 7 * 24 * 3600,
+        region_deg: float = 0.5,
+        precision: int = 5,
+    ):
+        self.max_points = max_points_per_region
+        self.max_regions = max_regions
+        self.ttl = ttl_seconds
+        self.region_deg = region_deg
+        self.precision = precision
+        self._regions: "OrderedDict[str, _Region]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.pairs_requested = 0
+        self.pairs_from_cache = 0
+        self.pairs_fetched = 0
+
+    def point_key(self, c: Dict[str, Any]) -> str:
+        if c.get("xid"):
+            return f"xid:{c['xid']}"
+        return f"{round(float(c['lat']), self.precision)},{round(float(c['lon']), self.precision)}"
+
+    def _region_key(self, coords: List[Dict[str, Any]]) -> str:
+        lat = sum(float(c["lat"]) for c in coords) / len(coords)
+        lon = sum(float(c["lon"]) for c in coords) / len(coords)
+        return f"{int(lat // self.region_deg)}:{int(lon // self.region_deg)}"
+
+    def _region(self, key: str, incoming: int) -> _Region:
+        region = self._regions.get(key)
+        if (
+            region is None
+            or time.monotonic() - region.created > self.ttl
+            or len(region.slots) + incoming > self.max_points
+        ):
+            region = _Region()
+            self._regions[key] = region
+        self._regions.move_to_end(key)
+        while len(self._regions) > self.max_regions:
+            self._regions.popitem(last=False)
+        return region
+
+    def lookup(self, coords: List[Dict[str, Any]]) -> Tuple[_Region, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns (region, slots, durations, distances) for coords; the matrices are
+        float64 copies with NaN where the pair isn't cached yet.
+        """
+        keys = [self.point_key(c) for c in coords]
+        with self._lock:
+            region = self._region(self._region_key(coords), len(keys))
+            slots = np.array([region.slot(k) for k in keys], dtype=np.intp)
+            grid = np.ix_(slots, slots)
+            return (
+                region,
+                slots,
+                region.durations[grid].astype(np.float64),
+                region.distances[grid].astype(np.float64),
+            )
+
+    def store(
+        self,
+        region: _Region,
+        slots: np.ndarray,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        durations: np.ndarray,
+        distances: Optional[np.ndarray],
+    ) -> None:
+        """Write a fetched rows x cols block back (rows/cols index into `slots`)."""
+        with self._lock:
+            grid = np.ix_(slots[rows], slots[cols])
+            region.durations[grid] = durations
+            if distances is not None:
+                region.distances[grid] = distances
+
+    def record(self, requested: int, fetched: int) -> None:
+        with self._lock:
+            self.pairs_requested += requested
+            self.pairs_fetched += fetched
+            self.pairs_from_cache += requested - fetched
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "regions": len(self._regions),
+                "points": sum(len(r.slots) for r in self._regions.values()),
+                "bytes": sum(r.durations.nbytes + r.distances.nbytes for r in self._regions.values()),
+                "pairs_requested": self.pairs_requested,
+                "pairs_from_cache": self.pairs_from_cache,
+                "pairs_fetched": self.pairs_fetched,
+            }
@@ -1,17 +1,68 @@
-import requests
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+from src.config import config
+from . import http
+from .cache import TTLCache
+from .singleflight import get_flight
 
-def fetch_weather_by_coords(lat:float, lon:float, days:int=7) -> Dict[str,Any]:
-    """
-    Open-Meteo free API. Returns daily forecasts for the nexts days.
-    """
-    params = {
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+# Open-Meteo forecasts at most 16 days ahead and rejects longer requests
+MAX_FORECAST_DAYS = 16
+# concurrent requests for the same coordinates share one upstream call
+_weather_flight = get_flight("weather")
+# forecasts by coordinates; every trip length is sliced from the same WEATHER_FETCH_DAYS forecast
+_forecasts = TTLCache(ttl_seconds=config.WEATHER_CACHE_TTL_SECONDS, max_size=2048)
+
+def _forecast_key(lat:float, lon:float, days:int) -> Tuple[float, float, int]:
+    return (round(lat, 4), round(lon, 4), min(max(days, config.WEATHER_FETCH_DAYS), MAX_FORECAST_DAYS))
+
+def _sliced(forecast:Dict[str,Any], days:int) -> Dict[str,Any]:
+    daily = {k: (v[:days] if isinstance(v, list) else v) for k, v in (forecast.get("daily") or {}).items()}
+    return dict(forecast, daily=daily)
+
+def _forecast_params(lat:float, lon:float, days:int) -> Dict[str,Any]:
+    return {
         "latitude":lat,
         "longitude":lon,
         "daily":"weathercode,temperature_2m_max,temperature_2m_min",
         "timezone":"UTC",
         "forecast_days":days
     }
-    r = requests.get("https://api.open-meteo.com/v1/forecast", params=params)
+
+def fetch_weather_by_coords(lat:float, lon:float, days:int=7) -> Dict[str,Any]:
+    """
+    Open-Meteo free API. Returns daily forecasts for the nexts days.
+    """
+    key = _forecast_key(lat, lon, days)
+    forecast = _forecasts.get(key)
+    if forecast is None:
+        forecast = _weather_flight.do(key, lambda: _fetch_weather(lat, lon, key[2]))
+        _forecasts.set(key, forecast)
+    return _sliced(forecast, days)
+
+def _fetch_weather(lat:float, lon:float, days:int) -> Dict[str,Any]:
+    r = http.get(FORECAST_URL, params=_forecast_params(lat, lon, days), timeout=10, provider="open_meteo")
+    r.raise_for_status()
+    return r.json()
+
+def forecast_ttl_remaining(lat:float, lon:float) -> Optional[float]:
+    """Seconds until the cached forecast for these coordinates expires (None if not cached)."""
+    return _forecasts.ttl_remaining(_forecast_key(lat, lon, config.WEATHER_FETCH_DAYS))
+
+def refresh_forecast(lat:float, lon:float) -> None:
+    """Fetch the forecast live and replace the cached one (cache warming)."""
+    key = _forecast_key(lat, lon, config.WEATHER_FETCH_DAYS)
+    _forecasts.set(key, _weather_flight.do(key, lambda: _fetch_weather(lat, lon, key[2])))
+
+async def afetch_weather_by_coords(lat:float, lon:float, days:int=7) -> Dict[str,Any]:
+    """Async variant of `fetch_weather_by_coords` using the shared httpx client."""
+    key = _forecast_key(lat, lon, days)
+    forecast = _forecasts.get(key)
+    if forecast is None:
+        forecast = await _weather_flight.ado(key, lambda: _afetch_weather(lat, lon, key[2]))
+        _forecasts.set(key, forecast)
+    return _sliced(forecast, days)
+
+async def _afetch_weather(lat:float, lon:float, days:int) -> Dict[str,Any]:
+    r = await http.aget(FORECAST_URL, params=_forecast_params(lat, lon, days), timeout=10, provider="open_meteo")
     r.raise_for_status()
-    return r.json()
\ No newline at end of file
+    return r.json()
@@ -64,59 +64,291 @@
 
 
 import os
+import threading
 import requests
-from typing import List, Dict, Any
+import httpx
+from typing import List, Dict, Any, Optional
+from src.config import config
+from . import http
+from .cache import TTLCache
+from .geocode_cache import geocode_cache, normalize_city
+from .hedge import first_non_empty, afirst_non_empty
+from .poi_index import get_poi_index
+from .singleflight import get_flight
 
 OTM_KEY = os.getenv("OPENTRIPMAP_KEY")
 BASE_URL = "https://api.opentripmap.com/0.1/en/places"
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+OVERPASS_URL = "https://overpass-api.de/api/interpreter"
+
+DEFAULT_KINDS = "interesting_places,historic,architecture,cultural,museums,natural,urban_environment,fortifications,monuments,temples,castles"
+BROAD_KINDS = "interesting_places,tourist_facilities,historic,architecture,cultural,museums,urban_environment,natural,monuments,fortifications,temples,bridges,other"
+
+# which broadening attempt last produced results for a (city, query) so later requests skip straight to it
+_attempt_levels = TTLCache(ttl_seconds=24 * 3600, max_size=4096)
+# identical in-flight lookups (same city/query from concurrent sessions) share one upstream request
+_geocode_flight = get_flight("geocode")
+_attraction_flight = get_flight("attractions")
+# non-empty POI lists by query; trips to one city share them unless their interests add OTM kinds
+# (see poi_ranking.query_kinds); ranking is local
+_attraction_results = TTLCache(ttl_seconds=config.ATTRACTION_CACHE_TTL_SECONDS, max_size=1024)
+
+
+def _first_city(city: str) -> str:
+    return city.split(',')[0].strip() if ',' in city else city.strip()
 
 # City to Coordinates
 def bbox_from_city(city: str) -> Dict[str, Any]:
     """
-    Try to get city coordinates using:
+    Resolve city coordinates, served from the geocode cache when possible
+    (gazetteer → in-memory LRU → SQLite). On a miss, try:
     1. OpenStreetMap (Nominatim)
     2. Fallback: OpenTripMap /geoname endpoint
     """
-    city_name = city.split(',')[0].strip() if ',' in city else city.strip()
+    city_name = _first_city(city)
+
+    cached = geocode_cache.get(city_name)
+    if cached is None:
+        # parallel graph branches and other sessions asking for the same city share one lookup
+        return _geocode_flight.do(normalize_city(city_name), lambda: _resolve_city(city_name))
+
+    if "error" in cached:
+        raise ValueError(cached["error"])
+    return cached
+
+
+async def abbox_from_city(city: str) -> Dict[str, Any]:
+    """Async variant of `bbox_from_city` (same cache, async HTTP on a miss)."""
+    city_name = _first_city(city)
+
+    cached = geocode_cache.get(city_name)
+    if cached is None:
+        return await _geocode_flight.ado(normalize_city(city_name), lambda: _aresolve_city(city_name))
+
+    if "error" in cached:
+        raise ValueError(cached["error"])
+    return cached
+
+
+def _resolve_city(city_name: str) -> Dict[str, Any]:
+    # a lookup that finished just before this one became the leader may have filled the cache
+    cached = geocode_cache.get(city_name)
+    if cached is not None:
+        if "error" in cached:
+            raise ValueError(cached["error"])
+        return cached
+    try:
+        geo = _geocode_live(city_name)
+    except ValueError as e:
+        geocode_cache.set_negative(city_name, str(e))
+        raise
+    geocode_cache.set(city_name, geo)
+    return geo
+
+
+async def _aresolve_city(city_name: str) -> Dict[str, Any]:
+    cached = geocode_cache.get(city_name)
+    if cached is not None:
+        if "error" in cached:
+            raise ValueError(cached["error"])
+        return cached
+    try:
+        geo = await _ageocode_live(city_name)
+    except ValueError as e:
+        geocode_cache.set_negative(city_name, str(e))
+        raise
+    geocode_cache.set(city_name, geo)
+    return geo
+
+
+def refresh_city(city: str) -> Dict[str, Any]:
+    """Geocode `city` live and overwrite its cache entry (cache warming: readers keep the old entry meanwhile)."""
+    city_name = _first_city(city)
+    geo = _geocode_flight.do(f"refresh|{normalize_city(city_name)}", lambda: _geocode_live(city_name))
+    geocode_cache.set(city_name, geo)
+    return geo
+
+
+def _nominatim_params(city_name: str) -> Dict[str, Any]:
+    return {"q": city_name, "format": "json", "limit": 1}
+
+
+def _parse_nominatim(data: Any) -> Optional[Dict[str, Any]]:
+    if data and "lat" in data[0] and "lon" in data[0]:
+        return {
+            "lat": float(data[0]["lat"]),
+            "lon": float(data[0]["lon"]),
+            "source": "nominatim"
+        }
+    return None
 
+
+def _parse_geoname(city_name: str, data: Any) -> Dict[str, Any]:
+    if isinstance(data, dict) and "lat" in data and "lon" in data:
+        return {
+            "lat": float(data["lat"]),
+            "lon": float(data["lon"]),
+            "source": "opentripmap"
+        }
+    raise ValueError(f"Geoname lookup failed for city: {city_name}. Response: {data}")
+
+
+def _geocode_live(city_name: str) -> Dict[str, Any]:
+    """
+    Nominatim first, OpenTripMap /geoname as the fallback. Raises ValueError only
+    for a definitive miss (a provider answered and had no match), which callers
+    negative-cache; when neither provider answered, the transport/HTTP error is
+    re-raised as is so an outage never marks a real city as unknown.
+    """
+    miss = None
     # ---- Try Nominatim first (more reliable globally)
     try:
-        nominatim_url = "https://nominatim.openstreetmap.org/search"
-        params = {"q": city_name, "format": "json", "limit": 1}
-        headers = {"User-Agent": "AI-Travel-Agent/1.0"}
-        r = requests.get(nominatim_url, params=params, headers=headers, timeout=10)
+        r = http.get(NOMINATIM_URL, params=_nominatim_params(city_name), timeout=10, provider="nominatim")
+        r.raise_for_status()
+        geo = _parse_nominatim(r.json())
+        if geo:
+            return geo
+        miss = "no OSM match"
+    except Exception as e:
+        print(f"[WARN] OSM lookup failed for {city_name}: {e}")
+
+    # ---- Fallback to OpenTripMap geoname
+    try:
+        r = http.get(f"{BASE_URL}/geoname", params={"name": city_name, "apikey": OTM_KEY}, timeout=10, provider="opentripmap")
         r.raise_for_status()
         data = r.json()
+    except Exception as e:
+        if miss is None:
+            raise
+        raise ValueError(f"[ERROR] City coordinate lookup failed for '{city_name}': {miss}; geoname: {e}")
+    try:
+        return _parse_geoname(city_name, data)
+    except ValueError as e:
+        raise ValueError(f"[ERROR] City coordinate lookup failed for '{city_name}': {e}")
+
 
-        if data and "lat" in data[0] and "lon" in data[0]:
-            return {
-                "lat": float(data[0]["lat"]),
-                "lon": float(data[0]["lon"]),
-                "source": "nominatim"
-            }
+async def _ageocode_live(city_name: str) -> Dict[str, Any]:
+    miss = None
+    try:
+        r = await http.aget(NOMINATIM_URL, params=_nominatim_params(city_name), timeout=10, provider="nominatim")
+        r.raise_for_status()
+        geo = _parse_nominatim(r.json())
+        if geo:
+            return geo
+        miss = "no OSM match"
     except Exception as e:
         print(f"[WARN] OSM lookup failed for {city_name}: {e}")
 
-    # ---- Fallback to OpenTripMap geoname
     try:
-        r = requests.get(f"{BASE_URL}/geoname", params={"name": city_name, "apikey": OTM_KEY}, timeout=10)
+        r = await http.aget(f"{BASE_URL}/geoname", params={"name": city_name, "apikey": OTM_KEY}, timeout=10, provider="opentripmap")
         r.raise_for_status()
         data = r.json()
-        if isinstance(data, dict) and "lat" in data and "lon" in data:
-            return {
-                "lat": float(data["lat"]),
-                "lon": float(data["lon"]),
-                "source": "opentripmap"
-            }
-        else:
-            raise ValueError(f"Geoname lookup failed for city: {city_name}. Response: {data}")
     except Exception as e:
+        if miss is None:
+            raise
+        raise ValueError(f"[ERROR] City coordinate lookup failed for '{city_name}': {miss}; geoname: {e}")
+    try:
+        return _parse_geoname(city_name, data)
+    except ValueError as e:
         raise ValueError(f"[ERROR] City coordinate lookup failed for '{city_name}': {e}")
+
+
+def _attraction_attempts(lat: float, lon: float, radius_m: int, kinds: str, limit: int) -> List[Dict[str, Any]]:
+    """OpenTripMap /radius parameter sets, from most to least specific."""
+    # Attempt 1: as requested (kinds + min_rate=2)
+    # some deployments prefer "min_rate" over "rate"; try this first to avoid 400s
+    base = {
+        "radius": radius_m,
+        "lon": lon,
+        "lat": lat,
+        "kinds": kinds,
+        "format": "json",
+        "limit": limit,
+        "apikey": OTM_KEY,
+    }
+    attempts = [dict(base, min_rate=2)]
+    # Attempt 2: remove rate filter
+    attempts.append(dict(base))
+    # Attempt 3: broaden kinds significantly
+    attempts.append(dict(base, kinds=BROAD_KINDS))
+    # Attempt 4: increase radius
+    attempts.append(dict(base, kinds=BROAD_KINDS, radius=max(radius_m, 20000)))
+    # Attempt 5: last resort — no kinds filter
+    last = dict(base, radius=max(radius_m, 20000))
+    last.pop("kinds")
+    attempts.append(last)
+    return attempts
+
+
+def _normalize_otm(places: List[Dict[str, Any]]) -> List[Dict]:
+    out: List[Dict] = []
+    for p in places:
+        out.append({
+            "xid": p.get("xid"),
+            "name": p.get("name"),
+            "kinds": p.get("kinds"),
+            "lat": p.get("point", {}).get("lat"),
+            "lon": p.get("point", {}).get("lon"),
+            "dist": p.get("dist"),
+            # popularity 1-3 ("3h" = heritage); used for ranking
+            "rate": p.get("rate"),
+        })
+    return out
+
+
+def _query_otm(params: Dict[str, Any], cancel: Optional[threading.Event] = None) -> List[Dict]:
+    try:
+        r = http.get(f"{BASE_URL}/radius", params=params, timeout=15, provider="opentripmap", cancel=cancel)
+        # Some combinations (e.g., invalid kinds/rate) may return 400. Treat as empty and fallback.
+        r.raise_for_status()
+        places = r.json() or []
+    except http.RequestCancelled:
+        places = []
+    except requests.HTTPError as http_err:
+        # Log-lite to stdout and continue with next attempt
+        print(f"[opentripmap] HTTPError for params={params}: {http_err}")
+        places = []
+    except Exception as e:
+        print(f"[opentripmap] Request error for params={params}: {e}")
+        places = []
+    return _normalize_otm(places)
+
+
+async def _aquery_otm(params: Dict[str, Any]) -> List[Dict]:
+    try:
+        r = await http.aget(f"{BASE_URL}/radius", params=params, timeout=15, provider="opentripmap")
+        r.raise_for_status()
+        places = r.json() or []
+    except httpx.HTTPStatusError as http_err:
+        print(f"[opentripmap] HTTPError for params={params}: {http_err}")
+        places = []
+    except Exception as e:
+        print(f"[opentripmap] Request error for params={params}: {e}")
+        places = []
+    return _normalize_otm(places)
+
+
+def _local_attractions(lat: float, lon: float, radius_m: int, kinds: str, limit: int) -> List[Dict]:
+    """Answer from the offline POI index when it covers the area, broadening kinds like the live attempts."""
+    index = get_poi_index()
+    if index is None or not index.covers(lat, lon, radius_m):
+        return []
+    for attempt_kinds in (kinds, BROAD_KINDS, None):
+        found = index.query(lat, lon, radius_m, kinds=attempt_kinds, limit=limit)
+        if found:
+            return found
+    return []
+
+
+def _level_key(city: str, radius_m: int, kinds: str, limit: int) -> str:
+    return f"{normalize_city(_first_city(city))}|{radius_m}|{kinds}|{limit}"
+
+
 # Fetch Attractions (with progressive broadening if nothing is found)
 def fetch_attraction(
     city: str,
     radius_m: int = 10000,
-    kinds: str = "interesting_places,historic,architecture,cultural,museums,natural,urban_environment,fortifications,monuments,temples,castles",
+    kinds: str = DEFAULT_KINDS,
     limit: int = 30,
 ) -> List[Dict]:
     """
@@ -130,7 +362,26 @@ def fetch_attraction(
       4) Final attempt without 'kinds' or 'rate'
 
     Final fallback: query OpenStreetMap Overpass API for common tourism/historic POIs.
+
+    Areas covered by the offline POI index (see ingest_pois.py) are answered locally
+    without any of the above.
+
+    In "hedged" mode (config.OTM_FALLBACK_MODE) the attempts are raced: each one is
+    launched if the previous hasn't answered within the hedge delay, and the
+    highest-priority non-empty answer wins. The winning attempt level is remembered
+    per city, so the next request for it starts there.
     """
+    key = _level_key(city, radius_m, kinds, limit)
+    cached = _attraction_results.get(key)
+    if cached is not None:
+        return list(cached)
+    results = _attraction_flight.do(key, lambda: _fetch_attraction(city, radius_m, kinds, limit))
+    if results:
+        _attraction_results.set(key, results)
+    return list(results)
+
+
+def _fetch_attraction(city: str, radius_m: int, kinds: str, limit: int) -> List[Dict]:
     geo = bbox_from_city(city)
     lat = geo.get("lat")
     lon = geo.get("lon")
@@ -138,94 +389,117 @@ def fetch_attraction(
     if lat is None or lon is None:
         raise ValueError(f"Could not get coordinates for city: {city}. Geo response: {geo}")
 
-    def query(params: Dict[str, Any]) -> List[Dict]:
-        try:
-            r = requests.get(f"{BASE_URL}/radius", params=params, timeout=15)
-            # Some combinations (e.g., invalid kinds/rate) may return 400. Treat as empty and fallback.
-            r.raise_for_status()
-            places = r.json() or []
-        except requests.HTTPError as http_err:
-            # Log-lite to stdout and continue with next attempt
-            print(f"[opentripmap] HTTPError for params={params}: {http_err}")
-            places = []
-        except Exception as e:
-            print(f"[opentripmap] Request error for params={params}: {e}")
-            places = []
-
-        out: List[Dict] = []
-        for p in places:
-            out.append({
-                "xid": p.get("xid"),
-                "name": p.get("name"),
-                "kinds": p.get("kinds"),
-                "lat": p.get("point", {}).get("lat"),
-                "lon": p.get("point", {}).get("lon"),
-                "dist": p.get("dist")
-            })
-        return out
+    local = _local_attractions(lat, lon, radius_m, kinds, limit)
+    if local:
+        return local
 
-    # Attempt 1: as requested (kinds + min_rate=2)
-    params = {
-        "radius": radius_m,
-        "lon": lon,
-        "lat": lat,
-        "kinds": kinds,
-        # some deployments prefer "min_rate" over "rate"; try this first to avoid 400s
-        "min_rate": 2,
-        "format": "json",
-        "limit": limit,
-        "apikey": OTM_KEY,
-    }
-    results = query(params)
-    if results:
-        return results
+    attempts = _attraction_attempts(lat, lon, radius_m, kinds, limit)
+    level_key = _level_key(city, radius_m, kinds, limit)
+    start = _attempt_levels.get(level_key) or 0
 
-    # Attempt 2: remove rate filter
-    params.pop("min_rate", None)
-    params.pop("rate", None)
-    results = query(params)
-    if results:
+    if config.OTM_FALLBACK_MODE == "hedged":
+        steps = [lambda cancel, p=p: _query_otm(p, cancel) for p in attempts]
+        steps.append(lambda cancel: _fetch_attraction_overpass(lat, lon, radius_m=radius_m, limit=limit, cancel=cancel))
+        level, results = first_non_empty(steps, start=start, hedge_delay=config.OTM_HEDGE_DELAY_SECONDS)
+        if level is not None:
+            _attempt_levels.set(level_key, level)
         return results
 
-    # Attempt 3: broaden kinds significantly
-    params["kinds"] = "interesting_places,tourist_facilities,historic,architecture,cultural,museums,urban_environment,natural,monuments,fortifications,temples,bridges,other"
-    results = query(params)
-    if results:
-        return results
+    for level in range(start, len(attempts)):
+        results = _query_otm(attempts[level])
+        if results:
+            _attempt_levels.set(level_key, level)
+            return results
 
-    # Attempt 4: increase radius
-    params["radius"] = max(radius_m, 20000)
-    results = query(params)
+    # Still nothing from OpenTripMap — try Overpass (OSM) as a last resort
+    try:
+        osm_results = _fetch_attraction_overpass(lat, lon, radius_m=radius_m, limit=limit)
+        if osm_results:
+            _attempt_levels.set(level_key, len(attempts))
+            return osm_results
+    except Exception as e:
+        print(f"[overpass] Fallback failed: {e}")
+
+    # Nothing found
+    return []
+
+
+def attractions_ttl_remaining(city: str, radius_m: int = 10000, kinds: str = DEFAULT_KINDS,
+                              limit: int = 30) -> Optional[float]:
+    """Seconds until the cached POI list for this query expires (None if not cached)."""
+    return _attraction_results.ttl_remaining(_level_key(city, radius_m, kinds, limit))
+
+
+def refresh_attraction(city: str, radius_m: int = 10000, kinds: str = DEFAULT_KINDS, limit: int = 30) -> List[Dict]:
+    """Fetch the POIs for this query live and replace the cached list (cache warming)."""
+    key = _level_key(city, radius_m, kinds, limit)
+    results = _attraction_flight.do(key, lambda: _fetch_attraction(city, radius_m, kinds, limit))
     if results:
-        return results
+        _attraction_results.set(key, results)
+    return list(results)
 
-    # Attempt 5: last resort — no kinds filter
-    params.pop("kinds", None)
-    results = query(params)
+
+async def afetch_attraction(
+    city: str,
+    radius_m: int = 10000,
+    kinds: str = DEFAULT_KINDS,
+    limit: int = 30,
+) -> List[Dict]:
+    """Async variant of `fetch_attraction` with the same broadening/fallback order."""
+    key = _level_key(city, radius_m, kinds, limit)
+    cached = _attraction_results.get(key)
+    if cached is not None:
+        return list(cached)
+    results = await _attraction_flight.ado(key, lambda: _afetch_attraction(city, radius_m, kinds, limit))
     if results:
+        _attraction_results.set(key, results)
+    return list(results)
+
+
+async def _afetch_attraction(city: str, radius_m: int, kinds: str, limit: int) -> List[Dict]:
+    geo = await abbox_from_city(city)
+    lat = geo.get("lat")
+    lon = geo.get("lon")
+
+    if lat is None or lon is None:
+        raise ValueError(f"Could not get coordinates for city: {city}. Geo response: {geo}")
+
+    local = _local_attractions(lat, lon, radius_m, kinds, limit)
+    if local:
+        return local
+
+    attempts = _attraction_attempts(lat, lon, radius_m, kinds, limit)
+    level_key = _level_key(city, radius_m, kinds, limit)
+    start = _attempt_levels.get(level_key) or 0
+
+    if config.OTM_FALLBACK_MODE == "hedged":
+        steps = [lambda p=p: _aquery_otm(p) for p in attempts]
+        steps.append(lambda: _afetch_attraction_overpass(lat, lon, radius_m=radius_m, limit=limit))
+        level, results = await afirst_non_empty(steps, start=start, hedge_delay=config.OTM_HEDGE_DELAY_SECONDS)
+        if level is not None:
+            _attempt_levels.set(level_key, level)
         return results
 
-    # Still nothing from OpenTripMap — try Overpass (OSM) as a last resort
+    for level in range(start, len(attempts)):
+        results = await _aquery_otm(attempts[level])
+        if results:
+            _attempt_levels.set(level_key, level)
+            return results
+
     try:
-        osm_results = _fetch_attraction_overpass(lat, lon, radius_m=radius_m, limit=limit)
+        osm_results = await _afetch_attraction_overpass(lat, lon, radius_m=radius_m, limit=limit)
         if osm_results:
+            _attempt_levels.set(level_key, len(attempts))
             return osm_results
     except Exception as e:
         print(f"[overpass] Fallback failed: {e}")
 
-    # Nothing found
     return []
 
 
-def _fetch_attraction_overpass(lat: float, lon: float, radius_m: int = 10000, limit: int = 30) -> List[Dict]:
-    """
-    Query OpenStreetMap via Overpass API for tourism/historic POIs around lat/lon.
-    This is a conservative fallback when OpenTripMap has no results or errors.
-    """
-    overpass_url = "https://overpass-api.de/api/interpreter"
+def _overpass_query(lat: float, lon: float, radius_m: int, limit: int) -> str:
     R = max(1000, min(radius_m, 30000))  # cap radius to avoid heavy queries
-
-    q = f"""
+    return f"""
     [out:json][timeout:25];
     (
       node(around:{R},{lat},{lon})[tourism];
@@ -238,9 +512,8 @@ def _fetch_attraction_overpass(lat: float, lon: float, radius_m: int = 10000, li
     out center {limit};
     """
 
-    r = requests.post(overpass_url, data={"data": q}, timeout=30)
-    r.raise_for_status()
-    data = r.json()
+
+def _parse_overpass(data: Dict[str, Any], limit: int) -> List[Dict]:
     elements = data.get("elements", [])
 
     results: List[Dict] = []
@@ -277,4 +550,49 @@ def _fetch_attraction_overpass(lat: float, lon: float, radius_m: int = 10000, li
         if len(results) >= limit:
             break
 
-    return results
\ No newline at end of file
+    return results
+
+
+def _fetch_attraction_overpass(lat: float, lon: float, radius_m: int = 10000, limit: int = 30,
+                               cancel: Optional[threading.Event] = None) -> List[Dict]:
+    """
+    Query OpenStreetMap via Overpass API for tourism/historic POIs around lat/lon.
+    This is a conservative fallback when OpenTripMap has no results or errors.
+    """
+    q = _overpass_query(lat, lon, radius_m, limit)
+    r = http.post(OVERPASS_URL, data={"data": q}, timeout=30, provider="overpass", cancel=cancel)
+    r.raise_for_status()
+    return _parse_overpass(r.json(), limit)
+
+
+async def _afetch_attraction_overpass(lat: float, lon: float, radius_m: int = 10000, limit: int = 30) -> List[Dict]:
+    q = _overpass_query(lat, lon, radius_m, limit)
+    r = await http.apost(OVERPASS_URL, data={"data": q}, timeout=30, provider="overpass")
+    r.raise_for_status()
+    return _parse_overpass(r.json(), limit)
+
+
+# Building blocks for bulk loading (ingest_pois.py): single upstream queries, no cache, broadening or hedging
+def fetch_overpass_pois(lat: float, lon: float, radius_m: float, limit: int) -> List[Dict]:
+    """Tourism/historic POIs around lat/lon from one live Overpass query; raises on failure."""
+    return _fetch_attraction_overpass(lat, lon, radius_m=radius_m, limit=limit)
+
+
+def fetch_otm_pois(lat: float, lon: float, radius_m: float, limit: int, kinds: Optional[str] = None) -> List[Dict]:
+    """POIs from one OpenTripMap /radius query (all kinds unless given); raises on failure."""
+    params = {"radius": radius_m, "lon": lon, "lat": lat, "format": "json", "limit": limit, "apikey": OTM_KEY}
+    if kinds:
+        params["kinds"] = kinds
+    r = http.get(f"{BASE_URL}/radius", params=params, timeout=15, provider="opentripmap")
+    r.raise_for_status()
+    return _normalize_otm(r.json() or [])
+
+
+def parse_overpass_pois(data: Dict[str, Any], limit: Optional[int] = None) -> List[Dict]:
+    """Normalized POIs from an Overpass JSON response (e.g. a saved dump)."""
+    return _parse_overpass(data, limit=len(data.get("elements", [])) if limit is None else limit)
+
+
+def normalize_otm_pois(places: List[Dict[str, Any]]) -> List[Dict]:
+    """Normalized POIs from an OpenTripMap /radius response (e.g. a saved dump)."""
+    return _normalize_otm(places)
@@ -1,33 +1,128 @@
-import requests
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Dict, Optional
+import numpy as np
+from src.config import config
+from .day_clustering import cluster_days
+from .distance_matrix import get_distance_backend
+from .route_optimizer import solve_route
 
-OSRM_BASE = "http://router.project-osrm.org"  # public demo server, acceptable for prototyping
+# per-day tours are independent, so they're solved side by side
+_day_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="route-day")
 
-def compute_route_order(coords:List[Dict[str, float]]) -> Dict:
+def fetch_table(coords: List[Dict[str, float]]) -> Dict[str, Any]:
+    """
+    Travel matrices for all coords from the configured backend (OSRM, with a local
+    haversine estimate as fallback by default):
+    {"durations": [s], "distances": [m], "source": backend name}.
+    """
+    return get_distance_backend().matrix(coords)
+
+async def afetch_table(coords: List[Dict[str, float]]) -> Dict[str, Any]:
+    return await get_distance_backend().amatrix(coords)
+
+def order_stops(
+    coords: List[Dict[str, float]],
+    durations: np.ndarray,
+    distances: Optional[np.ndarray],
+    start: int = 0,
+    return_to_start: bool = False,
+) -> Dict:
+    """Solve the visiting order for coords given their (full) matrices."""
+    solved = solve_route(
+        durations,
+        distances,
+        start=start,
+        return_to_start=return_to_start,
+        time_budget_s=config.ROUTE_TIME_BUDGET_SECONDS,
+    )
+    visited = solved["order"]
+    ordered = [coords[i] for i in visited]
+    return {
+        "ordered": ordered,
+        "order_indices": visited,
+        "return_to_start": return_to_start,
+        "total_duration": solved["total_duration"],  # seconds
+        "total_distance": solved["total_distance"],  # meters
+    }
+
+def _empty_route() -> Dict:
+    return {'ordered':[], "order_indices":[], "distance":0, "total_duration":0.0, "total_distance":0.0}
+
+def compute_route_order(coords:List[Dict[str, float]], start:int = 0, return_to_start:bool = False) -> Dict:
     """
     coords: list of {"lat":..., "lon":...}
-    We'll use OSRM "table" or "route" to compute distances/times.
-    Here we do a simple approach: call OSRM /table to get durations matrix, then do a naive TSP greedy order.
+    Fetch the OSRM /table duration+distance matrix, then solve the visiting order
+    (nearest-neighbour + 2-opt/Or-opt, see route_optimizer). `start` is the fixed
+    first stop (e.g. the hotel); `return_to_start` closes the loop back to it.
     """
     if not coords:
-        return {'ordered':[], "distance":0}
-    
-    locs = ["{lon},{lat}".format(lat=c['lat'], lon=c['lon']) for c in coords]
-    coords_str = ";".join(locs)
-    r = requests.get(f"{OSRM_BASE}/table/v1/driving/{coords_str}?annotations=duration,distance")
-    r.raise_for_status()
-    table = r.json()
-    durations = table.get("durations")
-
-    # Naive greedy ordering starting from index 0
-    n = len(coords)
-    visited = [0]
-    remaining = set(range(1, n))
-    while remaining:
-        last = visited[-1]
-        next_idx = min(remaining, key=lambda x: durations[last][x] if durations[last][x] is not None else float('inf'))
-        visited.append(next_idx)
-        remaining.remove(next_idx)
+        return _empty_route()
 
-    ordered = [coords[i] for i in visited]
-    return {"ordered": ordered, "order_indices": visited}
\ No newline at end of file
+    table = fetch_table(coords)
+    route = order_stops(coords, table["durations"], table["distances"], start, return_to_start)
+    route["matrix_source"] = table["source"]
+    route["matrix_cache"] = table.get("cache")
+    return route
+
+async def acompute_route_order(coords:List[Dict[str, float]], start:int = 0, return_to_start:bool = False) -> Dict:
+    """Async variant of `compute_route_order`."""
+    if not coords:
+        return _empty_route()
+
+    table = await afetch_table(coords)
+    route = order_stops(coords, table["durations"], table["distances"], start, return_to_start)
+    route["matrix_source"] = table["source"]
+    route["matrix_cache"] = table.get("cache")
+    return route
+
+def _solve_days(coords: List[Dict[str, float]], table: Dict[str, Any], days: int) -> Dict:
+    durations, distances = table["durations"], table["distances"]
+    points = np.array([[c["lat"], c["lon"]] for c in coords], dtype=np.float64)
+    groups = cluster_days(points, days)
+
+    def solve(group: List[int]) -> Dict:
+        idx = np.array(group)
+        sub_dist = distances[np.ix_(idx, idx)] if distances is not None else None
+        # the group's highest-ranked stop (lowest index) starts the day
+        route = order_stops([coords[i] for i in group], durations[np.ix_(idx, idx)], sub_dist)
+        route["order_indices"] = [group[i] for i in route["order_indices"]]
+        return route
+
+    day_routes = list(_day_executor.map(solve, groups))
+    plan_days = []
+    for day, route in enumerate(day_routes, start=1):
+        route["day"] = day
+        plan_days.append(route)
+
+    total_distance = None
+    if distances is not None:
+        total_distance = sum(r["total_distance"] for r in plan_days)
+    return {
+        # flattened view, kept for callers that only need one stop sequence
+        "ordered": [p for r in plan_days for p in r["ordered"]],
+        "order_indices": [i for r in plan_days for i in r["order_indices"]],
+        "days": plan_days,
+        "total_duration": sum(r["total_duration"] for r in plan_days),
+        "total_distance": total_distance,
+        "matrix_source": table["source"],
+        # {"pairs", "from_cache", "fetched"} when the matrix went through the pair cache
+        "matrix_cache": table.get("cache"),
+    }
+
+def compute_day_routes(coords:List[Dict[str, float]], days:int) -> Dict:
+    """
+    Partition stops into `days` balanced geographic clusters and order each one
+    independently. One matrix request covers all stops; each day's tour is solved
+    on its sub-matrix. Returns the flattened route plus a per-day breakdown in "days".
+    """
+    if not coords:
+        return dict(_empty_route(), days=[])
+
+    return _solve_days(coords, fetch_table(coords), days)
+
+async def acompute_day_routes(coords:List[Dict[str, float]], days:int) -> Dict:
+    """Async variant of `compute_day_routes`."""
+    if not coords:
+        return dict(_empty_route(), days=[])
+
+    return _solve_days(coords, await afetch_table(coords), days)
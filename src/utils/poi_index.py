@@ -0,0 +1,276 @@
+import math
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config import config
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+M_PER_DEG = 111_320.0
+EARTH_RADIUS_M = 6_371_000.0
+
+# Overpass results carry OSM tags ("tourism:museum"); index them under the OpenTripMap
+# kinds too, so kinds filters written for OpenTripMap match both sources
+OSM_KIND_MAP = {
+    "tourism:attraction": "interesting_places",
+    "tourism:museum": "museums,cultural,interesting_places",
+    "tourism:gallery": "museums,cultural,interesting_places",
+    "tourism:artwork": "cultural,urban_environment,interesting_places",
+    "tourism:viewpoint": "natural,view_points,interesting_places",
+    "tourism:zoo": "amusements,zoos,interesting_places",
+    "tourism:theme_park": "amusements,interesting_places",
+    "tourism:aquarium": "amusements,aquariums,interesting_places",
+    "historic:castle": "historic,fortifications,castles,interesting_places",
+    "historic:fort": "historic,fortifications,interesting_places",
+    "historic:monument": "historic,monuments,interesting_places",
+    "historic:memorial": "historic,monuments,interesting_places",
+    "historic:ruins": "historic,archaeology,interesting_places",
+    "historic:archaeological_site": "historic,archaeology,interesting_places",
+}
+
+
+def split_kinds(kinds: Optional[str]) -> List[str]:
+    tokens = [k.strip() for k in (kinds or "").split(",") if k.strip()]
+    extra = []
+    for token in tokens:
+        mapped = OSM_KIND_MAP.get(token)
+        if mapped is None and token.startswith("historic:"):
+            mapped = "historic,interesting_places"
+        if mapped:
+            extra.extend(mapped.split(","))
+    # keep order, drop duplicates
+    return list(dict.fromkeys(tokens + extra))
+
+
+def parse_rate(value: Any) -> int:
+    # OpenTripMap rates look like 1, 2, 3, "3h" (h = heritage)
+    if isinstance(value, int):
+        return value
+    return _parse_rate_text(str(value or ""))
+
+
+@lru_cache(maxsize=64)
+def _parse_rate_text(text: str) -> int:
+    digits = "".join(ch for ch in text if ch.isdigit())
+    return int(digits[:1]) if digits else 0
+
+
+class POIIndex:
+    """
+    Read-only POI store: columns in NumPy arrays sorted by a fixed lat/lon grid
+    cell, plus a kinds inverted index (CSR postings of row numbers). A radius
+    query touches one contiguous key range per grid row, so lookups stay well
+    under a millisecond for city-sized radii.
+    """
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.cell_deg = float(arrays["cell_deg"][0])
+        self.lat = arrays["lat"]
+        self.lon = arrays["lon"]
+        self.rate = arrays["rate"]
+        self.xid = arrays["xid"]
+        self.name = arrays["name"]
+        self.kinds = arrays["kinds"]
+        self.cell_keys = arrays["cell_keys"]
+        self.kind_vocab = arrays["kind_vocab"]
+        self.kind_indptr = arrays["kind_indptr"]
+        self.kind_rows = arrays["kind_rows"]
+        # (south, west, north, east) boxes the ingest covered
+        self.regions = arrays["regions"].reshape(-1, 4)
+        self._kind_ids = {str(k): i for i, k in enumerate(self.kind_vocab)}
+        self._ncols = int(math.ceil(360.0 / self.cell_deg))
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    # ---- building / storage
+
+    @classmethod
+    def build(cls, records: Iterable[Dict[str, Any]], regions: Sequence[Tuple[float, float, float, float]],
+              cell_deg: float = 0.02) -> "POIIndex":
+        rows: Dict[str, Dict[str, Any]] = {}
+        for r in records:
+            if r.get("lat") is None or r.get("lon") is None:
+                continue
+            xid = str(r.get("xid") or f"{r['lat']:.6f},{r['lon']:.6f}")
+            rows[xid] = dict(r, xid=xid)
+        recs = list(rows.values())
+
+        lat = np.array([float(r["lat"]) for r in recs], dtype=np.float64)
+        lon = np.array([float(r["lon"]) for r in recs], dtype=np.float64)
+        ncols = int(math.ceil(360.0 / cell_deg))
+        keys = cls._keys(lat, lon, cell_deg, ncols)
+        order = np.argsort(keys, kind="stable")
+        recs = [recs[i] for i in order]
+
+        kind_lists = [split_kinds(r.get("kinds")) for r in recs]
+        postings: Dict[str, List[int]] = {}
+        for row, kinds in enumerate(kind_lists):
+            for k in kinds:
+                postings.setdefault(k, []).append(row)
+        vocab = sorted(postings)
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(postings[k]) for k in vocab])
+        kind_rows = np.array([row for k in vocab for row in postings[k]], dtype=np.int32)
+
+        return cls({
+            "cell_deg": np.array([cell_deg]),
+            "lat": lat[order],
+            "lon": lon[order],
+            "rate": np.array([parse_rate(r.get("rate")) for r in recs], dtype=np.int8),
+            "xid": np.array([r["xid"] for r in recs], dtype=str),
+            "name": np.array([str(r.get("name") or "") for r in recs], dtype=str),
+            "kinds": np.array([",".join(k) for k in kind_lists], dtype=str),
+            "cell_keys": keys[order],
+            "kind_vocab": np.array(vocab, dtype=str),
+            "kind_indptr": indptr,
+            "kind_rows": kind_rows,
+            "regions": np.array(list(regions), dtype=np.float64).reshape(-1, 4),
+        })
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield {
+                "xid": str(self.xid[i]),
+                "name": str(self.name[i]),
+                "kinds": str(self.kinds[i]),
+                "lat": float(self.lat[i]),
+                "lon": float(self.lon[i]),
+                "rate": int(self.rate[i]),
+            }
+
+    def merged(self, records: Iterable[Dict[str, Any]],
+               regions: Sequence[Tuple[float, float, float, float]]) -> "POIIndex":
+        """New index with `records` added (same xid: the new record wins) and `regions` covered."""
+        return POIIndex.build(
+            list(self.records()) + list(records),
+            [tuple(r) for r in self.regions] + list(regions),
+            cell_deg=self.cell_deg,
+        )
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{path}.tmp.npz"
+        np.savez_compressed(
+            tmp,
+            cell_deg=np.array([self.cell_deg]), lat=self.lat, lon=self.lon, rate=self.rate,
+            xid=self.xid, name=self.name, kinds=self.kinds, cell_keys=self.cell_keys,
+            kind_vocab=self.kind_vocab, kind_indptr=self.kind_indptr, kind_rows=self.kind_rows,
+            regions=self.regions,
+        )
+        # readers in other processes never see a half-written file
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "POIIndex":
+        with np.load(path, allow_pickle=False) as data:
+            return cls({name: data[name] for name in data.files})
+
+    # ---- queries
+
+    @staticmethod
+    def _keys(lat: np.ndarray, lon: np.ndarray, cell_deg: float, ncols: int) -> np.ndarray:
+        row = np.floor((lat + 90.0) / cell_deg).astype(np.int64)
+        col = np.floor((lon + 180.0) / cell_deg).astype(np.int64)
+        return row * ncols + col
+
+    def covers(self, lat: float, lon: float, radius_m: float) -> bool:
+        """True if the query circle lies inside one ingested region."""
+        if not len(self.regions):
+            return False
+        dlat = radius_m / M_PER_DEG
+        dlon = radius_m / (M_PER_DEG * max(math.cos(math.radians(lat)), 0.01))
+        s, w, n, e = self.regions.T
+        inside = (s <= lat - dlat) & (n >= lat + dlat) & (w <= lon - dlon) & (e >= lon + dlon)
+        return bool(inside.any())
+
+    def _candidates(self, lat: float, lon: float, radius_m: float) -> np.ndarray:
+        dlat = radius_m / M_PER_DEG
+        dlon = radius_m / (M_PER_DEG * max(math.cos(math.radians(lat)), 0.01))
+        r0, r1 = (int(math.floor((v + 90.0) / self.cell_deg)) for v in (lat - dlat, lat + dlat))
+        c0, c1 = (int(math.floor((v + 180.0) / self.cell_deg)) for v in (lon - dlon, lon + dlon))
+        rows = np.arange(r0, r1 + 1, dtype=np.int64) * self._ncols
+        # within a grid row, the cells c0..c1 are one contiguous key range
+        starts = np.searchsorted(self.cell_keys, rows + c0, side="left")
+        ends = np.searchsorted(self.cell_keys, rows + c1, side="right")
+        if not (ends > starts).any():
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(s, e) for s, e in zip(starts, ends) if e > s])
+
+    def _with_kinds(self, cand: np.ndarray, kinds: Sequence[str]) -> np.ndarray:
+        mask = np.zeros(len(cand), dtype=bool)
+        for k in kinds:
+            kid = self._kind_ids.get(k)
+            if kid is None:
+                continue
+            posting = self.kind_rows[self.kind_indptr[kid]:self.kind_indptr[kid + 1]]
+            pos = np.searchsorted(posting, cand)
+            found = pos < len(posting)
+            mask[found] |= posting[pos[found]] == cand[found]
+        return cand[mask]
+
+    def query(self, lat: float, lon: float, radius_m: float, kinds: Optional[str] = None,
+              limit: int = 30) -> List[Dict[str, Any]]:
+        """POIs within `radius_m` having any of `kinds` (comma string, None = all), nearest first."""
+        if not len(self):
+            return []
+        cand = self._candidates(lat, lon, radius_m)
+        if kinds and len(cand):
+            cand = self._with_kinds(cand, [k.strip() for k in kinds.split(",") if k.strip()])
+        if not len(cand):
+            return []
+
+        phi1, phi2 = math.radians(lat), np.radians(self.lat[cand])
+        dphi = phi2 - phi1
+        dlmb = np.radians(self.lon[cand] - lon)
+        a = np.sin(dphi / 2) ** 2 + math.cos(phi1) * np.cos(phi2) * np.sin(dlmb / 2) ** 2
+        dist = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+        keep = dist <= radius_m
+        cand, dist = cand[keep], dist[keep]
+        if len(cand) > limit:
+            top = np.argpartition(dist, limit - 1)[:limit]
+            cand, dist = cand[top], dist[top]
+        order = np.argsort(dist, kind="stable")
+
+        return [
+            {
+                "xid": str(self.xid[i]),
+                "name": str(self.name[i]),
+                "kinds": str(self.kinds[i]),
+                "lat": float(self.lat[i]),
+                "lon": float(self.lon[i]),
+                "dist": round(float(d), 1),
+                "rate": int(self.rate[i]),
+            }
+            for i, d in zip(cand[order], dist[order])
+        ]
+
+
+_index: Optional[POIIndex] = None
+_index_mtime: Optional[float] = None
+_index_lock = threading.Lock()
+
+
+def get_poi_index() -> Optional[POIIndex]:
+    """The index at POI_INDEX_PATH (reloaded when the file changes), or None if there is none."""
+    global _index, _index_mtime
+    path = config.POI_INDEX_PATH
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _index_lock:
+        if mtime != _index_mtime:
+            _index_mtime = mtime
+            try:
+                _index = POIIndex.load(path)
+            except Exception as e:
+                logger.warning("could not load POI index %s: %s", path, e)
+                _index = None
+        return _index
@@ -0,0 +1,160 @@
+import heapq
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence
+
+import numpy as np
+
+from .poi_index import parse_rate, split_kinds
+
+# interest -> kinds tokens (OpenTripMap taxonomy plus the OSM tags Overpass results carry)
+INTEREST_KINDS: Dict[str, FrozenSet[str]] = {
+    "food": frozenset({"foods", "restaurants", "cafes", "fast_food", "food_courts", "picnic_sites",
+                       "marketplaces", "bakeries"}),
+    "history": frozenset({"historic", "historic_architecture", "fortifications", "castles", "forts",
+                          "monuments", "monuments_and_memorials", "archaeology", "battlefields",
+                          "historic_settlements", "palaces", "historic:castle", "historic:fort",
+                          "historic:monument", "historic:memorial", "historic:ruins"}),
+    "culture": frozenset({"cultural", "museums", "theatres_and_entertainments", "art_galleries",
+                          "urban_environment", "sculptures", "installation", "tourism:museum",
+                          "tourism:gallery", "tourism:artwork"}),
+    "art": frozenset({"art_galleries", "sculptures", "installation", "wall_painting", "museums",
+                      "tourism:gallery", "tourism:artwork"}),
+    "museums": frozenset({"museums", "history_museums", "art_galleries", "science_museums",
+                          "tourism:museum", "tourism:gallery"}),
+    "architecture": frozenset({"architecture", "historic_architecture", "skyscrapers", "towers",
+                               "bridges", "palaces", "castles", "other_buildings_and_structures"}),
+    "religion": frozenset({"religion", "churches", "cathedrals", "temples", "hindu_temples",
+                           "buddhist_temples", "mosques", "synagogues", "monasteries"}),
+    "nature": frozenset({"natural", "nature_reserves", "gardens_and_parks", "view_points", "water",
+                         "lakes", "mountain_peaks", "geological_formations", "beaches", "tourism:viewpoint"}),
+    "beach": frozenset({"beaches", "water"}),
+    "shopping": frozenset({"shops", "malls", "marketplaces", "supermarkets"}),
+    "nightlife": frozenset({"bars", "pubs", "nightclubs", "biergartens", "alcohol"}),
+    "family": frozenset({"amusements", "amusement_parks", "zoos", "aquariums", "water_parks",
+                         "miniature_parks", "tourism:zoo", "tourism:theme_park", "tourism:aquarium"}),
+    "adventure": frozenset({"sport", "climbing", "diving", "surfing", "kitesurfing", "winter_sports",
+                            "mountain_peaks"}),
+}
+
+# user wording -> taxonomy key
+INTEREST_ALIASES = {
+    "foods": "food", "cuisine": "food", "restaurants": "food", "street food": "food", "eating": "food",
+    "historic": "history", "historical": "history", "heritage": "history", "forts": "history",
+    "cultural": "culture", "arts": "art", "galleries": "art", "museum": "museums",
+    "buildings": "architecture", "temples": "religion", "religious": "religion", "spiritual": "religion",
+    "parks": "nature", "outdoors": "nature", "hiking": "nature", "beaches": "beach",
+    "markets": "shopping", "bars": "nightlife", "kids": "family", "sports": "adventure",
+}
+
+# interest -> OpenTripMap categories to add to the /radius query; the default query only asks for
+# sightseeing kinds, so without these a "food" trip would never get a `foods` POI to rank
+INTEREST_QUERY_KINDS: Dict[str, str] = {
+    "food": "foods",
+    "shopping": "shops",
+    "nightlife": "bars,pubs,biergartens,nightclubs",
+    "family": "amusements,zoos,aquariums",
+    "adventure": "sport",
+    "religion": "religion",
+    "beach": "beaches",
+}
+
+# score = weighted interest match + popularity (OpenTripMap rate) + proximity to the centre
+INTEREST_WEIGHT = 0.6
+RATE_WEIGHT = 0.25
+DISTANCE_WEIGHT = 0.15
+# unnamed POIs are hard to visit and useless in the itinerary
+UNNAMED_PENALTY = 0.5
+
+
+def interest_kinds(interest: str) -> FrozenSet[str]:
+    """Kinds tokens for one interest; unknown interests match their own (singular/plural) token."""
+    key = interest.strip().lower()
+    key = INTEREST_ALIASES.get(key, key)
+    if key in INTEREST_KINDS:
+        return INTEREST_KINDS[key]
+    stem = key.replace(" ", "_").rstrip("s")
+    return frozenset({key.replace(" ", "_"), stem, f"{stem}s"})
+
+
+def query_kinds(base: str, interests: Sequence[str]) -> str:
+    """
+    `base` OpenTripMap kinds plus the categories the interests need. Interests that
+    need nothing extra leave `base` unchanged, so those trips share one cached query.
+    """
+    kinds = [k for k in base.split(",") if k]
+    extra = set()
+    for interest in interests:
+        key = interest.strip().lower()
+        extra.update(k for k in INTEREST_QUERY_KINDS.get(INTEREST_ALIASES.get(key, key), "").split(",") if k)
+    return ",".join(kinds + sorted(extra - set(kinds)))
+
+
+def _column(places: Sequence[Dict[str, Any]], key: str) -> np.ndarray:
+    return np.array([np.nan if p.get(key) is None else p[key] for p in places], dtype=np.float64)
+
+
+def _distances(places: Sequence[Dict[str, Any]], center: Optional[Dict[str, float]]) -> np.ndarray:
+    dist = _column(places, "dist")
+    missing = np.isnan(dist)
+    if missing.any():
+        lat, lon = _column(places, "lat"), _column(places, "lon")
+        if center is not None:
+            c_lat, c_lon = center["lat"], center["lon"]
+        elif (~np.isnan(lat)).any():
+            # without a city centre, the median POI is a good proxy for it
+            c_lat, c_lon = np.nanmedian(lat), np.nanmedian(lon)
+        else:
+            c_lat = c_lon = np.nan
+        dy = (lat - c_lat) * 111_320.0
+        dx = (lon - c_lon) * 111_320.0 * np.cos(np.radians(c_lat))
+        dist[missing] = np.hypot(dx, dy)[missing]
+    known = ~np.isnan(dist)
+    # no coordinates at all: treat as farthest
+    return np.where(known, dist, dist[known].max() if known.any() else 0.0)
+
+
+def _interest_matrix(kinds: Sequence[str], wanted: Sequence[FrozenSet[str]]) -> np.ndarray:
+    """Distinct-kinds x interest match matrix (POI kinds strings repeat heavily)."""
+    token_sets = [split_kinds(k) for k in kinds]
+    vocab = {t: j for j, t in enumerate(sorted({t for tokens in token_sets for t in tokens}))}
+    # kinds x token incidence times token x interest incidence -> kinds x interest matches
+    has_token = np.zeros((len(kinds), len(vocab)), dtype=np.float32)
+    for row, tokens in enumerate(token_sets):
+        has_token[row, [vocab[t] for t in tokens]] = 1.0
+    token_interest = np.zeros((len(vocab), len(wanted)), dtype=np.float32)
+    for col, interest in enumerate(wanted):
+        token_interest[[vocab[t] for t in interest if t in vocab], col] = 1.0
+    return (has_token @ token_interest) > 0
+
+
+def score_pois(places: Sequence[Dict[str, Any]], interests: Sequence[str],
+               center: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """Vectorized scores for `places` (higher is better)."""
+    n = len(places)
+    if n == 0:
+        return np.zeros(0)
+    wanted = [interest_kinds(i) for i in interests if i and i.strip()]
+
+    if wanted:
+        distinct: Dict[str, int] = {}
+        which = np.fromiter((distinct.setdefault(p.get("kinds") or "", len(distinct)) for p in places),
+                            dtype=np.int64, count=n)
+        interest = _interest_matrix(list(distinct), wanted).mean(axis=1)[which]
+    else:
+        interest = np.zeros(n)
+
+    rate = np.fromiter((parse_rate(p.get("rate")) for p in places), dtype=np.float64, count=n) / 3.0
+    dist = _distances(places, center)
+    span = dist.max() if dist.max() > 0 else 1.0
+    proximity = 1.0 - dist / span
+    named = np.fromiter((bool(p.get("name")) and p.get("name") != "POI" for p in places), dtype=bool, count=n)
+
+    return (INTEREST_WEIGHT * interest + RATE_WEIGHT * rate + DISTANCE_WEIGHT * proximity
+            - UNNAMED_PENALTY * ~named)
+
+
+def rank_pois(places: Sequence[Dict[str, Any]], interests: Sequence[str], k: int = 20,
+              center: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+    """Top-`k` places by score, best first; each copy carries its `score`."""
+    scores = score_pois(places, interests, center)
+    top = heapq.nlargest(min(k, len(places)), range(len(places)), key=scores.__getitem__)
+    return [dict(places[i], score=round(float(scores[i]), 4)) for i in top]
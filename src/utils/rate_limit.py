@@ -0,0 +1,235 @@
+import asyncio
+import email.utils
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from src.config import config
+
+
+class TokenBucket:
+    """
+    In-process token bucket. Callers reserve a token and are told how long to wait
+    for it, so the same bucket serves threads (time.sleep) and coroutines
+    (asyncio.sleep) without holding a lock while waiting.
+    """
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def reserve(self) -> float:
+        """Take one token (possibly going into debt); returns seconds to wait before using it."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1.0
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def penalize(self, seconds: float) -> None:
+        """Upstream asked us to back off (429 / Retry-After): hold everyone for `seconds`."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+class SQLiteTokenBucket:
+    """Token bucket whose state lives in a SQLite row, shared by every process using the file."""
+    def __init__(self, path: str, key: str, rate: float, burst: float):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.key = key
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def _update(self, take: float, penalty: float = 0.0) -> float:
+        # wall clock, not monotonic: the timestamp is compared across processes
+        now = time.time()
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock up front so read-modify-write is atomic across processes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (self.key,)).fetchone()
+                tokens = self.burst if row is None else min(self.burst, row[0] + max(0.0, now - row[1]) * self.rate)
+                if penalty:
+                    tokens = min(tokens, 0.0) - penalty * self.rate
+                tokens -= take
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)", (self.key, tokens, now)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return 0.0 if tokens >= 0 else -tokens / self.rate
+
+    def reserve(self) -> float:
+        return self._update(1.0)
+
+    def penalize(self, seconds: float) -> None:
+        self._update(0.0, penalty=seconds)
+
+
+class _HostStats:
+    __slots__ = ("acquired", "delayed", "waiting", "max_waiting", "wait_seconds", "max_wait_seconds",
+                 "throttled", "retries")
+
+    def __init__(self):
+        self.acquired = 0
+        self.delayed = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.throttled = 0
+        self.retries = 0
+
+
+class RateLimiter:
+    """
+    Per-host token buckets plus request-queue metrics. Hosts without a configured
+    limit pass straight through (they are still counted).
+    """
+    def __init__(self, limits: Dict[str, tuple], shared_path: Optional[str] = None):
+        self._limits = limits
+        self._shared_path = shared_path
+        self._buckets: Dict[str, Any] = {}
+        self._stats: Dict[str, _HostStats] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host: str):
+        with self._lock:
+            if host not in self._buckets:
+                limit = self._limits.get(host)
+                if limit is None:
+                    bucket = None
+                elif self._shared_path:
+                    bucket = SQLiteTokenBucket(self._shared_path, host, *limit)
+                else:
+                    bucket = TokenBucket(*limit)
+                self._buckets[host] = bucket
+                self._stats[host] = _HostStats()
+            return self._buckets[host], self._stats[host]
+
+    def _reserve(self, host: str) -> float:
+        bucket, stats = self._bucket(host)
+        wait = bucket.reserve() if bucket is not None else 0.0
+        with self._lock:
+            stats.acquired += 1
+            if wait > 0:
+                stats.delayed += 1
+                stats.waiting += 1
+                stats.max_waiting = max(stats.max_waiting, stats.waiting)
+                stats.wait_seconds += wait
+                stats.max_wait_seconds = max(stats.max_wait_seconds, wait)
+        return wait
+
+    def _done_waiting(self, host: str) -> None:
+        with self._lock:
+            self._stats[host].waiting -= 1
+
+    def acquire(self, host: str, cancel: Optional[threading.Event] = None) -> float:
+        """
+        Block the calling thread until a request to `host` is allowed; returns the time
+        waited. Setting `cancel` cuts the wait short (the reserved slot is still spent).
+        """
+        wait = self._reserve(host)
+        if wait > 0:
+            try:
+                if cancel is not None:
+                    cancel.wait(wait)
+                else:
+                    time.sleep(wait)
+            finally:
+                self._done_waiting(host)
+        return wait
+
+    async def aacquire(self, host: str) -> float:
+        wait = self._reserve(host)
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self._done_waiting(host)
+        return wait
+
+    def throttled(self, host: str, retry_after: Optional[float]) -> None:
+        """Record a 429/503 from `host`; a Retry-After pauses the whole bucket, not just this caller."""
+        bucket, stats = self._bucket(host)
+        with self._lock:
+            stats.throttled += 1
+        if bucket is not None and retry_after:
+            bucket.penalize(retry_after)
+
+    def retried(self, host: str) -> None:
+        _, stats = self._bucket(host)
+        with self._lock:
+            stats.retries += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                host: {
+                    "limit_per_s": self._limits[host][0] if host in self._limits else None,
+                    **{name: getattr(s, name) for name in _HostStats.__slots__},
+                }
+                for host, s in self._stats.items()
+            }
+
+
+def parse_limits(spec: str) -> Dict[str, tuple]:
+    """"host=rate[:burst],..." -> {host: (rate, burst)}; rate is requests per second."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        host, _, value = item.partition("=")
+        rate, _, burst = value.partition(":")
+        limits[host.strip()] = (float(rate), float(burst or 1))
+    return limits
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for retry number `attempt` (0-based)."""
+    return random.uniform(0, min(config.HTTP_RETRY_MAX_DELAY, config.HTTP_RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter configured from RATE_LIMITS / RATE_LIMIT_SHARED_PATH."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(parse_limits(config.RATE_LIMITS), shared_path=config.RATE_LIMIT_SHARED_PATH or None)
+        return _limiter
@@ -0,0 +1,29 @@
+import hashlib
+import json
+from typing import Any, Dict, Iterable, Optional
+
+from .trip_legs import parse_cities
+
+
+def _norm(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+def normalize_request(city: Optional[str], days: Optional[int], interests: Optional[Iterable[str]],
+                      budget: Optional[str]) -> Dict[str, Any]:
+    """
+    Canonical form of a trip request: requests that only differ in case, spacing,
+    separators or interest order plan the same trip. City order is kept (it is the route).
+    """
+    return {
+        "cities": [_norm(c) for c in parse_cities(city)],
+        "days": int(days or 1),
+        "interests": sorted({_norm(i) for i in interests or [] if i and i.strip()}),
+        "budget": _norm(budget or ""),
+    }
+
+
+def request_key(city: Optional[str], days: Optional[int], interests: Optional[Iterable[str]],
+                budget: Optional[str]) -> str:
+    payload = json.dumps(normalize_request(city, days, interests, budget), sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,170 @@
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# stands in for unreachable legs (OSRM returns null) and forbidden dummy edges
+_BIG = 1e9
+_EPS = 1e-9
+
+
+def to_matrix(table: Optional[Sequence[Sequence[Optional[float]]]]) -> Optional[np.ndarray]:
+    """OSRM-style nested lists (null = unreachable) -> float64 array."""
+    if table is None:
+        return None
+    m = np.array([[np.nan if v is None else v for v in row] for row in table], dtype=np.float64)
+    m[~np.isfinite(m)] = _BIG
+    return m
+
+
+def nearest_neighbor(cost: np.ndarray, start: int = 0) -> np.ndarray:
+    """Greedy construction: one vectorized argmin per step."""
+    n = cost.shape[0]
+    tour = np.empty(n, dtype=np.intp)
+    visited = np.zeros(n, dtype=bool)
+    cur = start
+    for k in range(n):
+        tour[k] = cur
+        visited[cur] = True
+        if k == n - 1:
+            break
+        row = np.where(visited, np.inf, cost[cur])
+        cur = int(np.argmin(row))
+    return tour
+
+
+def tour_cost(cost: np.ndarray, tour: np.ndarray, closed: bool = True) -> float:
+    total = float(cost[tour[:-1], tour[1:]].sum())
+    if closed and len(tour) > 1:
+        total += float(cost[tour[-1], tour[0]])
+    return total
+
+
+def _prefix_costs(cost: np.ndarray, tour: np.ndarray):
+    nxt = np.roll(tour, -1)
+    fwd = np.concatenate(([0.0], np.cumsum(cost[tour, nxt])))
+    bwd = np.concatenate(([0.0], np.cumsum(cost[nxt, tour])))
+    return fwd, bwd
+
+
+def two_opt(cost: np.ndarray, tour: np.ndarray, deadline: float) -> np.ndarray:
+    """
+    Segment-reversal local search on a closed tour with tour[0] pinned. Works on
+    asymmetric matrices: the reversed segment is re-costed via prefix sums of
+    forward/backward edge costs, and all j for a given i are evaluated at once.
+    """
+    m = len(tour)
+    if m < 4:
+        return tour
+    tour = tour.copy()
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        fwd, bwd = _prefix_costs(cost, tour)
+        for i in range(0, m - 2):
+            if time.perf_counter() >= deadline:
+                break
+            j = np.arange(i + 2, m)
+            a, b = tour[i], tour[i + 1]
+            c = tour[j]
+            d = tour[(j + 1) % m]
+            delta = (
+                cost[a, c] + cost[b, d] - cost[a, b] - cost[c, d]
+                + (bwd[j] - bwd[i + 1]) - (fwd[j] - fwd[i + 1])
+            )
+            k = int(np.argmin(delta))
+            if delta[k] < -_EPS:
+                jj = int(j[k])
+                tour[i + 1:jj + 1] = tour[i + 1:jj + 1][::-1]
+                fwd, bwd = _prefix_costs(cost, tour)
+                improved = True
+    return tour
+
+
+def or_opt(cost: np.ndarray, tour: np.ndarray, deadline: float, max_segment: int = 3) -> np.ndarray:
+    """Relocate segments of 1..max_segment stops to their cheapest position (tour[0] pinned)."""
+    m = len(tour)
+    if m < 4:
+        return tour
+    tour = tour.copy()
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for seg_len in range(1, max_segment + 1):
+            for i in range(1, m - seg_len + 1):
+                if time.perf_counter() >= deadline:
+                    return tour
+                s0, s1 = tour[i], tour[i + seg_len - 1]
+                prev, nxt = tour[i - 1], tour[(i + seg_len) % m]
+                gain = cost[prev, s0] + cost[s1, nxt] - cost[prev, nxt]
+                rest = np.concatenate((tour[:i], tour[i + seg_len:]))
+                u = rest
+                v = np.roll(rest, -1)
+                insert = cost[u, s0] + cost[s1, v] - cost[u, v]
+                # re-inserting where it came from is a no-op
+                insert[i - 1] = np.inf
+                k = int(np.argmin(insert))
+                if insert[k] - gain < -_EPS:
+                    seg = tour[i:i + seg_len]
+                    tour = np.concatenate((rest[:k + 1], seg, rest[k + 1:]))
+                    improved = True
+    return tour
+
+
+def solve_route(
+    durations: np.ndarray,
+    distances: Optional[np.ndarray] = None,
+    start: int = 0,
+    return_to_start: bool = False,
+    time_budget_s: float = 0.2,
+) -> Dict[str, Any]:
+    """
+    Order stops to minimise total duration: nearest-neighbour construction, then
+    2-opt and Or-opt until no improvement or the time budget runs out.
+
+    The tour always starts at `start` (e.g. the hotel). With return_to_start=False
+    the path is open-ended, modelled as a closed tour through a dummy node that
+    can be entered from anywhere for free but only leaves towards `start`.
+    """
+    durations = np.asarray(durations, dtype=np.float64)
+    n = durations.shape[0]
+    if n == 0:
+        return {"order": [], "total_duration": 0.0, "total_distance": 0.0 if distances is not None else None}
+    deadline = time.perf_counter() + time_budget_s
+
+    if return_to_start:
+        cost = durations
+    else:
+        cost = np.full((n + 1, n + 1), _BIG)
+        cost[:n, :n] = durations
+        cost[:, n] = 0.0
+        cost[n, start] = 0.0
+    np.fill_diagonal(cost, 0.0)
+
+    tour = nearest_neighbor(cost[:n, :n], start)
+    if not return_to_start:
+        tour = np.append(tour, n)
+
+    best_cost = tour_cost(cost, tour)
+    while time.perf_counter() < deadline:
+        tour = two_opt(cost, tour, deadline)
+        tour = or_opt(cost, tour, deadline)
+        new_cost = tour_cost(cost, tour)
+        if new_cost >= best_cost - _EPS:
+            break
+        best_cost = new_cost
+
+    order: List[int] = [int(x) for x in tour if x != n]
+    if not return_to_start:
+        # rotate so the path begins at start and ends just before the dummy node
+        pos = order.index(start)
+        order = order[pos:] + order[:pos]
+
+    result: Dict[str, Any] = {
+        "order": order,
+        "total_duration": tour_cost(durations, np.array(order), closed=return_to_start),
+        "total_distance": None,
+    }
+    if distances is not None:
+        result["total_distance"] = tour_cost(np.asarray(distances, dtype=np.float64), np.array(order), closed=return_to_start)
+    return result
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Deduplicate concurrent identical calls: while a call for `key` is in flight,
+    later callers wait for it and share its result (or exception) instead of
+    issuing their own upstream request. Threads coalesce with threads;
+    coroutines coalesce with coroutines on the same event loop.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        # per loop object (weakly, never by id(): CPython reuses the ids of collected loops)
+        self._tasks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Future]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self.calls += 1
+            tasks = self._tasks.get(loop)
+            if tasks is None:
+                tasks = self._tasks[loop] = {}
+            task = tasks.get(key)
+            if task is None:
+                # run the upstream call as its own task so a cancelled caller doesn't cancel it for the others
+                task = tasks[key] = asyncio.ensure_future(fn())
+                task.add_done_callback(lambda _: self._forget(loop, key))
+                self.executions += 1
+            else:
+                self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, loop: asyncio.AbstractEventLoop, key: Hashable) -> None:
+        with self._lock:
+            tasks = self._tasks.get(loop, {})
+            task = tasks.pop(key, None)
+            if not tasks:
+                self._tasks.pop(loop, None)
+        # mark the exception retrieved when every waiter was cancelled
+        if task is not None and not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls) + sum(len(t) for t in self._tasks.values()),
+            }
+
+
+_groups: Dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+
+def get_flight(name: str) -> SingleFlight:
+    """Process-wide single-flight group (geocode, attractions, weather, llm)."""
+    with _groups_lock:
+        group = _groups.get(name)
+        if group is None:
+            group = _groups[name] = SingleFlight(name)
+        return group
+
+
+def singleflight_stats() -> Dict[str, Dict[str, int]]:
+    with _groups_lock:
+        groups = dict(_groups)
+    return {name: g.stats() for name, g in groups.items()}
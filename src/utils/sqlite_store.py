@@ -0,0 +1,69 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Union
+
+
+class SQLiteKVStore:
+    """
+    Tiny key/value table with per-row expiry, safe to share between threads and
+    between processes pointing at the same file (WAL mode).
+    """
+    def __init__(self, path: str, table: str = "kv"):
+        if not table.isidentifier():
+            raise ValueError(f"invalid table name: {table}")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at < time.time():
+            self.delete(key)
+            return None
+        return bytes(value)
+
+    def set(self, key: str, value: Union[bytes, str], ttl_seconds: float) -> None:
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, sqlite3.Binary(value), time.time() + ttl_seconds),
+            )
+
+    def ttl_remaining(self, key: str) -> Optional[float]:
+        """Seconds until `key` expires, or None if it is absent or already expired."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        remaining = row[0] - time.time()
+        return remaining if remaining > 0 else None
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cur = self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at < ?", (time.time(),))
+        return cur.rowcount
@@ -0,0 +1,123 @@
+import re
+from typing import Any, Dict, List, Optional
+
+from .geocode_cache import GAZETTEER, normalize_city
+
+# Unambiguous leg separators: "Jaipur; Ayodhya", "Jaipur -> Ayodhya", "Jaipur → Ayodhya",
+# "Jaipur | Ayodhya", "Jaipur to Ayodhya"
+_LEG_SEPARATORS = re.compile(r"\s*(?:;|\||->|→)\s*|\s+to\s+", re.IGNORECASE)
+
+# Names that qualify the place before them ("Paris, France", "New York, NY", "Udaipur, Rajasthan")
+# rather than start a new leg. Gazetteer cities (Goa, Singapore, ...) are always legs.
+REGION_NAMES = frozenset({
+    # countries and common short forms
+    "afghanistan", "albania", "algeria", "andorra", "angola", "argentina", "armenia", "australia", "austria",
+    "azerbaijan", "bahamas", "bahrain", "bangladesh", "barbados", "belarus", "belgium", "belize", "benin",
+    "bhutan", "bolivia", "bosnia and herzegovina", "botswana", "brazil", "brunei", "bulgaria", "burkina faso",
+    "burundi", "cambodia", "cameroon", "canada", "cape verde", "chad", "chile", "china", "colombia",
+    "costa rica", "croatia", "cuba", "cyprus", "czechia", "czech republic", "denmark", "dominican republic",
+    "ecuador", "egypt", "el salvador", "estonia", "eswatini", "ethiopia", "fiji", "finland", "france", "gabon",
+    "gambia", "georgia", "germany", "ghana", "greece", "guatemala", "guinea", "haiti", "honduras", "hungary",
+    "iceland", "india", "indonesia", "iran", "iraq", "ireland", "israel", "italy", "ivory coast", "jamaica",
+    "japan", "jordan", "kazakhstan", "kenya", "kuwait", "kyrgyzstan", "laos", "latvia", "lebanon", "lesotho",
+    "liberia", "libya", "liechtenstein", "lithuania", "madagascar", "malawi", "malaysia", "maldives", "mali",
+    "malta", "mauritania", "mauritius", "mexico", "moldova", "mongolia", "montenegro", "morocco",
+    "mozambique", "myanmar", "namibia", "nepal", "netherlands", "new zealand", "nicaragua", "niger",
+    "nigeria", "north korea", "north macedonia", "norway", "oman", "pakistan", "panama", "papua new guinea",
+    "paraguay", "peru", "philippines", "poland", "portugal", "qatar", "romania", "russia", "rwanda",
+    "saudi arabia", "senegal", "serbia", "seychelles", "sierra leone", "slovakia", "slovenia", "somalia",
+    "south africa", "south korea", "korea", "spain", "sri lanka", "sudan", "suriname", "sweden",
+    "switzerland", "syria", "taiwan", "tajikistan", "tanzania", "thailand", "togo", "trinidad and tobago",
+    "tunisia", "turkey", "turkiye", "turkmenistan", "uganda", "ukraine", "united arab emirates", "uae",
+    "united kingdom", "uk", "great britain", "england", "scotland", "wales", "northern ireland",
+    "united states", "united states of america", "usa", "us", "uruguay", "uzbekistan", "venezuela",
+    "vietnam", "viet nam", "yemen", "zambia", "zimbabwe",
+    # US states and their postal codes ("la" is left out: "LA" as a leg means Los Angeles)
+    "alabama", "alaska", "arizona", "arkansas", "california", "colorado", "connecticut", "delaware",
+    "florida", "hawaii", "idaho", "illinois", "indiana", "iowa", "kansas", "kentucky", "louisiana", "maine",
+    "maryland", "massachusetts", "michigan", "minnesota", "mississippi", "missouri", "montana", "nebraska",
+    "nevada", "new hampshire", "new jersey", "new mexico", "new york state", "north carolina",
+    "north dakota", "ohio", "oklahoma", "oregon", "pennsylvania", "rhode island", "south carolina",
+    "south dakota", "tennessee", "texas", "utah", "vermont", "virginia", "washington state",
+    "west virginia", "wisconsin", "wyoming",
+    "al", "ak", "az", "ar", "ca", "co", "ct", "de", "dc", "fl", "ga", "hi", "id", "il", "in", "ia", "ks",
+    "ky", "me", "md", "ma", "mi", "mn", "ms", "mo", "mt", "ne", "nv", "nh", "nj", "nm", "ny", "nc", "nd",
+    "oh", "ok", "or", "pa", "ri", "sc", "sd", "tn", "tx", "ut", "vt", "va", "wa", "wv", "wi", "wy",
+    # Indian states and union territories
+    "andhra pradesh", "arunachal pradesh", "assam", "bihar", "chhattisgarh", "gujarat", "haryana",
+    "himachal pradesh", "jharkhand", "karnataka", "kerala", "madhya pradesh", "maharashtra", "manipur",
+    "meghalaya", "mizoram", "nagaland", "odisha", "orissa", "punjab", "rajasthan", "sikkim", "tamil nadu",
+    "telangana", "tripura", "uttar pradesh", "up", "uttarakhand", "west bengal", "jammu and kashmir",
+    "ladakh", "puducherry", "chandigarh",
+    # Canadian provinces, Australian states
+    "ontario", "quebec", "british columbia", "alberta", "manitoba", "saskatchewan", "nova scotia",
+    "new brunswick", "newfoundland", "on", "qc", "bc",
+    "new south wales", "nsw", "victoria", "queensland", "tasmania", "western australia", "south australia",
+})
+
+
+def _is_qualifier(name: str) -> bool:
+    key = normalize_city(name)
+    return key in REGION_NAMES and key not in GAZETTEER
+
+
+def _split_commas(part: str) -> List[str]:
+    """Comma-separated cities, with region qualifiers kept on the place they qualify."""
+    names: List[str] = []
+    for piece in part.split(","):
+        piece = piece.strip()
+        if not piece:
+            continue
+        if names and _is_qualifier(piece):
+            names[-1] = f"{names[-1]}, {piece}"
+        else:
+            names.append(piece)
+    return names
+
+
+def parse_cities(text: Optional[str]) -> List[str]:
+    """
+    Ordered, de-duplicated city names from the destination field. Commas also
+    separate cities, except before a country/state qualifier: "Paris, France" and
+    "New York, NY" are one city, "Jaipur, Ayodhya" is two.
+    """
+    seen = set()
+    cities = []
+    for part in _LEG_SEPARATORS.split(text or ""):
+        for name in _split_commas(part):
+            if name.lower() not in seen:
+                seen.add(name.lower())
+                cities.append(name)
+    return cities
+
+
+def allocate_days(cities: List[str], days: int) -> List[Dict[str, Any]]:
+    """
+    Split the trip into consecutive legs, one per city, as evenly as possible
+    (earlier cities get the remainder). Cities beyond the number of days are dropped.
+    """
+    days = max(1, days)
+    cities = cities[:days]
+    if not cities:
+        return []
+    base, extra = divmod(days, len(cities))
+    legs, first_day = [], 1
+    for i, city in enumerate(cities):
+        n = base + (1 if i < extra else 0)
+        legs.append({"city": city, "days": n, "first_day": first_day})
+        first_day += n
+    return legs
+
+
+def trip_legs(city: Optional[str], days: Optional[int]) -> List[Dict[str, Any]]:
+    return allocate_days(parse_cities(city), days or 1)
+
+
+def describe_legs(legs: List[Dict[str, Any]]) -> str:
+    """Prompt-friendly form: "Jaipur (days 1-2), Ayodhya (day 3)"."""
+    parts = []
+    for leg in legs:
+        last = leg["first_day"] + leg["days"] - 1
+        span = f"day {last}" if last == leg["first_day"] else f"days {leg['first_day']}-{last}"
+        parts.append(f"{leg['city']} ({span})")
+    return ", ".join(parts)
@@ -0,0 +1,107 @@
+import json
+import os
+import tempfile
+
+# settings are read at import time: keep the suite off the developer's caches and the network
+os.environ["CACHE_DIR"] = tempfile.mkdtemp(prefix="travel-agent-tests-")
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+os.environ["LLM_CACHE_BACKEND"] = "memory"
+os.environ["CACHE_WARMER_ENABLED"] = "0"
+
+import pytest  # noqa: E402
+
+
+def plan_json(first: int, last: int) -> str:
+    return json.dumps({
+        "trip_overview": "Heritage walks and food stops.",
+        "days": [{"day": d, "theme": f"Theme {d}", "activities": ["Fort", "Bazaar"], "description": "Easy pace."}
+                 for d in range(first, last + 1)],
+    })
+
+
+def fake_places(city: str, n: int = 6):
+    return [{"xid": f"{city}-{i}", "name": f"{city} place {i}", "kinds": "cultural,museums,foods",
+             "lat": 26.9 + i * 0.01, "lon": 75.8 + i * 0.01, "dist": i * 100.0, "rate": 3}
+            for i in range(n)]
+
+
+def fake_weather(lat, lon, days=7):
+    return {"daily": {"time": [f"2025-01-{d + 1:02d}" for d in range(days)],
+                      "temperature_2m_max": [30.0] * days, "temperature_2m_min": [18.0] * days,
+                      "weathercode": [0] * days}}
+
+
+def fake_route(coords, days=1):
+    return {"ordered": coords, "order_indices": list(range(len(coords))),
+            "days": [{"day": d + 1, "ordered": coords, "order_indices": list(range(len(coords)))}
+                     for d in range(days)]}
+
+
+def _async(fn):
+    async def wrapper(*args, **kwargs):
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+@pytest.fixture
+def stub_backends(monkeypatch):
+    """
+    Replace the LLM and every upstream API the agents call with instant fakes.
+    Returns a dict of call counters; `hooks` lets a test run code inside a stub.
+    """
+    calls = {"llm": 0, "geocode": 0, "pois": 0, "weather": 0, "route": 0}
+    hooks = {}
+
+    def count(name, fn):
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            if name in hooks:
+                hooks[name]()
+            return fn(*args, **kwargs)
+        return wrapper
+
+    def llm(prompt, *args, **kwargs):
+        if "covers days" in prompt:
+            first, last = (int(x) for x in prompt.split("covers days", 1)[1].split(";")[0].split(" to "))
+            return plan_json(first, last)
+        if "Include ONLY these days:" in prompt:
+            wanted = [int(d) for d in prompt.split("Include ONLY these days:", 1)[1].split(".")[0].split(",")]
+            plan = json.loads(plan_json(min(wanted), max(wanted)))
+            return json.dumps({"days": [d for d in plan["days"] if d["day"] in wanted]})
+        days = int(prompt.split("Duration (days):", 1)[1].split(",")[0]) if "Duration (days):" in prompt else 1
+        if '"itinerary_text"' in prompt:
+            plan = json.loads(plan_json(1, days))
+            plan["itinerary_text"] = "\n".join(f"Day {d}: Theme {d}\n- Fort" for d in range(1, days + 1))
+            return json.dumps(plan)
+        return plan_json(1, days)
+
+    def stream(prompt, *args, **kwargs):
+        yield "Day 1: Old city\n"
+        yield "- Visit the fort"
+
+    async def astream(prompt, *args, **kwargs):
+        for chunk in stream(prompt):
+            yield chunk
+
+    geocode = count("geocode", lambda city, *a, **k: {"lat": 26.9, "lon": 75.8, "source": "stub"})
+    pois = count("pois", lambda city, *a, **k: fake_places(city))
+    weather = count("weather", fake_weather)
+    route = count("route", fake_route)
+    planner_llm = count("llm", llm)
+
+    from src.agents import attraction, multi_city, planner, route as route_agent, summarizer, weather as weather_agent
+    monkeypatch.setattr(planner.groq, "invoke", planner_llm)
+    monkeypatch.setattr(planner.groq, "ainvoke", _async(planner_llm))
+    monkeypatch.setattr(summarizer.groq, "stream", stream)
+    monkeypatch.setattr(summarizer.groq, "astream", astream)
+    monkeypatch.setattr(attraction, "fetch_attraction", pois)
+    monkeypatch.setattr(attraction, "afetch_attraction", _async(pois))
+    for module in (weather_agent, multi_city):
+        monkeypatch.setattr(module, "bbox_from_city", geocode)
+        monkeypatch.setattr(module, "abbox_from_city", _async(geocode))
+        monkeypatch.setattr(module, "fetch_weather_by_coords", weather)
+        monkeypatch.setattr(module, "afetch_weather_by_coords", _async(weather))
+    monkeypatch.setattr(route_agent, "compute_day_routes", route)
+    monkeypatch.setattr(route_agent, "acompute_day_routes", _async(route))
+    calls["hooks"] = hooks
+    return calls
@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import json
+
+import batch_generate
+
+
+def _collect(requests, **kwargs):
+    async def run():
+        return [r async for r in batch_generate.run_batch(requests, **kwargs)]
+    return asyncio.run(run())
+
+
+def _write(tmp_path, lines):
+    path = tmp_path / "requests.jsonl"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+TRIP = {"city": "Jaipur", "days": 2, "interests": ["culture", "food"], "budget": "medium"}
+
+
+def test_read_requests_keeps_line_numbers_and_parse_errors(tmp_path):
+    path = _write(tmp_path, [json.dumps(TRIP), "", "{not json"])
+    rows = list(batch_generate.read_requests(path))
+    assert [line for line, _ in rows] == [1, 3]
+    assert rows[0][1] == TRIP
+    assert isinstance(rows[1][1], json.JSONDecodeError)
+
+
+def test_equivalent_requests_run_once(stub_backends):
+    same_trip = dict(TRIP, city=" jaipur ", interests=["Food", "culture"])
+    records = _collect([(1, TRIP), (2, same_trip), (3, dict(TRIP, city="Agra"))])
+    assert sorted(r["line"] for r in records) == [1, 2, 3]
+    assert all(r["ok"] and r["itinerary_text"] for r in records)
+    by_line = {r["line"]: r for r in records}
+    assert by_line[1]["request_key"] == by_line[2]["request_key"] != by_line[3]["request_key"]
+    assert [by_line[1]["deduplicated"], by_line[2]["deduplicated"]] == [False, True]
+    assert stub_backends["llm"] == 2
+
+
+def test_invalid_rows_get_an_error_record(stub_backends):
+    records = _collect([(1, json.JSONDecodeError("bad", "x", 0)), (2, {"days": 2}), (3, {"city": "Jaipur", "days": "many"})],
+                       prewarm=False)
+    assert [r["line"] for r in records] == [1, 2, 3]
+    assert all(not r["ok"] and r["error"].startswith("invalid request:") for r in records)
+    assert stub_backends["llm"] == 0
+
+
+def test_failed_trips_are_reported_not_raised(stub_backends, monkeypatch):
+    async def boom(state):
+        raise RuntimeError("graph exploded")
+
+    monkeypatch.setattr(batch_generate.trip_graph, "ainvoke", boom)
+    (record,) = _collect([(1, TRIP)], prewarm=False)
+    assert not record["ok"] and record["error"] == "RuntimeError: graph exploded"
+
+
+def test_prewarm_geocodes_each_city_once(stub_backends, monkeypatch):
+    seen = []
+
+    async def geocode(city):
+        seen.append(city)
+
+    monkeypatch.setattr(batch_generate, "abbox_from_city", geocode)
+    _collect([(1, dict(TRIP, city="Jaipur; Agra")), (2, dict(TRIP, city="JAIPUR")), (3, TRIP)])
+    assert sorted(c.casefold() for c in seen) == ["agra", "jaipur"]
+
+
+def test_cli_writes_one_jsonl_record_per_line(stub_backends, tmp_path, capsys):
+    path = _write(tmp_path, [json.dumps(TRIP), json.dumps(TRIP), "{oops"])
+    out = tmp_path / "results.jsonl"
+    args = argparse.Namespace(input=path, out=str(out), concurrency=2, no_prewarm=True, progress=0)
+    asyncio.run(batch_generate.amain(args))
+    records = [json.loads(line) for line in out.read_text().splitlines()]
+    assert sorted(r["line"] for r in records) == [1, 2, 3]
+    assert sum(r["ok"] for r in records) == 2
+    assert "3 requests (1 distinct trips), 2 ok, 1 failed" in capsys.readouterr().err
+
+
+def test_trips_start_grouped_by_city(stub_backends, monkeypatch):
+    started = []
+
+    async def invoke(state):
+        started.append(state["city"])
+        await asyncio.sleep(0)
+        return {}
+
+    monkeypatch.setattr(batch_generate.trip_graph, "ainvoke", invoke)
+    cities = ["Jaipur", "Agra", "Delhi", "Agra; Jaipur", "Delhi", "Jaipur", "Agra"]
+    requests = [(i, dict(TRIP, city=city, days=i)) for i, city in enumerate(cities, start=1)]
+    _collect(requests, concurrency=1, prewarm=False)
+    firsts = [batch_generate.parse_cities(city)[0] for city in started]
+    assert firsts == sorted(firsts)
+    assert len(started) == len(cities)
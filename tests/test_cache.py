@@ -0,0 +1,95 @@
+import types
+
+import pytest
+
+from src.utils import cache as cache_module
+from src.utils.cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_evicts_least_recently_used():
+    cache = TTLCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = TTLCache(ttl_seconds=10)
+    cache.set("a", 1)
+    clock[0] += 4
+    assert cache.ttl_remaining("a") == pytest.approx(6)
+    assert cache.get("a") == 1
+    clock[0] += 6
+    assert cache.get("a") is None
+    assert cache.ttl_remaining("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_writes_sweep_expired_entries(clock):
+    cache = TTLCache(ttl_seconds=10)
+    for i in range(5):
+        cache.set(f"old{i}", i)
+    clock[0] += 11
+    cache.set("new", 1)
+    assert len(cache) == 1
+    assert cache.stats()["bytes"] == cache_module._approx_size(1)
+
+
+def test_sweep_removes_everything_expired(clock):
+    cache = TTLCache(ttl_seconds=10)
+    cache.set("a", 1)
+    clock[0] += 5
+    cache.set("b", 2)
+    clock[0] += 6
+    assert cache.sweep() == 1
+    assert cache.get("b") == 2
+
+
+def test_byte_limit_evicts_until_the_value_fits():
+    cache = TTLCache(max_bytes=10)
+    cache.set("a", b"xxxx")
+    cache.set("b", b"yyyy")
+    cache.set("c", b"zzzz")
+    assert cache.get("a") is None
+    assert cache.get("b") == b"yyyy" and cache.get("c") == b"zzzz"
+    assert cache.stats()["bytes"] == 8
+
+
+def test_value_larger_than_the_byte_limit_is_not_stored():
+    cache = TTLCache(max_bytes=4)
+    cache.set("a", b"xx")
+    cache.set("big", b"x" * 5)
+    assert cache.get("big") is None
+    assert cache.get("a") == b"xx"
+
+
+def test_overwrite_and_delete_keep_byte_count():
+    cache = TTLCache()
+    cache.set("a", "xxxx")
+    cache.set("a", "xx")
+    assert cache.stats()["bytes"] == 2
+    cache.delete("a")
+    cache.delete("missing")
+    assert len(cache) == 0 and cache.stats()["bytes"] == 0
+
+
+def test_stats_report_hit_rate():
+    cache = TTLCache()
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
@@ -0,0 +1,153 @@
+import threading
+import time
+import types
+
+import pytest
+
+from src.utils import cache_warmer, http
+from src.utils.cache_warmer import CacheWarmer, start_cache_warmer
+from src.utils.demand import DemandTracker, combos_for, load_log_demand, parse_log_requests
+from tests.conftest import fake_places
+
+DAY = 24 * 3600
+
+
+def test_scores_decay_with_the_half_life():
+    tracker = DemandTracker(half_life_seconds=3600)
+    now = time.time()
+    tracker.record("Jaipur", ["food"], at=now - 3600)
+    tracker.record("Agra", ["food"], at=now)
+    (first, first_score), (second, second_score) = tracker.top(2)
+    assert first == ("agra", ("food",)) and first_score == pytest.approx(1.0, rel=1e-3)
+    assert second == ("jaipur", ("food",)) and second_score == pytest.approx(0.5, rel=1e-3)
+
+
+def test_replay_order_does_not_change_the_score():
+    now = time.time()
+    in_order, out_of_order = DemandTracker(3600), DemandTracker(3600)
+    for at in (now - 7200, now - 3600, now):
+        in_order.record("Jaipur", ["food"], at=at)
+    for at in (now, now - 7200, now - 3600):
+        out_of_order.record("Jaipur", ["food"], at=at)
+    assert in_order.top(1)[0][1] == pytest.approx(out_of_order.top(1)[0][1])
+
+
+def test_each_city_of_a_trip_is_its_own_combo():
+    assert combos_for("Jaipur; Agra", ["Food", " culture", "food"]) == [
+        ("jaipur", ("culture", "food")), ("agra", ("culture", "food")),
+    ]
+
+
+def test_only_the_strongest_combos_are_kept():
+    tracker = DemandTracker(max_entries=4)
+    for i in range(5):
+        tracker.record(f"City{i}", ["food"], weight=5 - i)
+    assert [combo[0] for combo, _ in tracker.top(10)] == ["city0", "city1"]
+
+
+def test_requests_are_replayed_from_the_logs(tmp_path):
+    lines = [
+        '2026-10-17 09:00:00,250 - INFO - trip_request {"city": "Jaipur", "days": 3, "interests": ["food"], "budget": "low"}',
+        "2026-10-17 09:05:00,000 - INFO - Generating itinerary for Agra and for ['history', 'food']",
+        "2026-10-17 09:06:00,000 - INFO - trip_request {broken json",
+        "not a log line trip_request {}",
+    ]
+    parsed = list(parse_log_requests(lines))
+    assert [(city, interests) for _, city, interests in parsed] == [("Jaipur", ["food"]), ("Agra", ["history", "food"])]
+    assert parsed[1][0] - parsed[0][0] == pytest.approx(299.75)
+
+    (tmp_path / "log_2026-10-17.log").write_text("\n".join(lines), encoding="utf-8")
+    tracker = DemandTracker()
+    assert load_log_demand(tracker, logs_dir=str(tmp_path)) == 2
+    assert len(tracker) == 2
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Fake geocode/POI/forecast/matrix refreshes that each make one (fake) HTTP call."""
+    calls = []
+    ttl = {"geocode": None, "attractions": None, "forecast": None}
+
+    def call(name):
+        def fn(*args, **kwargs):
+            calls.append(name)
+            http.get(f"https://{name}.test/")
+            return fake_places("x") if name == "attractions" else {"lat": 26.9, "lon": 75.8}
+        return fn
+
+    monkeypatch.setattr(http, "get_session", lambda: types.SimpleNamespace(
+        request=lambda *a, **k: types.SimpleNamespace(status_code=200, headers={})))
+    monkeypatch.setattr(cache_warmer, "geocode_cache", types.SimpleNamespace(ttl_remaining=lambda city: ttl["geocode"]))
+    monkeypatch.setattr(cache_warmer, "attractions_ttl_remaining", lambda *a: ttl["attractions"])
+    monkeypatch.setattr(cache_warmer, "forecast_ttl_remaining", lambda *a: ttl["forecast"])
+    monkeypatch.setattr(cache_warmer, "bbox_from_city", lambda city: {"lat": 26.9, "lon": 75.8})
+    monkeypatch.setattr(cache_warmer, "fetch_attraction", lambda *a: fake_places("x"))
+    for name, target in (("geocode", "refresh_city"), ("attractions", "refresh_attraction"),
+                         ("forecast", "refresh_forecast"), ("matrix", "fetch_table")):
+        monkeypatch.setattr(cache_warmer, target, call(name))
+    return types.SimpleNamespace(calls=calls, ttl=ttl)
+
+
+def _tracker(*cities):
+    tracker = DemandTracker()
+    for city in cities:
+        tracker.record(city, ["culture"])
+    return tracker
+
+
+def test_cold_combos_are_warmed_and_fresh_ones_skipped(upstream):
+    warmer = CacheWarmer(_tracker("Jaipur", "Agra"), calls_per_minute=6000)
+    cycle = warmer.warm_once()
+    assert cycle["combos"] == 2
+    assert (cycle["geocode"], cycle["attractions"], cycle["weather"], cycle["matrix"]) == (2, 2, 2, 2)
+    assert cycle["upstream_calls"] == 8
+
+    upstream.calls.clear()
+    upstream.ttl.update(geocode=float("inf"), attractions=3 * DAY, forecast=3 * DAY)
+    cycle = warmer.warm_once()
+    assert upstream.calls == [] and cycle["upstream_calls"] == 0
+
+
+def test_entries_close_to_expiry_are_refreshed(upstream):
+    upstream.ttl.update(geocode=float("inf"), attractions=60, forecast=3 * DAY)
+    warmer = CacheWarmer(_tracker("Jaipur"), refresh_ahead_seconds=900, calls_per_minute=6000)
+    warmer.warm_once()
+    assert sorted(upstream.calls) == ["attractions", "matrix"]
+
+
+def test_only_the_top_combos_are_warmed(upstream):
+    tracker = _tracker("Jaipur", "Jaipur", "Agra", "Delhi", "Delhi", "Delhi")
+    assert CacheWarmer(tracker, top_n=2, calls_per_minute=6000).warm_once()["combos"] == 2
+
+
+def test_a_failing_combo_does_not_stop_the_cycle(upstream, monkeypatch):
+    def bbox(city):
+        if city == "agra":
+            raise ValueError("geocode failed")
+        return {"lat": 26.9, "lon": 75.8}
+
+    monkeypatch.setattr(cache_warmer, "bbox_from_city", bbox)
+    cycle = CacheWarmer(_tracker("Jaipur", "Agra"), calls_per_minute=6000).warm_once()
+    assert cycle["failed"] == 1 and cycle["matrix"] == 1
+
+
+def test_budget_wait_ends_when_the_warmer_stops():
+    warmer = CacheWarmer(DemandTracker(), calls_per_minute=6)  # burst of one, then one call per 10s
+    assert warmer._spend()
+    threading.Timer(0.05, warmer._stop.set).start()
+    t0 = time.monotonic()
+    assert not warmer._spend()
+    assert time.monotonic() - t0 < 2
+    assert not warmer._spend()
+
+
+def test_stopped_warmer_sends_nothing(upstream):
+    warmer = CacheWarmer(_tracker("Jaipur"), calls_per_minute=6000)
+    warmer._stop.set()
+    assert warmer.warm_once()["upstream_calls"] == 0
+    assert upstream.calls == []
+
+
+def test_warmer_is_off_unless_enabled(monkeypatch):
+    monkeypatch.setattr(cache_warmer.config, "CACHE_WARMER_ENABLED", False)
+    assert start_cache_warmer() is None
@@ -0,0 +1,61 @@
+import asyncio
+import threading
+
+from tests.conftest import plan_json
+from model import TravelState
+from src.agents import planner
+
+
+def _state(days):
+    return TravelState(city="Jaipur", days=days, interests=["culture"], budget="medium")
+
+
+def _days(out):
+    return [d["day"] for d in out["plan_outline"]["days"]]
+
+
+def test_day_chunks_cover_the_trip_in_order(monkeypatch):
+    monkeypatch.setattr(planner.config, "PLANNER_CHUNK_DAYS", 3)
+    assert planner._day_chunks(7) == [[1, 2, 3], [4, 5, 6], [7]]
+    assert planner._day_chunks(3) == [[1, 2, 3]]
+
+
+def test_long_trip_is_planned_in_concurrent_chunks(stub_backends):
+    # ten days -> four chunks, all in flight at once
+    barrier = threading.Barrier(4, timeout=5)
+    stub_backends["hooks"]["llm"] = barrier.wait
+    out = planner.planner_node(_state(10))
+    assert _days(out) == list(range(1, 11))
+    assert stub_backends["llm"] == 4
+    assert out["plan_outline"]["trip_overview"]
+
+
+def test_short_trip_is_one_call(stub_backends):
+    assert _days(planner.planner_node(_state(3))) == [1, 2, 3]
+    assert stub_backends["llm"] == 1
+
+
+def test_chunks_only_contribute_their_own_days(monkeypatch):
+    # a model that ignores the range and plans the whole trip every time
+    monkeypatch.setattr(planner.groq, "invoke", lambda prompt, max_tokens=None: plan_json(1, 8))
+    assert _days(planner.planner_node(_state(8))) == list(range(1, 9))
+
+
+def test_failed_chunk_is_recovered_by_a_continuation(stub_backends, monkeypatch):
+    stub = planner.groq.invoke
+
+    def invoke(prompt, max_tokens=None):
+        if "covers days 4 to 6" in prompt:
+            return "rate limited, try later"
+        return stub(prompt)
+
+    monkeypatch.setattr(planner.groq, "invoke", invoke)
+    out = planner.planner_node(_state(7))
+    assert _days(out) == list(range(1, 8))
+    assert stub_backends["llm"] == 3  # two chunks and the continuation
+
+
+def test_async_planner_chunks(stub_backends):
+    out = asyncio.run(planner.aplanner_node(_state(9)))
+    assert _days(out) == list(range(1, 10))
+    assert stub_backends["llm"] == 3
@@ -0,0 +1,117 @@
+import types
+
+import pytest
+
+from src.utils import circuit_breaker, http, opentripmap
+from src.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from src.utils.geocode_cache import GeocodeCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [50.0]
+    monkeypatch.setattr(circuit_breaker, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def _fail(breaker, times=1):
+    for _ in range(times):
+        breaker.allow()
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures_only():
+    breaker = CircuitBreaker("t", failure_threshold=3)
+    _fail(breaker, 2)
+    breaker.allow()
+    breaker.record_success()
+    _fail(breaker, 2)
+    assert breaker.state == CLOSED
+    _fail(breaker)
+    assert breaker.state == OPEN
+    assert breaker.stats()["times_opened"] == 1
+
+
+def test_open_breaker_rejects_until_the_recovery_timeout(clock):
+    breaker = CircuitBreaker("t", failure_threshold=1, recovery_timeout=30)
+    _fail(breaker)
+    clock[0] += 10
+    with pytest.raises(CircuitOpenError) as exc:
+        breaker.allow()
+    assert exc.value.retry_in == pytest.approx(20)
+    assert breaker.stats()["rejected"] == 1
+    clock[0] += 20
+    assert breaker.state == HALF_OPEN
+
+
+def test_half_open_probe_success_closes(clock):
+    breaker = CircuitBreaker("t", failure_threshold=1, recovery_timeout=30, half_open_max_calls=1)
+    _fail(breaker)
+    clock[0] += 30
+    breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()  # only one probe at a time
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.allow()
+
+
+def test_half_open_probe_failure_reopens(clock):
+    breaker = CircuitBreaker("t", failure_threshold=3, recovery_timeout=30)
+    _fail(breaker, 3)
+    clock[0] += 30
+    _fail(breaker)
+    assert breaker.state == OPEN
+    assert breaker.stats()["times_opened"] == 2
+
+
+def test_released_probe_frees_its_slot(clock):
+    breaker = CircuitBreaker("t", failure_threshold=1, recovery_timeout=30)
+    _fail(breaker)
+    clock[0] += 30
+    breaker.allow()
+    breaker.release()
+    breaker.allow()
+    assert breaker.state == HALF_OPEN
+
+
+def test_http_requests_fail_fast_once_the_provider_breaker_opens(monkeypatch):
+    sent = []
+    breaker = CircuitBreaker("test-provider", failure_threshold=2, recovery_timeout=60)
+    monkeypatch.setattr(http, "get_breaker", lambda name: breaker)
+    monkeypatch.setattr(http.config, "HTTP_MAX_RETRIES", 0)
+    monkeypatch.setattr(http, "get_session", lambda: types.SimpleNamespace(
+        request=lambda *a, **k: sent.append(1) or types.SimpleNamespace(status_code=500, headers={})))
+    for _ in range(2):
+        assert http.get("https://down.test/x", provider="test-provider").status_code == 500
+    with pytest.raises(CircuitOpenError):
+        http.get("https://down.test/x", provider="test-provider")
+    assert len(sent) == 2
+
+
+
+def test_refused_call_budget_is_not_a_provider_failure(monkeypatch):
+    sent = []
+    breaker = CircuitBreaker("test-provider", failure_threshold=2, recovery_timeout=60)
+    monkeypatch.setattr(http, "get_breaker", lambda name: breaker)
+    monkeypatch.setattr(http, "get_session", lambda: types.SimpleNamespace(
+        request=lambda *a, **k: sent.append(1) or types.SimpleNamespace(status_code=200, headers={})))
+    with http.call_budget(lambda: False):
+        for _ in range(3):
+            with pytest.raises(http.RequestCancelled):
+                http.get("https://up.test/x", provider="test-provider")
+    assert breaker.state == CLOSED
+    assert breaker.stats()["failures"] == 0 and sent == []
+    assert http.get("https://up.test/x", provider="test-provider").status_code == 200
+
+def test_provider_outage_is_not_cached_as_an_unknown_city(monkeypatch):
+    cache = GeocodeCache()
+    monkeypatch.setattr(opentripmap, "geocode_cache", cache)
+
+    def outage(*args, **kwargs):
+        raise CircuitOpenError(kwargs.get("provider", "?"), 10)
+
+    monkeypatch.setattr(opentripmap.http, "get", outage)
+    with pytest.raises(CircuitOpenError):
+        opentripmap.bbox_from_city("Pune")
+    assert cache.get("Pune") is None
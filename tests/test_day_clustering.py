@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from src.utils import osrm_client
+from src.utils.day_clustering import cluster_days
+
+
+def _blobs(centers, per_blob, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.vstack([np.array(c) + rng.normal(scale=0.003, size=(per_blob, 2)) for c in centers])
+
+
+@pytest.mark.parametrize("n, days", [(10, 3), (17, 4), (7, 7), (30, 5), (5, 2)])
+def test_every_point_is_assigned_once_in_balanced_groups(n, days):
+    points = np.random.default_rng(n).uniform([26.8, 75.7], [27.0, 75.9], size=(n, 2))
+    groups = cluster_days(points, days)
+    assert len(groups) == days
+    assert sorted(i for g in groups for i in g) == list(range(n))
+    assert max(len(g) for g in groups) <= -(-n // days)
+
+
+def test_separated_neighbourhoods_become_separate_days():
+    centers = [(26.90, 75.80), (26.95, 75.85), (27.00, 75.75)]
+    points = _blobs(centers, per_blob=5)
+    groups = cluster_days(points, 3)
+    assert sorted(groups) == [list(range(0, 5)), list(range(5, 10)), list(range(10, 15))]
+
+
+def test_groups_are_ordered_by_their_best_ranked_stop():
+    points = _blobs([(26.90, 75.80), (27.00, 75.75)], per_blob=4)[::-1]
+    groups = cluster_days(points, 2)
+    assert [g[0] for g in groups] == sorted(g[0] for g in groups)
+    assert all(g == sorted(g) for g in groups)
+
+
+def test_result_is_deterministic():
+    points = np.random.default_rng(1).uniform(0, 1, size=(25, 2))
+    assert cluster_days(points, 4) == cluster_days(points, 4)
+
+
+def test_edge_cases():
+    assert cluster_days(np.zeros((0, 2)), 3) == []
+    assert cluster_days(np.ones((3, 2)), 0) == [[0, 1, 2]]
+    assert sorted(cluster_days(np.random.default_rng(0).uniform(size=(2, 2)), 5)) == [[0], [1]]
+
+
+def test_day_routes_cover_each_stop_once(monkeypatch):
+    points = _blobs([(26.90, 75.80), (26.95, 75.85)], per_blob=4)
+    coords = [{"lat": lat, "lon": lon} for lat, lon in points]
+    matrix = np.linalg.norm(points[:, None] - points[None], axis=-1) * 1e5
+    monkeypatch.setattr(osrm_client, "fetch_table",
+                        lambda c: {"durations": matrix, "distances": matrix, "source": "test"})
+    route = osrm_client.compute_day_routes(coords, 2)
+    assert [d["day"] for d in route["days"]] == [1, 2]
+    assert sorted(route["order_indices"]) == list(range(8))
+    for day in route["days"]:
+        assert day["order_indices"][0] == min(day["order_indices"])
+    assert route["total_duration"] == pytest.approx(sum(d["total_duration"] for d in route["days"]))
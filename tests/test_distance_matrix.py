@@ -0,0 +1,81 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from src.utils.distance_matrix import (
+    DistanceBackend, FallbackBackend, HaversineBackend, OSRMBackend, haversine_matrix,
+)
+
+COORDS = [{"lat": 48.8566, "lon": 2.3522}, {"lat": 51.5074, "lon": -0.1278}, {"lat": 41.9028, "lon": 12.4964}]
+
+
+class StaticBackend(DistanceBackend):
+    name = "static"
+
+    def __init__(self, delay=0.0, error=None):
+        self.delay = delay
+        self.error = error
+        self.release = threading.Event()
+
+    def matrix(self, coords, sources=None, destinations=None):
+        if self.delay:
+            self.release.wait(self.delay)
+        if self.error:
+            raise self.error
+        n = len(coords)
+        return {"durations": np.ones((n, n)), "distances": None, "source": self.name}
+
+
+def test_haversine_known_distance_and_symmetry():
+    lat = np.array([c["lat"] for c in COORDS])
+    lon = np.array([c["lon"] for c in COORDS])
+    d = haversine_matrix(lat, lon)
+    assert d[0, 1] == pytest.approx(343_500, rel=0.01)  # Paris - London
+    assert np.allclose(d, d.T)
+    assert np.allclose(np.diag(d), 0)
+
+
+def test_haversine_backend_applies_circuity_speed_and_subsets():
+    backend = HaversineBackend(circuity=1.5, speed_kmh=36.0)
+    full = backend.matrix(COORDS)
+    assert full["source"] == "haversine"
+    assert np.allclose(full["durations"], full["distances"] / 10.0)
+    part = backend.matrix(COORDS, sources=[2], destinations=[0, 1])
+    assert part["distances"].shape == (1, 2)
+    assert np.allclose(part["distances"], full["distances"][[2]][:, [0, 1]])
+
+
+def test_backends_must_implement_matrix():
+    with pytest.raises(TypeError):
+        DistanceBackend()
+
+
+def test_osrm_table_parsing():
+    backend = OSRMBackend("http://osrm.test/")
+    assert backend._url(COORDS[:2], [0], None).startswith("http://osrm.test/table/v1/driving/2.3522,48.8566;")
+    parsed = backend._parse({"code": "Ok", "durations": [[0, None], [5, 0]], "distances": [[0, 1], [2, 0]]})
+    assert parsed["durations"][1, 0] == 5 and parsed["durations"][0, 1] > 1e6
+    with pytest.raises(ValueError):
+        backend._parse({"code": "NoTable", "message": "bad"})
+
+
+def test_fallback_uses_primary_when_it_answers():
+    assert FallbackBackend(StaticBackend(), HaversineBackend()).matrix(COORDS)["source"] == "static"
+
+
+def test_fallback_on_primary_error():
+    backend = FallbackBackend(StaticBackend(error=RuntimeError("osrm down")), HaversineBackend())
+    assert backend.matrix(COORDS)["source"] == "haversine"
+    assert asyncio.run(backend.amatrix(COORDS))["source"] == "haversine"
+
+
+def test_fallback_on_slow_primary():
+    slow = StaticBackend(delay=5)
+    backend = FallbackBackend(slow, HaversineBackend(), soft_timeout=0.05)
+    try:
+        assert backend.matrix(COORDS)["source"] == "haversine"
+        assert asyncio.run(backend.amatrix(COORDS))["source"] == "haversine"
+    finally:
+        slow.release.set()
@@ -0,0 +1,115 @@
+import pytest
+import requests
+
+from src.utils import opentripmap
+from src.utils.geocode_cache import GeocodeCache, normalize_city
+
+
+def test_normalize_city_ignores_case_accents_and_spacing():
+    assert normalize_city("  São   Paulo ") == normalize_city("sao paulo") == "sao paulo"
+    assert normalize_city("ZÜRICH") == "zurich"
+
+
+def test_gazetteer_entries_never_expire():
+    cache = GeocodeCache(gazetteer={"Jaipur": {"lat": 26.9, "lon": 75.8}})
+    assert cache.get("JAIPUR") == {"lat": 26.9, "lon": 75.8, "source": "gazetteer"}
+    assert cache.ttl_remaining("jaipur") == float("inf")
+    assert cache.ttl_remaining("Pune") is None
+
+
+def test_entries_are_shared_through_the_sqlite_file(tmp_path):
+    path = str(tmp_path / "geocode.sqlite")
+    GeocodeCache(path=path).set("Pune", {"lat": 18.52, "lon": 73.85, "source": "nominatim"})
+    other = GeocodeCache(path=path)
+    assert other.get("pune") == {"lat": 18.52, "lon": 73.85, "source": "nominatim"}
+    assert 0 < other.ttl_remaining("Pune") <= 30 * 24 * 3600
+
+
+def test_failed_lookups_are_cached_with_the_shorter_ttl(tmp_path):
+    cache = GeocodeCache(path=str(tmp_path / "geocode.sqlite"), negative_ttl_seconds=60)
+    cache.set_negative("Atlantis", "not found")
+    assert cache.get("atlantis") == {"error": "not found"}
+    assert cache.ttl_remaining("Atlantis") <= 60
+
+
+@pytest.fixture
+def live_lookups(monkeypatch):
+    calls = []
+
+    def geocode_live(city_name):
+        calls.append(city_name)
+        if city_name == "Atlantis":
+            raise ValueError("unknown city")
+        return {"lat": 1.0, "lon": 2.0, "source": "nominatim"}
+
+    monkeypatch.setattr(opentripmap, "geocode_cache", GeocodeCache())
+    monkeypatch.setattr(opentripmap, "_geocode_live", geocode_live)
+    return calls
+
+
+def test_bbox_from_city_geocodes_each_city_once(live_lookups):
+    assert opentripmap.bbox_from_city("Pune, India")["lat"] == 1.0
+    assert opentripmap.bbox_from_city("  pune")["lon"] == 2.0
+    assert live_lookups == ["Pune"]
+
+
+def test_bbox_from_city_caches_unknown_cities(live_lookups):
+    for _ in range(2):
+        with pytest.raises(ValueError, match="unknown city"):
+            opentripmap.bbox_from_city("Atlantis")
+    assert live_lookups == ["Atlantis"]
+
+
+class _Response:
+    def __init__(self, status, data):
+        self.status_code, self._data = status, data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error")
+
+    def json(self):
+        return self._data
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Canned Nominatim/geoname answers behind bbox_from_city, with a fresh cache."""
+    answers, calls = {}, []
+
+    def get(url, *args, provider=None, **kwargs):
+        calls.append(provider)
+        answer = answers[provider]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    monkeypatch.setattr(opentripmap, "geocode_cache", GeocodeCache())
+    monkeypatch.setattr(opentripmap.http, "get", get)
+    return answers, calls
+
+
+def test_outages_are_not_negative_cached(upstream):
+    answers, calls = upstream
+    answers.update(nominatim=requests.Timeout("read timed out"), opentripmap=_Response(401, {"error": "no key"}))
+    with pytest.raises(requests.HTTPError):
+        opentripmap.bbox_from_city("Pune")
+    assert opentripmap.geocode_cache.get("Pune") is None
+
+    answers["nominatim"] = _Response(200, [{"lat": "18.52", "lon": "73.85"}])
+    assert opentripmap.bbox_from_city("Pune")["source"] == "nominatim"
+    assert calls == ["nominatim", "opentripmap", "nominatim"]
+
+
+def test_a_definitive_miss_is_negative_cached(upstream):
+    answers, calls = upstream
+    answers.update(nominatim=_Response(200, []), opentripmap=_Response(401, {"error": "no key"}))
+    for _ in range(2):
+        with pytest.raises(ValueError, match="no OSM match"):
+            opentripmap.bbox_from_city("Atlantis")
+    assert calls == ["nominatim", "opentripmap"]
+
+    answers.update(nominatim=requests.Timeout("read timed out"), opentripmap=_Response(200, {"error": "not found"}))
+    with pytest.raises(ValueError, match="Geoname lookup failed"):
+        opentripmap.bbox_from_city("Lemuria")
+    assert "error" in opentripmap.geocode_cache.get("Lemuria")
@@ -0,0 +1,72 @@
+import asyncio
+import threading
+
+import pytest
+
+from graph import build_graph
+from model import TravelState, _join_errors, _keep_latest
+
+
+def _state(**overrides):
+    fields = dict(city="Jaipur", days=2, interests=["culture", "food"], budget="medium")
+    fields.update(overrides)
+    return TravelState(**fields).model_dump()
+
+
+def test_parallel_graph_produces_every_output(stub_backends):
+    out = build_graph(parallel=True).invoke(_state())
+    assert not out.get("error")
+    assert [d["day"] for d in out["plan_outline"]["days"]] == [1, 2]
+    assert out["attractions"] and out["weather_data"]["time"]
+    assert out["route_plan"]["days"]
+    assert out["itinerary_text"].startswith("Day 1")
+    assert out["itinerary_pdf_key"]
+
+
+def test_attraction_and_weather_branches_run_concurrently(stub_backends):
+    # each fetch waits for the other one: only passes if both branches are in flight together
+    barrier = threading.Barrier(2, timeout=5)
+    stub_backends["hooks"]["pois"] = barrier.wait
+    stub_backends["hooks"]["weather"] = barrier.wait
+    out = build_graph(parallel=True).invoke(_state())
+    assert not out.get("error")
+    assert stub_backends["pois"] == stub_backends["weather"] == 1
+
+
+def test_sequential_graph_gives_the_same_result(stub_backends):
+    parallel = build_graph(parallel=True).invoke(_state())
+    sequential = build_graph(parallel=False).invoke(_state())
+    for key in ("plan_outline", "attractions", "weather_data", "route_plan", "itinerary_text"):
+        assert sequential[key] == parallel[key]
+
+
+def test_async_invoke_matches_sync(stub_backends):
+    graph = build_graph(parallel=True)
+    out = asyncio.run(graph.ainvoke(_state()))
+    assert not out.get("error")
+    assert out["plan_outline"] == graph.invoke(_state())["plan_outline"]
+
+
+def test_failing_branch_does_not_stop_the_others(stub_backends):
+    def boom():
+        raise RuntimeError("poi provider down")
+    stub_backends["hooks"]["pois"] = boom
+    out = build_graph(parallel=True).invoke(_state())
+    assert "poi provider down" in out["error"]
+    assert out["weather_data"]["time"]
+    assert out["plan_outline"]["days"]
+
+
+@pytest.mark.parametrize("current, update, expected", [
+    (None, "a", "a"),
+    ("a", None, "a"),
+    ("a", "b", "a; b"),
+    ("a; b", "b", "a; b"),
+])
+def test_join_errors(current, update, expected):
+    assert _join_errors(current, update) == expected
+
+
+def test_keep_latest_ignores_empty_updates():
+    assert _keep_latest("planner_completed", None) == "planner_completed"
+    assert _keep_latest("planner_completed", "Weather_completed") == "Weather_completed"
@@ -0,0 +1,111 @@
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+
+from src.utils import http
+from src.utils.circuit_breaker import CircuitBreaker
+from src.utils.hedge import afirst_non_empty, first_non_empty
+
+
+def test_all_empty_returns_none():
+    assert first_non_empty([lambda cancel: [], lambda cancel: None]) == (None, [])
+
+
+def test_empty_answer_launches_the_next_step_right_away():
+    t0 = time.monotonic()
+    assert first_non_empty([lambda cancel: [], lambda cancel: ["b"]], hedge_delay=10) == (1, ["b"])
+    assert time.monotonic() - t0 < 1
+
+
+def test_failing_step_counts_as_empty():
+    def boom(cancel):
+        raise RuntimeError("provider down")
+
+    assert first_non_empty([boom, lambda cancel: ["b"]], hedge_delay=10) == (1, ["b"])
+
+
+def test_higher_priority_answer_wins_even_if_slower():
+    def slow(cancel):
+        time.sleep(0.2)
+        return ["a"]
+
+    assert first_non_empty([slow, lambda cancel: ["b"]], hedge_delay=0.01) == (0, ["a"])
+
+
+def test_steps_after_the_winner_never_start():
+    started = []
+
+    def step(name, result):
+        def run(cancel):
+            started.append(name)
+            return result
+        return run
+
+    assert first_non_empty([step("a", ["a"]), step("b", ["b"])], hedge_delay=10) == (0, ["a"])
+    time.sleep(0.05)
+    assert started == ["a"]
+
+
+def test_losing_steps_are_told_to_stop():
+    loser_stopped = threading.Event()
+
+    def winner(cancel):
+        time.sleep(0.1)
+        return ["a"]
+
+    def loser(cancel):
+        if cancel.wait(5):
+            loser_stopped.set()
+        return ["b"]
+
+    assert first_non_empty([winner, loser], hedge_delay=0.01) == (0, ["a"])
+    assert loser_stopped.wait(1)
+
+
+def test_steps_run_in_the_callers_context():
+    var = contextvars.ContextVar("var", default=None)
+    var.set("caller")
+    assert first_non_empty([lambda cancel: [var.get()]]) == (0, ["caller"])
+
+
+def test_async_variant_cancels_losers():
+    cancelled = []
+
+    async def winner():
+        await asyncio.sleep(0.05)
+        return ["a"]
+
+    async def loser():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return ["b"]
+
+    async def empty():
+        return []
+
+    async def run():
+        result = await afirst_non_empty([empty, winner, loser], hedge_delay=0.01)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(run()) == (1, ["a"])
+    assert cancelled == [True]
+
+
+def test_cancelled_request_is_not_sent_or_counted(monkeypatch):
+    sent = []
+    breaker = CircuitBreaker("test-hedge-cancel", failure_threshold=1)
+    monkeypatch.setattr(http, "get_session", lambda: sent.append(1))
+    monkeypatch.setattr(http, "get_breaker", lambda name: breaker)
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(http.RequestCancelled):
+        http.get("https://api.test/x", provider="test-hedge-cancel", cancel=cancel)
+    assert sent == []
+    assert breaker.stats()["failures"] == 0 and breaker.state == "closed"
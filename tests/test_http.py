@@ -0,0 +1,94 @@
+import asyncio
+import gc
+
+import httpx
+
+from src.utils import http
+
+
+def _mock_client(handler):
+    """Install a client on the running loop that answers with `handler` instead of the network."""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    http._async_clients[asyncio.get_running_loop()] = client
+    return client
+
+
+def test_sync_session_is_shared():
+    assert http.get_session() is http.get_session()
+    assert http.get_session().headers["User-Agent"] == http.USER_AGENT
+
+
+def test_async_client_is_reused_within_a_loop_and_not_across_loops():
+    async def clients():
+        return http.get_async_client(), http.get_async_client()
+
+    first, again = asyncio.run(clients())
+    other, _ = asyncio.run(clients())
+    assert first is again
+    assert other is not first
+
+
+def test_finished_loops_do_not_pin_clients_or_semaphores():
+    async def use():
+        http.get_async_client()
+        http._host_semaphore("https://example.org/x")
+
+    for _ in range(5):
+        asyncio.run(use())
+    gc.collect()
+    with http._async_lock:
+        http._drop_closed_loops()
+    assert len(http._async_clients) == 0
+    assert len(http._host_semaphores) == 0
+
+
+def test_aclose_closes_the_loop_client():
+    async def run():
+        client = http.get_async_client()
+        await http.aclose()
+        return client, http.get_async_client()
+
+    closed, fresh = asyncio.run(run())
+    assert closed.is_closed
+    assert fresh is not closed
+
+
+def test_async_requests_retry_transient_failures(monkeypatch):
+    monkeypatch.setattr(http, "backoff_delay", lambda attempt: 0)
+    statuses = [503, 502, 200]
+
+    def handler(request):
+        return httpx.Response(statuses.pop(0), json={"ok": True})
+
+    async def run():
+        _mock_client(handler)
+        try:
+            return await http.aget("https://api.test/thing", provider="test-async-retry")
+        finally:
+            await http.aclose()
+
+    resp = asyncio.run(run())
+    assert resp.status_code == 200 and resp.json() == {"ok": True}
+    assert statuses == []
+
+
+def test_async_requests_limit_concurrency_per_host(monkeypatch):
+    monkeypatch.setattr(http.config, "HTTP_MAX_PER_HOST", 2)
+    active, peak = [0], [0]
+
+    async def handler(request):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.01)
+        active[0] -= 1
+        return httpx.Response(200)
+
+    async def run():
+        _mock_client(handler)
+        try:
+            await asyncio.gather(*(http.aget("https://slow.test/x") for _ in range(6)))
+        finally:
+            await http.aclose()
+
+    asyncio.run(run())
+    assert peak[0] == 2
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from model import TravelState
+from src.agents import planner
+from src.utils.json_repair import IncrementalJSONParser, parse_partial_json
+
+PLAN = {"trip_overview": "Forts {and} \"food\"", "days": [
+    {"day": 1, "theme": "Old city", "activities": ["Amber Fort", "Hawa Mahal"], "description": "a, b"},
+    {"day": 2, "theme": "Bazaars", "activities": ["Johari Bazaar"], "description": "c [d]"},
+]}
+TEXT = json.dumps(PLAN)
+
+
+def test_prose_and_code_fences_around_the_json_are_ignored():
+    assert parse_partial_json(f"Sure! Here is your plan:\n```json\n{TEXT}\n```\nEnjoy {{the trip}}!") == PLAN
+
+
+@pytest.mark.parametrize("cut, expected", [
+    ('{"a": "unterminated', {"a": "unterminated"}),
+    ('{"a": 1, "b":', {"a": 1}),
+    ('{"a": 1, "b"', {"a": 1}),
+    ('{"a": [1, 2,', {"a": [1, 2]}),
+    ('{"a": tru', {}),
+    ('{"a": "x\\', {"a": "x"}),
+    ('[{"day": 1}, {"day"', [{"day": 1}]),
+    ("{", {}),
+])
+def test_truncated_values_are_repaired(cut, expected):
+    assert parse_partial_json(cut) == expected
+
+
+def test_no_json_raises_value_error():
+    with pytest.raises(ValueError):
+        parse_partial_json("I cannot produce an itinerary.")
+
+
+def test_every_prefix_parses_and_grows_into_the_full_value():
+    parser = IncrementalJSONParser()
+    seen_days = 0
+    for ch in TEXT:
+        parser.feed(ch)
+        value = parser.value()
+        assert isinstance(value, dict)
+        complete_days = [d for d in value.get("days", []) if d in PLAN["days"]]
+        assert len(complete_days) >= seen_days
+        seen_days = len(complete_days)
+    assert parser.complete and parser.value() == PLAN
+
+
+def test_input_after_the_value_closes_is_ignored():
+    parser = IncrementalJSONParser()
+    parser.feed('{"a": 1} and then {"b": 2}')
+    parser.feed(' more')
+    assert parser.complete
+    assert parser.value() == {"a": 1}
+
+
+def test_truncated_plan_keeps_complete_days_only():
+    plan = planner._extract_plan(TEXT[:TEXT.index('"activities": ["Johari')])
+    assert [d["day"] for d in plan["days"]] == [1]
+    assert plan["trip_overview"] == PLAN["trip_overview"]
+
+
+def test_planner_asks_only_for_days_lost_to_truncation(monkeypatch):
+    prompts = []
+
+    def invoke(prompt, max_tokens=None):
+        prompts.append(prompt)
+        if len(prompts) == 1:
+            return TEXT[:TEXT.index('"activities": ["Johari')]
+        return json.dumps({"days": [PLAN["days"][1], dict(PLAN["days"][0], theme="duplicate")]})
+
+    monkeypatch.setattr(planner.groq, "invoke", invoke)
+    out = planner.planner_node(TravelState(city="Jaipur", days=2, interests=["culture"]))
+    assert out["plan_outline"]["days"] == PLAN["days"]
+    assert len(prompts) == 2 and "Include ONLY these days: 2." in prompts[1]
+
+
+def test_planner_reports_unusable_output(monkeypatch):
+    monkeypatch.setattr(planner.groq, "invoke", lambda prompt, max_tokens=None: "no plan today")
+    out = planner.planner_node(TravelState(city="Jaipur", days=2, interests=["culture"]))
+    assert out["error"].startswith("planner: failed to parse json output")
+    assert out["llm_output"] == "no plan today"
@@ -0,0 +1,91 @@
+import types
+
+import pytest
+
+from src.utils.groq_client import GroqClient
+from src.utils.llm_cache import CacheBackend, LLMResponseCache, MemoryBackend, SQLiteBackend
+
+
+class FakeLLM:
+    def __init__(self, content="plan"):
+        self.content = content
+        self.calls = 0
+
+    def invoke(self, messages, max_tokens=None):
+        self.calls += 1
+        return types.SimpleNamespace(content=self.content, usage_metadata={"input_tokens": 10, "output_tokens": 5})
+
+
+def test_key_covers_everything_that_changes_the_output():
+    args = ("llama", 0.0, 512, "system", "prompt")
+    key = LLMResponseCache.make_key(*args)
+    assert key == LLMResponseCache.make_key(*args)
+    assert key.startswith(LLMResponseCache.NAMESPACE)
+    for i, other in enumerate(("mixtral", 0.5, 256, "other system", "other prompt")):
+        changed = list(args)
+        changed[i] = other
+        assert LLMResponseCache.make_key(*changed) != key
+
+
+def test_responses_round_trip_compressed():
+    backend = MemoryBackend()
+    cache = LLMResponseCache(backend)
+    cache.set("k", "Day 1: Amber Fort " * 50)
+    assert cache.get("k") == "Day 1: Amber Fort " * 50
+    assert len(backend.get("k")) < len("Day 1: Amber Fort " * 50)
+    assert cache.get("missing") is None
+
+
+def test_corrupt_entry_is_a_miss_and_dropped():
+    backend = MemoryBackend()
+    backend.set("k", b"not zlib", 60)
+    cache = LLMResponseCache(backend)
+    assert cache.get("k") is None
+    assert backend.get("k") is None
+
+
+def test_backend_errors_are_misses():
+    class Broken(CacheBackend):
+        def get(self, key):
+            raise OSError("disk gone")
+
+        def set(self, key, value, ttl_seconds):
+            raise OSError("disk gone")
+
+        def delete(self, key):
+            raise OSError("disk gone")
+
+    cache = LLMResponseCache(Broken())
+    cache.set("k", "v")
+    assert cache.get("k") is None
+
+
+def test_backends_must_implement_delete():
+    class NoDelete(CacheBackend):
+        def get(self, key):
+            return None
+
+        def set(self, key, value, ttl_seconds):
+            pass
+
+    with pytest.raises(TypeError):
+        NoDelete()
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+    LLMResponseCache(SQLiteBackend(path)).set("k", "itinerary")
+    assert LLMResponseCache(SQLiteBackend(path)).get("k") == "itinerary"
+
+
+def test_groq_client_serves_repeat_prompts_from_the_cache():
+    cache = LLMResponseCache(MemoryBackend())
+    first, second = GroqClient(cache=cache), GroqClient(cache=cache)
+    first.llm = second.llm = llm = FakeLLM()
+    assert first.invoke("plan Jaipur") == "plan"
+    assert second.invoke("plan Jaipur") == "plan"
+    assert llm.calls == 1
+    assert first.usage() == {"calls": 1, "cache_hits": 0, "input_tokens": 10, "output_tokens": 5}
+    assert second.usage()["cache_hits"] == 1
+    second.invoke("plan Jaipur", max_tokens=64)
+    assert llm.calls == 2
@@ -0,0 +1,95 @@
+import numpy as np
+
+from src.utils.distance_matrix import CachedBackend, HaversineBackend
+from src.utils.matrix_cache import MatrixCache
+
+
+class RecordingBackend(HaversineBackend):
+    name = "recording"
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def matrix(self, coords, sources=None, destinations=None):
+        self.calls.append((len(coords), sources, destinations))
+        return dict(super().matrix(coords, sources, destinations), source=self.name)
+
+
+def _points(n, lat=26.9, lon=75.8):
+    return [{"lat": lat + i * 0.01, "lon": lon + i * 0.007, "xid": f"p{i}"} for i in range(n)]
+
+
+def test_repeat_request_is_served_from_cache():
+    inner = RecordingBackend()
+    backend = CachedBackend(inner, MatrixCache())
+    coords = _points(4)
+    first = backend.matrix(coords)
+    second = backend.matrix(coords)
+    assert len(inner.calls) == 1
+    assert first["cache"] == {"pairs": 12, "from_cache": 0, "fetched": 12}
+    assert second["cache"] == {"pairs": 12, "from_cache": 12, "fetched": 0}
+    assert np.allclose(second["durations"], first["durations"], rtol=1e-6)
+    assert np.allclose(second["distances"], first["distances"], rtol=1e-6)
+
+
+def test_subset_in_another_order_needs_no_fetch():
+    inner = RecordingBackend()
+    backend = CachedBackend(inner, MatrixCache())
+    coords = _points(5)
+    full = backend.matrix(coords)["durations"]
+    order = [3, 0, 4]
+    sub = backend.matrix([coords[i] for i in order])
+    assert len(inner.calls) == 1
+    assert np.allclose(sub["durations"], full[np.ix_(order, order)], rtol=1e-6)
+
+
+def test_only_missing_pairs_are_counted_as_fetched():
+    inner = RecordingBackend()
+    cache = MatrixCache()
+    backend = CachedBackend(inner, cache)
+    coords = _points(3)
+    backend.matrix(coords[:2])
+    result = backend.matrix(coords)
+    assert result["cache"] == {"pairs": 6, "from_cache": 2, "fetched": 4}
+    assert np.allclose(result["durations"], HaversineBackend().matrix(coords)["durations"], rtol=1e-6)
+    assert cache.stats()["pairs_fetched"] == 6
+
+
+def test_restricted_requests_bypass_the_cache():
+    inner = RecordingBackend()
+    backend = CachedBackend(inner, MatrixCache())
+    backend.matrix(_points(3), sources=[0], destinations=[1, 2])
+    assert inner.calls == [(3, [0], [1, 2])]
+
+
+def test_points_without_xid_are_keyed_by_rounded_coordinates():
+    cache = MatrixCache(precision=4)
+    assert cache.point_key({"lat": 26.91234, "lon": 75.81236}) == cache.point_key({"lat": 26.91231, "lon": 75.81239})
+    assert cache.point_key({"xid": "N1", "lat": 0, "lon": 0}) == "xid:N1"
+
+
+def test_distant_cities_use_separate_regions_and_lru_eviction():
+    cache = MatrixCache(max_regions=2)
+    backend = CachedBackend(RecordingBackend(), cache)
+    for lat, lon in [(26.9, 75.8), (48.8, 2.3), (51.5, -0.1)]:
+        backend.matrix(_points(3, lat, lon))
+    assert cache.stats()["regions"] == 2
+    # the first region was evicted, so asking again fetches it
+    assert backend.matrix(_points(3, 26.9, 75.8))["cache"]["fetched"] == 6
+
+
+def test_region_resets_when_full():
+    cache = MatrixCache(max_points_per_region=4)
+    backend = CachedBackend(RecordingBackend(), cache)
+    backend.matrix(_points(3))
+    result = backend.matrix([dict(p, xid=f"q{i}") for i, p in enumerate(_points(3))])
+    assert result["cache"]["fetched"] == 6
+    assert cache.stats()["points"] == 3
+
+
+def test_region_grows_past_its_initial_capacity():
+    backend = CachedBackend(RecordingBackend(), MatrixCache())
+    coords = [{"lat": 26.9 + (i % 10) * 0.001, "lon": 75.8 + (i // 10) * 0.001, "xid": f"p{i}"} for i in range(80)]
+    backend.matrix(coords)
+    assert backend.matrix(coords)["cache"]["fetched"] == 0
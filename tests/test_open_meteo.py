@@ -0,0 +1,42 @@
+import asyncio
+import types
+
+import pytest
+
+from src.utils import open_meteo
+from src.utils.cache import TTLCache
+from tests.conftest import fake_weather
+
+
+@pytest.fixture
+def forecasts(monkeypatch):
+    """Fake Open-Meteo that answers with as many days as asked for, behind an empty cache."""
+    asked = []
+
+    def answer(url, params=None, **kwargs):
+        asked.append(params["forecast_days"])
+        data = fake_weather(params["latitude"], params["longitude"], days=params["forecast_days"])
+        return types.SimpleNamespace(raise_for_status=lambda: None, json=lambda: data)
+
+    async def aanswer(url, **kwargs):
+        return answer(url, **kwargs)
+
+    monkeypatch.setattr(open_meteo, "_forecasts", TTLCache(ttl_seconds=60))
+    monkeypatch.setattr(open_meteo.http, "get", answer)
+    monkeypatch.setattr(open_meteo.http, "aget", aanswer)
+    return asked
+
+
+def test_long_trips_ask_for_at_most_the_forecast_horizon(forecasts):
+    daily = open_meteo.fetch_weather_by_coords(26.9, 75.8, days=20)["daily"]
+    assert forecasts == [open_meteo.MAX_FORECAST_DAYS]
+    assert len(daily["time"]) == open_meteo.MAX_FORECAST_DAYS
+    daily = asyncio.run(open_meteo.afetch_weather_by_coords(26.9, 75.8, days=20))["daily"]
+    assert len(daily["temperature_2m_max"]) == open_meteo.MAX_FORECAST_DAYS
+
+
+def test_shorter_trips_are_sliced_from_the_cached_forecast(forecasts):
+    open_meteo.fetch_weather_by_coords(26.9, 75.8, days=20)
+    daily = open_meteo.fetch_weather_by_coords(26.9, 75.8, days=3)["daily"]
+    assert len(daily["time"]) == 3
+    assert forecasts == [open_meteo.MAX_FORECAST_DAYS]
@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+
+import pytest
+
+from graph import build_graph
+from model import TravelState
+from src.agents import reporter
+from src.utils.blob_store import BlobStore
+
+ITINERARY = "Day 1: Old city\n- Amber Fort\n- Hawa Mahal"
+
+
+@pytest.fixture
+def pdf_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(reporter.config, "PDF_STORE_DIR", str(tmp_path / "pdfs"))
+    return tmp_path / "pdfs"
+
+
+def _state():
+    return TravelState(city="Jaipur", days=1, itinerary_text=ITINERARY)
+
+
+def test_blobs_are_content_addressed(tmp_path):
+    store = BlobStore(str(tmp_path))
+    key = store.put(b"pdf bytes")
+    assert key == BlobStore.key_for(b"pdf bytes")
+    assert store.get(key) == b"pdf bytes"
+    assert os.path.exists(os.path.join(str(tmp_path), key[:2], key))
+    store.delete(key)
+    assert store.get(key) is None and not store.has(key)
+
+
+@pytest.mark.parametrize("key", ["../../etc/passwd", "ABCDEF0123456789", "abc", ""])
+def test_keys_that_are_not_hashes_are_rejected(tmp_path, key):
+    with pytest.raises(ValueError):
+        BlobStore(str(tmp_path)).get(key)
+
+
+def test_prune_drops_least_recently_read_blobs(tmp_path):
+    store = BlobStore(str(tmp_path), max_bytes=250)
+    keys = [store.put(bytes([i]) * 100) for i in range(3)]
+    past = time.time() - 100
+    for i, key in enumerate(keys):
+        os.utime(store.path(key), (past + i, past + i))
+    store.get(keys[0])  # reading refreshes its last-used time
+    assert store.prune() == 1
+    assert store.has(keys[0]) and store.has(keys[2]) and not store.has(keys[1])
+    assert store.stats() == {"blobs": 2, "bytes": 200}
+
+
+def test_lazy_mode_stores_only_the_source(pdf_dir, monkeypatch):
+    monkeypatch.setattr(reporter.config, "PDF_RENDER_MODE", "lazy")
+    out = reporter.reporter_node(_state())
+    key = out["itinerary_pdf_key"]
+    assert key == reporter.pdf_key(reporter.pdf_title("Jaipur", 1), ITINERARY)
+    store = reporter._pdf_store()
+    assert store.has(key, reporter.SOURCE_SUFFIX) and not store.has(key, reporter.PDF_SUFFIX)
+    pdf = reporter.get_pdf(key)
+    assert pdf.startswith(b"%PDF-")
+    assert store.get(key, reporter.PDF_SUFFIX) == pdf
+    assert reporter.get_pdf(key) == pdf
+
+
+def test_background_and_inline_modes_produce_the_pdf(pdf_dir, monkeypatch):
+    for mode in ("background", "inline"):
+        monkeypatch.setattr(reporter.config, "PDF_RENDER_MODE", mode)
+        key = reporter.reporter_node(_state().model_copy(update={"itinerary_text": f"{ITINERARY}\n- {mode}"}))[
+            "itinerary_pdf_key"]
+        assert reporter.get_pdf(key, timeout=10).startswith(b"%PDF-")
+
+
+def test_concurrent_downloads_share_one_render(pdf_dir, monkeypatch):
+    renders = []
+    render = reporter._text_to_pdf_bytes
+    gate = threading.Event()
+
+    def counting_render(title, body):
+        renders.append(title)
+        gate.wait(5)
+        return render(title, body)
+
+    monkeypatch.setattr(reporter, "_text_to_pdf_bytes", counting_render)
+    key = reporter.save_pdf_source("Shared", ITINERARY)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(reporter.get_pdf(key))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join(5)
+    assert len(results) == 4 and len(set(results)) == 1
+    assert renders == ["Shared"]
+
+
+def test_unknown_key_and_missing_text(pdf_dir):
+    assert reporter.get_pdf("0" * 64) is None
+    assert reporter.reporter_node(TravelState(city="Jaipur", days=1)) == {"error": "reporter: no itinerary_text"}
+
+
+def test_graph_state_carries_only_the_key(stub_backends, pdf_dir):
+    out = build_graph(parallel=True).invoke(TravelState(city="Jaipur", days=1, interests=["culture"]).model_dump())
+    assert not any(isinstance(v, bytes) for v in out.values())
+    assert reporter.get_pdf(out["itinerary_pdf_key"]).startswith(b"%PDF-")
@@ -0,0 +1,170 @@
+import json
+import math
+
+import numpy as np
+import pytest
+
+import ingest_pois
+from src.utils import opentripmap
+from src.utils.geocode_cache import GeocodeCache
+from src.utils.poi_index import POIIndex, parse_rate, split_kinds
+
+CENTER = (26.9124, 75.7873)
+KINDS = ["museums,cultural", "historic,fortifications", "natural", "tourism:museum", "historic:ruins"]
+
+
+def _records(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    lat = CENTER[0] + rng.uniform(-0.3, 0.3, n)
+    lon = CENTER[1] + rng.uniform(-0.3, 0.3, n)
+    return [{"xid": f"p{i}", "name": f"Place {i}", "kinds": KINDS[i % len(KINDS)], "lat": lat[i], "lon": lon[i],
+             "rate": ["1", "2", "3h", 3, None][i % 5]} for i in range(n)]
+
+
+def _haversine(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * 6_371_000.0 * math.asin(math.sqrt(a))
+
+
+def _brute_force(records, lat, lon, radius_m, kinds=None):
+    wanted = set(kinds.split(",")) if kinds else None
+    hits = []
+    for r in records:
+        d = _haversine(lat, lon, r["lat"], r["lon"])
+        if d <= radius_m and (wanted is None or wanted & set(split_kinds(r["kinds"]))):
+            hits.append((d, r["xid"]))
+    return [xid for _, xid in sorted(hits)]
+
+
+@pytest.fixture(scope="module")
+def records():
+    return _records()
+
+
+@pytest.fixture(scope="module")
+def index(records):
+    return POIIndex.build(records, [(26.6, 75.4, 27.2, 76.1)])
+
+
+@pytest.mark.parametrize("radius_m", [300, 2000, 8000, 25000])
+@pytest.mark.parametrize("kinds", [None, "museums", "fortifications,natural", "no_such_kind"])
+def test_query_matches_brute_force(index, records, radius_m, kinds):
+    lat, lon = CENTER[0] + 0.01, CENTER[1] - 0.02
+    expected = _brute_force(records, lat, lon, radius_m, kinds)
+    found = index.query(lat, lon, radius_m, kinds=kinds, limit=len(records))
+    assert [p["xid"] for p in found] == expected
+    assert all(p["dist"] <= radius_m for p in found)
+
+
+def test_limit_keeps_the_nearest(index, records):
+    expected = _brute_force(records, *CENTER, 10000)[:15]
+    assert [p["xid"] for p in index.query(*CENTER, 10000, limit=15)] == expected
+
+
+def test_covers_only_circles_inside_an_ingested_region(index):
+    assert index.covers(*CENTER, 10000)
+    assert not index.covers(*CENTER, 40000)
+    assert not index.covers(48.85, 2.35, 1000)
+
+
+def test_save_load_round_trip(index, tmp_path):
+    path = str(tmp_path / "idx" / "poi_index.npz")
+    index.save(path)
+    loaded = POIIndex.load(path)
+    assert len(loaded) == len(index)
+    assert loaded.query(*CENTER, 5000, kinds="historic") == index.query(*CENTER, 5000, kinds="historic")
+    assert np.array_equal(loaded.regions, index.regions)
+
+
+def test_merge_replaces_records_with_the_same_xid():
+    base = POIIndex.build([{"xid": "a", "name": "Old", "lat": 1.0, "lon": 1.0}], [(0, 0, 2, 2)])
+    merged = base.merged([{"xid": "a", "name": "New", "lat": 1.0, "lon": 1.0},
+                          {"xid": "b", "name": "B", "lat": 1.001, "lon": 1.0}], [(5, 5, 6, 6)])
+    assert sorted(r["name"] for r in merged.records()) == ["B", "New"]
+    assert len(merged.regions) == 2
+
+
+def test_osm_tags_are_indexed_under_opentripmap_kinds():
+    assert split_kinds("tourism:museum") == ["tourism:museum", "museums", "cultural", "interesting_places"]
+    assert "historic" in split_kinds("historic:wayside_cross")
+    assert split_kinds(" natural, ,natural ") == ["natural"]
+
+
+@pytest.mark.parametrize("value, expected", [(3, 3), ("3h", 3), ("1", 1), (None, 0), ("", 0)])
+def test_parse_rate(value, expected):
+    assert parse_rate(value) == expected
+
+
+def test_ingest_reads_overpass_and_opentripmap_dumps(tmp_path):
+    overpass = {"elements": [
+        {"type": "node", "id": 1, "lat": 26.9, "lon": 75.8, "tags": {"name": "Fort", "historic": "fort"}},
+        {"type": "way", "id": 2, "center": {"lat": 26.91, "lon": 75.81}, "tags": {"tourism": "museum"}},
+        {"type": "way", "id": 3, "tags": {"tourism": "museum"}},
+    ]}
+    otm = [[{"xid": "N1", "name": "Temple", "kinds": "religion", "point": {"lat": 26.92, "lon": 75.82}, "rate": "2"}]]
+    (tmp_path / "osm.json").write_text(json.dumps(overpass))
+    (tmp_path / "otm.json").write_text(json.dumps(otm))
+    osm_records = ingest_pois.load_overpass_dump(str(tmp_path / "osm.json"))
+    otm_records = ingest_pois.load_otm_dump(str(tmp_path / "otm.json"))
+    assert [r["xid"] for r in osm_records] == ["osm:node:1", "osm:way:2"]
+    assert osm_records[1]["kinds"] == "tourism:museum"
+    assert otm_records == [{"xid": "N1", "name": "Temple", "kinds": "religion", "lat": 26.92, "lon": 75.82,
+                            "dist": None, "rate": "2"}]
+    assert ingest_pois._bbox_of(osm_records + otm_records) == (26.9, 75.8, 26.92, 75.82)
+
+
+
+@pytest.fixture
+def live_sources(monkeypatch):
+    """Canned Overpass/OpenTripMap answers for ingest_pois.load_city: a list of POIs or an exception."""
+    answers = {}
+
+    def source(name):
+        def fetch(lat, lon, radius_m, limit):
+            if isinstance(answers[name], Exception):
+                raise answers[name]
+            return [{"xid": f"{name}:{i}", "lat": lat, "lon": lon} for i in range(answers[name])]
+        return fetch
+
+    monkeypatch.setattr(ingest_pois.opentripmap, "bbox_from_city", lambda city: {"lat": CENTER[0], "lon": CENTER[1]})
+    monkeypatch.setattr(ingest_pois.opentripmap, "fetch_overpass_pois", source("overpass"))
+    monkeypatch.setattr(ingest_pois.opentripmap, "fetch_otm_pois", source("opentripmap"))
+    monkeypatch.setattr(ingest_pois.opentripmap, "OTM_KEY", "key")
+    return answers
+
+
+def test_ingested_city_is_covered_when_every_source_is_complete(live_sources):
+    live_sources.update(overpass=3, opentripmap=4)
+    records, region = ingest_pois.load_city("Indexville", radius_km=5, limit=10)
+    assert len(records) == 7
+    assert region == ingest_pois._bbox_around(CENTER[0], CENTER[1], 5000)
+
+    live_sources["opentripmap"] = RuntimeError("503")
+    assert ingest_pois.load_city("Indexville", radius_km=5, limit=10)[1] is not None
+
+
+@pytest.mark.parametrize("overpass, opentripmap", [
+    (RuntimeError("timeout"), RuntimeError("503")),
+    (10, 2),
+    (RuntimeError("timeout"), 10),
+])
+def test_partial_ingest_leaves_the_area_uncovered(live_sources, overpass, opentripmap):
+    live_sources.update(overpass=overpass, opentripmap=opentripmap)
+    assert ingest_pois.load_city("Indexville", radius_km=5, limit=10)[1] is None
+
+def test_fetch_attraction_answers_covered_cities_offline(index, tmp_path, monkeypatch):
+    path = str(tmp_path / "poi_index.npz")
+    index.save(path)
+    monkeypatch.setattr(opentripmap.config, "POI_INDEX_PATH", path)
+    monkeypatch.setattr(opentripmap, "geocode_cache",
+                        GeocodeCache(gazetteer={"Indexville": {"lat": CENTER[0], "lon": CENTER[1]}}))
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("the offline index should have answered")
+
+    monkeypatch.setattr(opentripmap.http, "get", no_network)
+    monkeypatch.setattr(opentripmap.http, "post", no_network)
+    found = opentripmap.fetch_attraction("Indexville", radius_m=3000, kinds="museums", limit=10)
+    assert [p["xid"] for p in found] == [p["xid"] for p in index.query(*CENTER, 3000, kinds="museums", limit=10)]
@@ -0,0 +1,117 @@
+import types
+
+import numpy as np
+import pytest
+
+from model import TravelState
+from src.agents import attraction
+from src.utils import opentripmap
+from src.utils.cache import TTLCache
+from src.utils.poi_ranking import (
+    DISTANCE_WEIGHT, INTEREST_WEIGHT, RATE_WEIGHT, interest_kinds, query_kinds, rank_pois, score_pois,
+)
+
+
+def _place(name, kinds, rate=1, dist=1000.0, **extra):
+    return dict({"xid": name, "name": name, "kinds": kinds, "rate": rate, "dist": dist}, **extra)
+
+
+def test_interest_match_beats_popularity_and_distance():
+    places = [
+        _place("Famous viewpoint", "natural,view_points", rate="3h", dist=0.0),
+        _place("Food street", "foods,marketplaces", rate=1, dist=5000.0),
+    ]
+    assert [p["name"] for p in rank_pois(places, ["food"])] == ["Food street", "Famous viewpoint"]
+
+
+def test_matches_are_on_whole_kinds_tokens_not_substrings():
+    # "food" is a substring of "foodstuff_industry" but not one of its tokens
+    places = [_place("Factory", "industrial_facilities,foodstuff_industry"), _place("Cafe", "cafes")]
+    assert rank_pois(places, ["food"], k=1)[0]["name"] == "Cafe"
+
+
+def test_aliases_and_unknown_interests():
+    assert interest_kinds("Street Food") == interest_kinds("food")
+    assert interest_kinds(" HERITAGE ") == interest_kinds("history")
+    assert interest_kinds("lighthouses") == {"lighthouses", "lighthouse"}
+
+
+def test_osm_tagged_places_match_interests():
+    places = [_place("Park", "natural"), _place("City Museum", "tourism:museum")]
+    assert rank_pois(places, ["museums"], k=1)[0]["name"] == "City Museum"
+
+
+def test_multiple_interests_reward_places_matching_more_of_them():
+    places = [_place("Fort museum", "fortifications,museums"), _place("Fort", "fortifications")]
+    scores = score_pois(places, ["history", "museums"])
+    assert scores[0] - scores[1] == pytest.approx(INTEREST_WEIGHT / 2)
+
+
+def test_score_components():
+    places = [_place("Near", "x", rate=3, dist=0.0), _place("Far", "x", rate=0, dist=2000.0)]
+    near, far = score_pois(places, [])
+    assert near == pytest.approx(RATE_WEIGHT + DISTANCE_WEIGHT)
+    assert far == pytest.approx(0.0)
+
+
+def test_unnamed_places_sink():
+    places = [_place("", "museums"), _place("POI", "museums"), _place("Gallery", "museums", dist=9000.0)]
+    assert rank_pois(places, ["museums"])[0]["name"] == "Gallery"
+
+
+def test_missing_distances_are_computed_from_coordinates():
+    places = [
+        _place("Centre", "x", dist=None, lat=26.9, lon=75.8),
+        _place("Edge", "x", dist=None, lat=27.0, lon=75.9),
+    ]
+    center = {"lat": 26.9, "lon": 75.8}
+    assert [p["name"] for p in rank_pois(places, [], center=center)] == ["Centre", "Edge"]
+
+
+def test_top_k_is_sorted_and_annotated():
+    places = [_place(f"P{i}", "museums" if i % 2 else "x", rate=i % 4, dist=float(i)) for i in range(50)]
+    top = rank_pois(places, ["museums"], k=10)
+    assert len(top) == 10
+    scores = [p["score"] for p in top]
+    assert scores == sorted(scores, reverse=True)
+    full = np.sort(score_pois(places, ["museums"]))[::-1][:10]
+    assert scores == pytest.approx(full, abs=1e-4)
+    assert "score" not in places[0]
+
+
+def test_empty_input():
+    assert rank_pois([], ["food"]) == []
+
+
+def test_query_kinds_add_the_categories_interests_need():
+    assert query_kinds("historic,museums", ["History", "culture"]) == "historic,museums"
+    assert query_kinds("historic,museums", ["Street food", "kids", "food"]) == "historic,museums,amusements,aquariums,foods,zoos"
+    assert query_kinds("historic,foods", ["food"]) == "historic,foods"
+
+
+def test_food_interest_brings_food_places_end_to_end(monkeypatch):
+    """The live OTM query asks for `foods`, so a food trip ranks restaurants first."""
+    asked = []
+
+    def radius(url, params=None, **kwargs):
+        asked.append(params.get("kinds"))
+        places = [{"xid": "fort", "name": "Amber Fort", "kinds": "historic,fortifications", "rate": 3,
+                   "dist": 300.0, "point": {"lat": 26.98, "lon": 75.85}}]
+        if "foods" in (params.get("kinds") or "").split(","):
+            places.append({"xid": "lmb", "name": "LMB", "kinds": "foods,restaurants", "rate": 1,
+                           "dist": 900.0, "point": {"lat": 26.92, "lon": 75.82}})
+        return types.SimpleNamespace(raise_for_status=lambda: None, json=lambda: places)
+
+    monkeypatch.setattr(opentripmap, "bbox_from_city", lambda city: {"lat": 26.9, "lon": 75.8})
+    monkeypatch.setattr(opentripmap, "get_poi_index", lambda: None)
+    monkeypatch.setattr(opentripmap, "_attraction_results", TTLCache(ttl_seconds=60))
+    monkeypatch.setattr(opentripmap, "_attempt_levels", TTLCache(ttl_seconds=60))
+    monkeypatch.setattr(opentripmap.config, "OTM_FALLBACK_MODE", "sequential")
+    monkeypatch.setattr(opentripmap.http, "get", radius)
+
+    out = attraction.attraction_node(TravelState(city="Jaipur", days=2, interests=["food"]))
+    assert [p["name"] for p in out["attractions"]] == ["LMB", "Amber Fort"]
+    assert "foods" in asked[0].split(",")
+
+    out = attraction.attraction_node(TravelState(city="Jaipur", days=2, interests=["history"]))
+    assert [p["name"] for p in out["attractions"]] == ["Amber Fort"]
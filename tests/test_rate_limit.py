@@ -0,0 +1,120 @@
+import email.utils
+import time
+import types
+
+import pytest
+
+from src.utils import http, rate_limit
+from src.utils.rate_limit import (
+    RateLimiter, SQLiteTokenBucket, TokenBucket, backoff_delay, parse_limits, retry_after_seconds,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    monkeypatch.setattr(rate_limit, "time", types.SimpleNamespace(monotonic=lambda: now[0], time=time.time, sleep=sleep))
+    return now
+
+
+def test_burst_then_evenly_spaced(clock):
+    bucket = TokenBucket(rate=2.0, burst=3)
+    assert [bucket.reserve() for _ in range(5)] == [0.0, 0.0, 0.0, 0.5, 1.0]
+
+
+def test_tokens_refill_up_to_the_burst(clock):
+    bucket = TokenBucket(rate=1.0, burst=2)
+    bucket.reserve(), bucket.reserve()
+    clock[0] += 10
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 1.0]
+
+
+def test_penalty_holds_every_caller(clock):
+    bucket = TokenBucket(rate=1.0, burst=5)
+    bucket.penalize(3)
+    assert bucket.reserve() == pytest.approx(4.0)
+
+
+def test_sqlite_bucket_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "limits.sqlite")
+    first = SQLiteTokenBucket(path, "api.test", rate=0.001, burst=2)
+    second = SQLiteTokenBucket(path, "api.test", rate=0.001, burst=2)
+    assert first.reserve() == 0.0
+    assert second.reserve() == 0.0
+    assert first.reserve() > 100
+
+
+def test_limiter_waits_and_reports(clock):
+    limiter = RateLimiter({"api.test": (1.0, 1)})
+    assert limiter.acquire("api.test") == 0.0
+    assert limiter.acquire("api.test") == 1.0
+    assert limiter.acquire("other.test") == 0.0
+    stats = limiter.stats()
+    assert stats["api.test"]["acquired"] == 2 and stats["api.test"]["delayed"] == 1
+    assert stats["api.test"]["waiting"] == 0
+    assert stats["other.test"]["limit_per_s"] is None
+
+
+def test_retry_after_from_upstream_pauses_the_bucket(clock):
+    limiter = RateLimiter({"api.test": (1.0, 5)})
+    limiter.throttled("api.test", 2.0)
+    assert limiter.acquire("api.test") == pytest.approx(3.0)
+    assert limiter.stats()["api.test"]["throttled"] == 1
+
+
+def test_parse_limits():
+    assert parse_limits("a.test=1, b.test=0.5:4,,") == {"a.test": (1.0, 1.0), "b.test": (0.5, 4.0)}
+    assert parse_limits("") == {}
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds("7") == 7.0
+    assert retry_after_seconds("-3") == 0.0
+    assert retry_after_seconds(None) is None
+    assert retry_after_seconds("soon") is None
+    date = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 25 < retry_after_seconds(date) <= 30
+
+
+@pytest.mark.parametrize("attempt", range(8))
+def test_backoff_is_jittered_and_capped(attempt):
+    cap = min(http.config.HTTP_RETRY_MAX_DELAY, http.config.HTTP_RETRY_BASE_DELAY * 2 ** attempt)
+    assert all(0 <= backoff_delay(attempt) <= cap for _ in range(50))
+
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent = 0
+
+    def request(self, method, url, **kwargs):
+        self.sent += 1
+        status, headers = self.responses.pop(0)
+        return types.SimpleNamespace(status_code=status, headers=headers, close=lambda: None)
+
+
+def test_sync_requests_retry_rate_limits_and_5xx(monkeypatch):
+    session = FakeSession((429, {"Retry-After": "0"}), (503, {}), (200, {}))
+    monkeypatch.setattr(http, "get_session", lambda: session)
+    monkeypatch.setattr(http, "backoff_delay", lambda attempt: 0)
+    assert http.get("https://retry.test/x").status_code == 200
+    assert session.sent == 3
+    assert http.get_rate_limiter().stats()["retry.test"]["retries"] == 2
+
+
+def test_long_retry_after_is_not_waited_out(monkeypatch):
+    session = FakeSession((429, {"Retry-After": "3600"}))
+    monkeypatch.setattr(http, "get_session", lambda: session)
+    assert http.get("https://banned.test/x").status_code == 429
+    assert session.sent == 1
+
+
+def test_client_errors_are_not_retried(monkeypatch):
+    session = FakeSession((404, {}))
+    monkeypatch.setattr(http, "get_session", lambda: session)
+    assert http.get("https://missing.test/x").status_code == 404
+    assert session.sent == 1
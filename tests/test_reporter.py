@@ -0,0 +1,58 @@
+import copy
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from reportlab.lib.styles import getSampleStyleSheet
+
+from src.agents import reporter
+
+ITINERARY = """Day 1: Old city & <forts>
+Morning at Amber Fort.
+- Hawa Mahal
+- Lunch at "LMB"
+
+Day 2: Bazaars
+* Johari Bazaar
+Evening walk."""
+
+
+def _is_pdf(data):
+    return data.startswith(b"%PDF-") and data.rstrip().endswith(b"%%EOF")
+
+
+def _page_count(data):
+    return int(re.search(rb"/Count (\d+)", data).group(1))
+
+
+def test_renders_headings_bullets_and_markup_characters():
+    assert _is_pdf(reporter._text_to_pdf_bytes("Itinerary for Jaipur (2 days)", ITINERARY))
+
+
+def test_long_itineraries_paginate():
+    body = "\n".join(f"Day {d}: Theme\n" + "\n".join(f"- Stop {i} " + "x" * 80 for i in range(10)) for d in range(1, 15))
+    pdf = reporter._text_to_pdf_bytes("Long trip", body)
+    assert _is_pdf(pdf)
+    assert _page_count(pdf) > 1
+    assert _page_count(reporter._text_to_pdf_bytes("Short trip", ITINERARY)) == 1
+
+
+def test_shared_styles_are_not_mutated_by_rendering():
+    before = {name: copy.copy(style.__dict__) for name, style in reporter.STYLES.items()}
+    sample_body = getSampleStyleSheet()["BodyText"].fontSize
+    reporter._text_to_pdf_bytes("t", ITINERARY)
+    assert {name: style.__dict__ for name, style in reporter.STYLES.items()} == before
+    assert getSampleStyleSheet()["BodyText"].fontSize == sample_body
+
+
+def test_concurrent_renders_share_the_styles():
+    with ThreadPoolExecutor(4) as pool:
+        pdfs = list(pool.map(lambda i: reporter._text_to_pdf_bytes(f"Trip {i}", ITINERARY), range(8)))
+    assert all(_is_pdf(pdf) for pdf in pdfs)
+
+
+def test_pdf_key_depends_on_title_and_text():
+    key = reporter.pdf_key("Itinerary for Jaipur (2 days)", ITINERARY)
+    assert key == reporter.pdf_key("Itinerary for Jaipur (2 days)", ITINERARY)
+    assert key != reporter.pdf_key("Itinerary for Jaipur (3 days)", ITINERARY)
+    assert key != reporter.pdf_key("Itinerary for Jaipur (2 days)", ITINERARY + " ")
+    assert reporter.pdf_title("Jaipur", 2) == "Itinerary for Jaipur (2 days)"
@@ -0,0 +1,46 @@
+import pytest
+
+from src.utils.request_key import normalize_request, request_key
+
+
+def test_equivalent_requests_share_a_key():
+    a = request_key("Jaipur, Ayodhya", 3, ["food", "Culture"], "Medium")
+    b = request_key("  jaipur ;  AYODHYA ", 3, ["culture ", "food", "food", ""], "medium")
+    assert a == b
+
+
+@pytest.mark.parametrize("other", [
+    ("Ayodhya, Jaipur", 3, ["food", "culture"], "medium"),
+    ("Jaipur, Ayodhya", 4, ["food", "culture"], "medium"),
+    ("Jaipur, Ayodhya", 3, ["food"], "medium"),
+    ("Jaipur, Ayodhya", 3, ["food", "culture"], "high"),
+])
+def test_anything_that_changes_the_trip_changes_the_key(other):
+    assert request_key(*other) != request_key("Jaipur, Ayodhya", 3, ["food", "culture"], "medium")
+
+
+def test_normalized_form():
+    assert normalize_request("Paris,  France", None, None, None) == {
+        "cities": ["paris, france"], "days": 1, "interests": [], "budget": "",
+    }
+
+
+def test_app_reruns_reuse_the_result(stub_backends, monkeypatch):
+    testing = pytest.importorskip("streamlit.testing.v1")
+    monkeypatch.setattr("src.utils.cache.install_http_cache", lambda **kwargs: None)
+    at = testing.AppTest.from_file("../app.py", default_timeout=30)
+    at.run()
+    at.text_input[0].set_value("Jaipur")
+    at.button[0].click().run()
+    assert not at.exception
+    assert stub_backends["llm"] == 1
+
+    # a widget interaction reruns the script without a submit: nothing is regenerated
+    at.checkbox[0].check().uncheck().run()
+    assert stub_backends["llm"] == 1
+
+    # submitting the same trip again is served from the stored result
+    at.text_input[0].set_value(" jaipur ")
+    at.button[0].click().run()
+    assert stub_backends["llm"] == 1
+    assert any("earlier result" in c.value for c in at.caption)
@@ -0,0 +1,75 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from src.utils.route_optimizer import nearest_neighbor, solve_route, to_matrix, tour_cost
+
+
+def _euclidean(points):
+    points = np.asarray(points, dtype=float)
+    return np.linalg.norm(points[:, None, :] - points[None, :, :], axis=-1)
+
+
+def _brute_force(cost, start, closed):
+    others = [i for i in range(len(cost)) if i != start]
+    return min(tour_cost(cost, np.array((start,) + perm), closed=closed) for perm in itertools.permutations(others))
+
+
+@pytest.mark.parametrize("closed", [False, True])
+@pytest.mark.parametrize("seed", range(5))
+def test_order_is_a_permutation_starting_at_start(seed, closed):
+    rng = np.random.default_rng(seed)
+    durations = rng.uniform(60, 3600, size=(12, 12))  # asymmetric, like real travel times
+    result = solve_route(durations, start=3, return_to_start=closed)
+    assert sorted(result["order"]) == list(range(12))
+    assert result["order"][0] == 3
+    assert result["total_duration"] == pytest.approx(tour_cost(durations, np.array(result["order"]), closed=closed))
+
+
+@pytest.mark.parametrize("closed", [False, True])
+@pytest.mark.parametrize("seed", range(5))
+def test_small_instances_match_brute_force(seed, closed):
+    rng = np.random.default_rng(seed)
+    durations = _euclidean(rng.uniform(0, 10, size=(7, 2)))
+    result = solve_route(durations, return_to_start=closed, time_budget_s=1.0)
+    assert result["total_duration"] == pytest.approx(_brute_force(durations, 0, closed))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_never_worse_than_nearest_neighbour(seed):
+    rng = np.random.default_rng(seed)
+    durations = rng.uniform(60, 3600, size=(30, 30))
+    np.fill_diagonal(durations, 0)
+    greedy = tour_cost(durations, nearest_neighbor(durations), closed=False)
+    assert solve_route(durations)["total_duration"] <= greedy + 1e-6
+
+
+def test_open_path_from_the_end_of_a_line_walks_it_in_order():
+    xs = [0, 5, 1, 4, 2, 3]
+    durations = _euclidean([(x, 0) for x in xs])
+    result = solve_route(durations, start=0)
+    assert [xs[i] for i in result["order"]] == [0, 1, 2, 3, 4, 5]
+    assert result["total_duration"] == pytest.approx(5)
+
+
+def test_closed_tour_goes_round_the_circle():
+    angles = np.random.default_rng(0).permutation(10) * 2 * np.pi / 10
+    durations = _euclidean(np.c_[np.cos(angles), np.sin(angles)])
+    result = solve_route(durations, distances=durations * 2, return_to_start=True)
+    perimeter = 10 * 2 * np.sin(np.pi / 10)
+    assert result["total_duration"] == pytest.approx(perimeter)
+    assert result["total_distance"] == pytest.approx(2 * perimeter)
+
+
+def test_unreachable_legs_are_avoided():
+    table = [[0, 1, None], [1, 0, 1], [None, 1, 0]]
+    durations = to_matrix(table)
+    assert durations[0, 2] > 1e6
+    assert solve_route(durations, start=0)["order"] == [0, 1, 2]
+
+
+def test_trivial_inputs():
+    assert solve_route(np.zeros((0, 0)))["order"] == []
+    assert solve_route(np.zeros((1, 1)))["order"] == [0]
+    assert to_matrix(None) is None
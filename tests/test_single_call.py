@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+import pytest
+
+from graph import build_graph
+from model import TravelState
+from src.agents import planner
+
+
+def _state(**overrides):
+    fields = dict(city="Jaipur", days=2, interests=["culture"], budget="medium")
+    fields.update(overrides)
+    return TravelState(**fields)
+
+
+def test_single_call_graph_makes_one_llm_call(stub_backends):
+    out = build_graph(parallel=True, planner_mode="single_call").invoke(_state().model_dump())
+    assert not out.get("error")
+    assert stub_backends["llm"] == 1
+    assert out["itinerary_text"] == "Day 1: Theme 1\n- Fort\nDay 2: Theme 2\n- Fort"
+    assert [d["day"] for d in out["plan_outline"]["days"]] == [1, 2]
+    assert "itinerary_text" not in out["plan_outline"]
+    assert out["route_plan"]["days"]
+
+
+def test_two_call_graph_still_summarizes_separately(stub_backends):
+    out = build_graph(parallel=True, planner_mode="two_call").invoke(_state().model_dump())
+    assert stub_backends["llm"] == 1
+    assert out["itinerary_text"] == "Day 1: Old city\n- Visit the fort"
+
+
+def test_truncated_single_call_output_is_repaired():
+    text = json.dumps({"trip_overview": "x", "days": [{"day": 1, "theme": "Forts", "activities": ["Amber"],
+                                                      "description": "d"}], "itinerary_text": "Day 1: Forts"})
+    result = planner._parse_plan_with_itinerary("```json\n" + text[:-3])
+    assert result["itinerary_text"] == "Day 1: Fort"
+    assert result["plan_outline"]["days"][0]["theme"] == "Forts"
+
+
+
+@pytest.fixture
+def cut_off_single_call(stub_backends, monkeypatch):
+    """Single-call responses stop in the middle of day 2, as if max_tokens ran out."""
+    invoke = planner.groq.invoke
+
+    def truncated(prompt, *args, **kwargs):
+        out = invoke(prompt, *args, **kwargs)
+        return out[:out.index('{"day": 2') + 20] if '"itinerary_text"' in prompt else out
+
+    monkeypatch.setattr(planner.groq, "invoke", truncated)
+    monkeypatch.setattr(planner.groq, "ainvoke", lambda *a, **k: asyncio.sleep(0, truncated(*a, **k)))
+    return stub_backends
+
+
+def test_cut_off_single_call_falls_back_to_continuation_and_summarizer(cut_off_single_call):
+    for result in (planner.plan_and_summarize_node(_state()),
+                   asyncio.run(planner.aplan_and_summarize_node(_state()))):
+        assert [d["day"] for d in result["plan_outline"]["days"]] == [1, 2]
+        assert result["itinerary_text"] == "Day 1: Old city\n- Visit the fort"
+        assert result["status"] == "summarizer_completed"
+    # single call + continuation for day 2, per run
+    assert cut_off_single_call["llm"] == 4
+
+def test_invalid_single_call_output_is_an_error():
+    result = planner._parse_plan_with_itinerary("sorry, I can't help with that")
+    assert result["error"].startswith("planner: invalid single-call output")
+    assert result["llm_output"] == "sorry, I can't help with that"
+
+
+def test_single_call_node_requires_inputs(stub_backends):
+    assert "error" in planner.plan_and_summarize_node(_state(interests=[]))
+    assert stub_backends["llm"] == 0
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.utils.singleflight import SingleFlight, get_flight
+
+
+def test_concurrent_threads_share_one_execution():
+    flight = SingleFlight("t")
+    release = threading.Event()
+    runs = []
+
+    def fetch():
+        runs.append(1)
+        release.wait(5)
+        return {"lat": 1.0}
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(flight.do, "jaipur", fetch) for _ in range(8)]
+        while flight.stats()["calls"] < 8:
+            time.sleep(0.001)
+        release.set()
+        results = [f.result(timeout=5) for f in futures]
+    assert runs == [1]
+    assert all(r is results[0] for r in results)
+    assert flight.stats() == {"calls": 8, "executions": 1, "coalesced": 7, "in_flight": 0}
+
+
+def test_waiters_get_the_leaders_exception():
+    flight = SingleFlight("t")
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise ValueError("unknown city")
+
+    with ThreadPoolExecutor(3) as pool:
+        futures = [pool.submit(flight.do, "atlantis", fail) for _ in range(3)]
+        while flight.stats()["calls"] < 3:
+            time.sleep(0.001)
+        release.set()
+        for f in futures:
+            with pytest.raises(ValueError, match="unknown city"):
+                f.result(timeout=5)
+
+
+def test_different_keys_and_later_calls_run_again():
+    flight = SingleFlight("t")
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.do("a", lambda: 3) == 3
+    assert flight.stats()["executions"] == 3
+
+
+def test_coroutines_share_one_task():
+    flight = SingleFlight("t")
+    runs = []
+
+    async def fetch():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return "forecast"
+
+    async def run():
+        return await asyncio.gather(*(flight.ado("key", fetch) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["forecast"] * 5
+    assert runs == [1]
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight("t")
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def run():
+        first = asyncio.ensure_future(flight.ado("key", fetch))
+        second = asyncio.ensure_future(flight.ado("key", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "ok"
+
+
+def test_each_event_loop_has_its_own_calls():
+    flight = SingleFlight("t")
+
+    async def run(value):
+        return await flight.ado("key", lambda: asyncio.sleep(0, result=value))
+
+    assert asyncio.run(run(1)) == 1
+    assert asyncio.run(run(2)) == 2
+    assert len(flight._tasks) == 0
+
+
+def test_groups_are_process_wide():
+    assert get_flight("geocode") is get_flight("geocode")
+    assert get_flight("geocode") is not get_flight("weather")
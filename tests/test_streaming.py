@@ -0,0 +1,79 @@
+import asyncio
+import types
+
+from graph import build_graph
+from model import TravelState
+from src.agents.summarizer import summarize_node
+from src.utils.groq_client import GroqClient
+from src.utils.llm_cache import LLMResponseCache, MemoryBackend
+
+
+class FakeStreamingLLM:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.calls = 0
+
+    def _chunks(self):
+        self.calls += 1
+        for i, text in enumerate(self.chunks):
+            usage = {"input_tokens": 7, "output_tokens": len(self.chunks)} if i == len(self.chunks) - 1 else None
+            yield types.SimpleNamespace(content=text, usage_metadata=usage)
+
+    def stream(self, messages, max_tokens=None):
+        return self._chunks()
+
+    async def astream(self, messages, max_tokens=None):
+        for chunk in self._chunks():
+            yield chunk
+
+
+def _client(chunks):
+    client = GroqClient(cache=LLMResponseCache(MemoryBackend()))
+    client.llm = FakeStreamingLLM(chunks)
+    return client
+
+
+def test_stream_yields_chunks_then_serves_the_cached_whole():
+    client = _client(["Day 1", ": fort", ""])
+    assert list(client.stream("trip")) == ["Day 1", ": fort"]
+    assert list(client.stream("trip")) == ["Day 1: fort"]
+    assert client.llm.calls == 1
+    assert client.usage() == {"calls": 1, "cache_hits": 1, "input_tokens": 7, "output_tokens": 3}
+
+
+def test_abandoned_stream_is_not_cached():
+    client = _client(["Day 1", ": fort"])
+    stream = client.stream("trip")
+    next(stream)
+    stream.close()
+    assert list(client.stream("trip")) == ["Day 1", ": fort"]
+    assert client.llm.calls == 2
+
+
+def test_async_stream_shares_the_cache():
+    client = _client(["Day 1", ": fort"])
+
+    async def collect():
+        return [chunk async for chunk in client.astream("trip")]
+
+    assert asyncio.run(collect()) == ["Day 1", ": fort"]
+    assert list(client.stream("trip")) == ["Day 1: fort"]
+
+
+def test_summarizer_works_outside_a_graph_run(stub_backends):
+    state = TravelState(city="Jaipur", days=1, plan_outline={"days": [{"day": 1}]})
+    assert summarize_node(state)["itinerary_text"] == "Day 1: Old city\n- Visit the fort"
+    assert "error" in summarize_node(TravelState(city="Jaipur", days=1))
+
+
+def test_graph_streams_itinerary_deltas(stub_backends):
+    state = TravelState(city="Jaipur", days=2, interests=["culture"], budget="medium").model_dump()
+    deltas, updates = [], {}
+    for mode, chunk in build_graph(parallel=True).stream(state, stream_mode=["updates", "custom"]):
+        if mode == "custom" and "itinerary_delta" in chunk:
+            deltas.append(chunk["itinerary_delta"])
+        elif mode == "updates":
+            for node_update in chunk.values():
+                updates.update(node_update or {})
+    assert deltas == ["Day 1: Old city\n", "- Visit the fort"]
+    assert updates["itinerary_text"] == "".join(deltas).strip()
@@ -0,0 +1,107 @@
+import asyncio
+import importlib
+
+import pytest
+
+from graph import build_graph
+from model import TravelState
+from src.agents import attraction
+from src.utils.trip_legs import allocate_days, describe_legs, parse_cities, trip_legs
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Jaipur", ["Jaipur"]),
+    ("Paris, France", ["Paris, France"]),
+    ("New York, NY", ["New York, NY"]),
+    ("Udaipur, Rajasthan, India", ["Udaipur, Rajasthan, India"]),
+    ("Jaipur,Ayodhya", ["Jaipur", "Ayodhya"]),
+    ("Mumbai, Goa", ["Mumbai", "Goa"]),
+    ("Tokyo , Japan, Kyoto", ["Tokyo, Japan", "Kyoto"]),
+    ("India, Delhi", ["India", "Delhi"]),
+    ("Jaipur; Ayodhya | Agra", ["Jaipur", "Ayodhya", "Agra"]),
+    ("Jaipur -> Agra → Varanasi", ["Jaipur", "Agra", "Varanasi"]),
+    ("Delhi to Agra TO Jaipur", ["Delhi", "Agra", "Jaipur"]),
+    ("Toronto", ["Toronto"]),
+    ("Jaipur; jaipur ;Agra", ["Jaipur", "Agra"]),
+    (" ; , ", []),
+    ("", []),
+    (None, []),
+])
+def test_parse_cities(text, expected):
+    assert parse_cities(text) == expected
+
+
+def test_days_are_split_evenly_with_the_remainder_first():
+    assert allocate_days(["A", "B", "C"], 7) == [
+        {"city": "A", "days": 3, "first_day": 1},
+        {"city": "B", "days": 2, "first_day": 4},
+        {"city": "C", "days": 2, "first_day": 6},
+    ]
+
+
+def test_cities_beyond_the_trip_length_are_dropped():
+    assert [leg["city"] for leg in allocate_days(["A", "B", "C"], 2)] == ["A", "B"]
+    assert allocate_days([], 3) == []
+    assert trip_legs("Jaipur", None) == [{"city": "Jaipur", "days": 1, "first_day": 1}]
+
+
+def test_describe_legs():
+    assert describe_legs(trip_legs("Jaipur; Ayodhya", 3)) == "Jaipur (days 1-2), Ayodhya (day 3)"
+
+
+def _multi_city_state():
+    return TravelState(city="Jaipur; Ayodhya", days=3, interests=["culture"], budget="medium").model_dump()
+
+
+def test_multi_city_trip_runs_one_leg_per_city(stub_backends):
+    out = build_graph(parallel=True).invoke(_multi_city_state())
+    assert not out.get("error")
+    assert sorted(r["city"] for r in out["city_results"]) == ["Ayodhya", "Jaipur"]
+    assert {a["city"] for a in out["attractions"]} == {"Jaipur", "Ayodhya"}
+    assert [(d["day"], d["city"]) for d in out["route_plan"]["days"]] == [(1, "Jaipur"), (2, "Jaipur"), (3, "Ayodhya")]
+    assert out["weather_data"]["city"] == ["Jaipur", "Jaipur", "Ayodhya"]
+    assert [d["day"] for d in out["plan_outline"]["days"]] == [1, 2, 3]
+
+
+def test_route_indices_point_into_the_merged_attractions(stub_backends):
+    out = build_graph(parallel=True).invoke(_multi_city_state())
+    for day in out["route_plan"]["days"]:
+        assert {out["attractions"][i]["city"] for i in day["order_indices"]} == {day["city"]}
+
+
+def test_async_multi_city_trip(stub_backends):
+    out = asyncio.run(build_graph(parallel=True).ainvoke(_multi_city_state()))
+    assert len(out["city_results"]) == 2 and not out.get("error")
+
+
+def test_leg_errors_are_reported_per_city(stub_backends, monkeypatch):
+    stub = attraction.fetch_attraction
+
+    def fetch(city, **kwargs):
+        if city == "Ayodhya":
+            raise RuntimeError("poi provider down")
+        return stub(city, **kwargs)
+
+    monkeypatch.setattr(attraction, "fetch_attraction", fetch)
+    out = build_graph(parallel=True).invoke(_multi_city_state())
+    assert out["error"].startswith("Ayodhya: attraction_node error: poi provider down")
+    assert {a["city"] for a in out["attractions"]} == {"Jaipur"}
+    assert out["weather_data"]["city"] == ["Jaipur", "Jaipur", "Ayodhya"]
+
+
+@pytest.fixture
+def app(monkeypatch):
+    pytest.importorskip("streamlit")
+    # importing app would otherwise install requests-cache process-wide
+    monkeypatch.setattr("src.utils.cache.install_http_cache", lambda **kwargs: None)
+    return importlib.import_module("app")
+
+
+def test_app_merges_streamed_updates_like_the_graph(app):
+    merged = {}
+    app.merge_update(merged, {"city_results": [{"city": "Jaipur"}], "status": "city_completed"})
+    app.merge_update(merged, {"city_results": [{"city": "Ayodhya"}], "error": "Ayodhya: weather down"})
+    app.merge_update(merged, {"error": "Ayodhya: weather down", "status": None})
+    assert [r["city"] for r in merged["city_results"]] == ["Jaipur", "Ayodhya"]
+    assert merged["error"] == "Ayodhya: weather down"
+    assert merged["status"] == "city_completed"
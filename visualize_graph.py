@@ -11,20 +11,17 @@ def visualize_graph():
     
     print("\nGraph Flow:")
     print("  START")
-    print("    ↓")
-    print("  planner")
-    print("    ↓")
-    print("  attraction")
-    print("    ↓")
-    print("  weather")
-    print("    ↓")
-    print("  route")
-    print("    ↓")
-    print("  summarizer")
-    print("    ↓")
-    print("  reporter")
-    print("    ↓")
-    print("  END")
+    print("    ├─→ planner ─→ summarizer ─→ reporter ─┐")
+    print("    ├─→ attraction ─→ route ───────────────┤")
+    print("    └─→ weather ───────────────────────────┤")
+    print("                                           ↓")
+    print("                                          END")
+    print("\n  Multi-city trips (\"Jaipur, Ayodhya\"):")
+    print("  START")
+    print("    ├─→ planner ─→ summarizer ─→ reporter ───────┐")
+    print("    └─→ city × N (Send) ─→ merge_cities ─────────┤")
+    print("                                                 ↓")
+    print("                                                END")
     
     print("\n" + "="*60)
     print("NODE DESCRIPTIONS")
@@ -39,7 +36,7 @@ def visualize_graph():
         },
         "attraction": {
             "description": "Fetches points of interest",
-            "input": "city, plan_outline, interests",
+            "input": "city, interests",
             "output": "attractions (list)",
             "api": "OpenTripMap"
         },
@@ -55,6 +52,18 @@ def visualize_graph():
             "output": "route_plan (dict)",
             "api": "OSRM"
         },
+        "city": {
+            "description": "One leg of a multi-city trip: POIs, weather and routes for its days",
+            "input": "trip_leg (city, days, first_day), interests",
+            "output": "city_results (one entry per city)",
+            "api": "OpenTripMap, Open-Meteo, OSRM"
+        },
+        "merge_cities": {
+            "description": "Stitches the per-city legs into one trip",
+            "input": "city_results",
+            "output": "attractions, route_plan, weather_data",
+            "api": "-"
+        },
         "summarizer": {
             "description": "Generates human-readable itinerary",
             "input": "plan_outline",
@@ -62,9 +71,9 @@ def visualize_graph():
             "api": "Groq LLM"
         },
         "reporter": {
-            "description": "Converts itinerary to PDF",
+            "description": "Registers the itinerary PDF (built on demand)",
             "input": "itinerary_text, city, days",
-            "output": "itinerary_pdf_bytes (bytes)",
+            "output": "itinerary_pdf_key (PDF in the blob store)",
             "api": "ReportLab"
         }
     }
@@ -92,10 +101,12 @@ Intermediate:
   - attractions: List[Dict]
   - weather_data: Dict
   - route_plan: Dict
+  - trip_leg: Dict (multi-city: this leg's city, days, first_day)
+  - city_results: List[Dict] (multi-city: one per leg, appended by reducer)
 
 Outputs:
   - itinerary_text: str
-  - itinerary_pdf_bytes: bytes
+  - itinerary_pdf_key: str (PDF built on demand from the blob store)
 
 Meta:
   - status: str